@@ -28,6 +28,17 @@ def get_logger() -> logging.Logger:
         _logger = logging.getLogger("ConfigAPI")
     return _logger
 
+CONFIG_PATH = Path(__file__).parent.parent.parent.parent / "proxies.yaml"
+
+def _load_config() -> Dict[str, Any]:
+    """Read proxies.yaml (auto-created if missing)."""
+    return load_proxies_config(CONFIG_PATH)
+
+def _save_config(config: Dict[str, Any]) -> None:
+    """Write *config* back to proxies.yaml."""
+    with open(CONFIG_PATH, "w") as f:
+        yaml.safe_dump(config, f, default_flow_style=False)
+
 class PetalControlRequest(BaseModel):
     petals: List[str]
     action: str  # "ON" or "OFF"
@@ -62,10 +73,9 @@ async def get_status() -> ConfigResponse:
     logger.debug("Processing status request")
     
     try:
-        config_path = Path(__file__).parent.parent.parent.parent / "proxies.yaml"
-        config = load_proxies_config(config_path)
+        config = _load_config()
         
-        logger.debug(f"Successfully loaded configuration from {config_path}")
+        logger.debug(f"Successfully loaded configuration from {CONFIG_PATH}")
         logger.info("Retrieved current configuration status")
         
         return ConfigResponse(
@@ -109,11 +119,10 @@ async def control_petals(request: PetalControlRequest) -> Dict[str, Any]:
     logger.info(f"Processing {action} action for {len(request.petals)} petals: {request.petals}")
     
     try:
-        config_path = Path(__file__).parent.parent.parent.parent / "proxies.yaml"
-        logger.debug(f"Loading configuration from: {config_path}")
+        logger.debug(f"Loading configuration from: {CONFIG_PATH}")
         
         # Read current configuration (auto-creates if missing)
-        config = load_proxies_config(config_path)
+        config = _load_config()
         
         enabled_petals = set(config.get("enabled_petals", []) or [])
         enabled_proxies = set(config.get("enabled_proxies", []) or [])
@@ -173,9 +182,8 @@ async def control_petals(request: PetalControlRequest) -> Dict[str, Any]:
         logger.debug(f"Updated enabled petals: {list(enabled_petals)}")
         
         # Write back to file
-        logger.debug(f"Writing configuration back to: {config_path}")
-        with open(config_path, "w") as f:
-            yaml.safe_dump(config, f, default_flow_style=False)
+        logger.debug(f"Writing configuration back to: {CONFIG_PATH}")
+        _save_config(config)
         
         logger.info(f"Configuration updated successfully with {len(results)} changes")
         if errors:
@@ -237,11 +245,10 @@ async def control_proxies(request: PetalControlRequest) -> Dict[str, Any]:
     enable_proxies = action == "ON"
     
     try:
-        config_path = Path(__file__).parent.parent.parent.parent / "proxies.yaml"
-        logger.debug(f"Loading configuration from: {config_path}")
+        logger.debug(f"Loading configuration from: {CONFIG_PATH}")
         
         # Read current configuration (auto-creates if missing)
-        config = load_proxies_config(config_path)
+        config = _load_config()
         
         enabled_proxies = set(config.get("enabled_proxies", []) or [])
         enabled_petals = set(config.get("enabled_petals", []) or [])
@@ -290,11 +297,12 @@ async def control_proxies(request: PetalControlRequest) -> Dict[str, Any]:
                             dependent_proxies.append(proxy)
                     
                     if dependent_petals or dependent_proxies:
+                        # sorted so the message does not depend on config order
                         dependencies = []
                         if dependent_petals:
-                            dependencies.append(f"petals {dependent_petals}")
+                            dependencies.append(f"petals {sorted(dependent_petals)}")
                         if dependent_proxies:
-                            dependencies.append(f"proxies {dependent_proxies}")
+                            dependencies.append(f"proxies {sorted(dependent_proxies)}")
                         
                         error_msg = (
                             f"Cannot disable {proxy_name}: required by {' and '.join(dependencies)}. "
@@ -317,8 +325,7 @@ async def control_proxies(request: PetalControlRequest) -> Dict[str, Any]:
         config["enabled_proxies"] = list(enabled_proxies)
         
         # Write back to file
-        with open(config_path, "w") as f:
-            yaml.safe_dump(config, f, default_flow_style=False)
+        _save_config(config)
         
         logger.info(f"Configuration updated with {len(results)} successful changes")
         
@@ -351,9 +358,8 @@ async def list_all_components():
     logger.debug("Processing components list request")
     
     try:
-        config_path = Path(__file__).parent.parent.parent.parent / "proxies.yaml"
-        logger.debug(f"Loading configuration from: {config_path}")
-        config = load_proxies_config(config_path)
+        logger.debug(f"Loading configuration from: {CONFIG_PATH}")
+        config = _load_config()
         
         enabled_proxies = set(config.get("enabled_proxies", []) or [])
         enabled_petals = set(config.get("enabled_petals", []) or [])
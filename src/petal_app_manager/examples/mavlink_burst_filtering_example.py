@@ -15,6 +15,12 @@ sys.path.append(str(Path(__file__).parent.parent))
 from proxies.external import MavLinkExternalProxy
 from pymavlink import mavutil
 
+try:
+    # uvicorn[standard] installs uvloop, so this runs on the same loop as PAM
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -95,4 +101,7 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
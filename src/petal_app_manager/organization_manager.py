@@ -13,14 +13,14 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
-import platform
-import subprocess
 import threading
 import time
 from pathlib import Path
 from typing import Optional, Callable, List, Any
 from dataclasses import dataclass
 
+from .utils import get_machine_id
+
 @dataclass
 class OrganizationInfo:
     """Organization and machine information extracted from thing-parameters.json and system"""
@@ -284,29 +284,7 @@ class OrganizationManager:
         """Load machine ID using the machine ID executable."""
         def _get_machine_id_sync() -> Optional[str]:
             try:
-                # Determine architecture
-                arch = platform.machine().lower()
-                is_arm = "aarch64" in arch
-                
-                # Build path to executable
-                utils_dir = Path(__file__).parent / "utils"
-                machine_id_exe = utils_dir / (
-                    "machineid_arm" if is_arm else "machineid_x86"
-                )
-                
-                # Check if executable exists
-                if not machine_id_exe.exists():
-                    self.log.error(f"Machine ID executable not found at {machine_id_exe}")
-                    return None
-                
-                # Execute and get output
-                result = subprocess.run(
-                    [str(machine_id_exe)], 
-                    capture_output=True, 
-                    text=True,
-                    check=True
-                )
-                return result.stdout.strip()
+                return get_machine_id()
             except Exception as e:
                 self.log.error(f"Failed to get machine ID: {e}")
                 return None
@@ -17,6 +17,28 @@ class Petal(ABC):
     name: str
     version: str
 
+    # command suffix -> (method name, cpu_heavy); built once per subclass
+    _mqtt_actions: Dict[str, Tuple[str, bool]] = {}
+    # "{name}/", set when the dispatch table is built
+    _mqtt_prefix: Optional[str] = None
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        # Walk the MRO base-first so overrides win; an undecorated override
+        # drops the inherited action, as attribute lookup would
+        decorated: Dict[str, Dict[str, Any]] = {}
+        for klass in reversed(cls.__mro__):
+            for attr_name, attr in vars(klass).items():
+                meta = getattr(getattr(attr, "__func__", attr), "__mqtt_action__", None)
+                if meta is None:
+                    decorated.pop(attr_name, None)
+                else:
+                    decorated[attr_name] = meta
+        cls._mqtt_actions = {
+            meta["command"]: (attr_name, meta.get("cpu_heavy", False))
+            for attr_name, meta in sorted(decorated.items())
+        }
+
     def __init__(self) -> None:
         self._proxies: Mapping[str, BaseProxy] = {}
         # Populated by _collect_mqtt_actions() during startup
@@ -66,43 +88,33 @@ class Petal(ABC):
     # ────────────────────────── MQTT command handler scaffolding ──────────────
 
     def _collect_mqtt_actions(self) -> Tuple[Dict[str, Callable], Dict[str, bool]]:
-        """Scan ``self`` for methods decorated with ``@mqtt_action`` and build
-        two parallel dicts keyed by the fully-qualified command string
+        """Bind the methods decorated with ``@mqtt_action`` and build two
+        parallel dicts keyed by the fully-qualified command string
         (``"{petal_name}/{command_suffix}"``):
 
         * **handlers** – the async method reference
         * **cpu_heavy** – whether the handler should be offloaded
 
+        The decorated methods are found once per class, when the subclass
+        is defined, so this only binds them to ``self``.
+
         Returns ``(handlers, cpu_heavy_flags)``.
         """
         handlers: Dict[str, Callable] = {}
         cpu_heavy_flags: Dict[str, bool] = {}
+        # Some petals set ``name`` per instance, so the prefix is per instance too
+        self._mqtt_prefix = prefix = f"{self.name}/"
 
-        for attr_name in dir(self):
-            try:
-                attr = getattr(self, attr_name)
-            except Exception:
-                continue
-            meta = getattr(attr, "__mqtt_action__", None)
-            if meta is None:
-                continue
-            command_suffix = meta["command"]
-            full_command = f"{self.name}/{command_suffix}"
-            handlers[full_command] = attr
-            cpu_heavy_flags[full_command] = meta.get("cpu_heavy", False)
+        for command_suffix, (attr_name, cpu_heavy) in self._mqtt_actions.items():
+            full_command = prefix + command_suffix
+            handlers[full_command] = getattr(self, attr_name)
+            cpu_heavy_flags[full_command] = cpu_heavy
 
         return handlers, cpu_heavy_flags
 
     def has_mqtt_actions(self) -> bool:
         """Return ``True`` if any method is decorated with ``@mqtt_action``."""
-        for attr_name in dir(self):
-            try:
-                attr = getattr(self, attr_name)
-            except Exception:
-                continue
-            if getattr(attr, "__mqtt_action__", None) is not None:
-                return True
-        return False
+        return bool(self._mqtt_actions)
 
     async def _mqtt_master_command_handler(self, topic: str, message: Dict[str, Any]):
         """Auto-generated master command handler that dispatches to
@@ -137,8 +149,8 @@ class Petal(ABC):
             command = message.get("command", "")
             logger.info("Petal %s master handler received command: %s", self.name, command)
 
-            if command in self._mqtt_command_handlers:
-                handler = self._mqtt_command_handlers[command]
+            handler = self._mqtt_command_handlers.get(command)
+            if handler is not None:
                 is_cpu_heavy = self._mqtt_cpu_heavy_commands.get(command, False)
 
                 if is_cpu_heavy and self._loop and not self._loop.is_closed():
@@ -150,7 +162,7 @@ class Petal(ABC):
                     await handler(topic, message)
             else:
                 # Ignore commands not meant for this petal
-                if not command.startswith(f"{self.name}/"):
+                if not command.startswith(self._mqtt_prefix or f"{self.name}/"):
                     logger.debug("Ignoring command not meant for petal %s: %s", self.name, command)
                     return
 
@@ -11,9 +11,11 @@ import os
 import pathlib
 
 from ..proxies.base import BaseProxy
-from typing import List, Dict
+from typing import List, Dict, Optional
 from ..plugins.base import Petal
 
+CONFIG_PATH = Path(__file__).parent.parent.parent.parent / "proxies.yaml"
+
 # Cache entry points once to avoid repeated scanning
 _PETAL_EPS: Dict[str, md.EntryPoint] = {}
 _EPS_CACHED = False
@@ -59,20 +61,23 @@ def initialize_petals(
         petal_name_list: List[str],
         proxies: Dict[str, BaseProxy],
         logger: logging.Logger,
+        proxies_config: Optional[Dict] = None,
     ) -> List[Petal]:
     """
     Initialize petals without starting them up.
     Loads petal classes, instantiates them, and injects proxies.
     Does NOT call petal.startup().
     
+    *proxies_config* is the parsed proxies.yaml; when omitted it is read
+    from CONFIG_PATH.
+    
     Returns a list of initialized (but not started) Petal objects.
     """
-    from pathlib import Path
-    from ..config import load_proxies_config
+    if proxies_config is None:
+        from ..config import load_proxies_config
 
-    # Load petal dependencies from proxies.yaml (auto-creates if missing)
-    proxies_yaml_path = Path(__file__).parent.parent.parent.parent / "proxies.yaml"
-    proxies_config = load_proxies_config(proxies_yaml_path)
+        # Load petal dependencies from proxies.yaml (auto-creates if missing)
+        proxies_config = load_proxies_config(CONFIG_PATH)
     enabled_proxies = set(proxies_config.get("enabled_proxies") or [])
     petal_dependencies: Dict[str, list] = proxies_config.get("petal_dependencies", {}) or {}
     
@@ -88,8 +93,9 @@ def initialize_petals(
     for name in petal_name_list:
         # Check required proxies for this petal from YAML
         required = set(petal_dependencies.get(name, []))
-        missing_from_config = [proxy for proxy in required if proxy not in enabled_proxies]
-        missing_from_runtime = [proxy for proxy in required if proxy not in proxies]
+        # Set differences give the exact missing proxies; sorted for stable messages
+        missing_from_config = sorted(required - enabled_proxies)
+        missing_from_runtime = sorted(required.difference(proxies))
 
         if missing_from_config:
             logger.error(
@@ -244,6 +250,7 @@ def load_petals(
         petal_name_list: List[str],
         proxies: Dict[str, BaseProxy],
         logger: logging.Logger,
+        proxies_config: Optional[Dict] = None,
     ) -> List[Petal]:
     """
     Load, initialize, and start petals (convenience function).
@@ -252,6 +259,6 @@ def load_petals(
     For more control over the initialization and startup process,
     use initialize_petals() and startup_petals() separately.
     """
-    petal_list = initialize_petals(petal_name_list, proxies, logger)
+    petal_list = initialize_petals(petal_name_list, proxies, logger, proxies_config)
     started_petals = startup_petals(app, petal_list, logger)
     return started_petals
\ No newline at end of file
@@ -1,6 +1,33 @@
 # proxies/base.py
 from abc import ABC, abstractmethod
 import asyncio
+import concurrent.futures
+import os
+import threading
+
+_shared_exe: concurrent.futures.ThreadPoolExecutor | None = None
+_shared_exe_lock = threading.Lock()
+
+
+def shared_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """
+    Process-wide pool for stateless offloaded work (``cpu_heavy`` handlers).
+
+    Per-proxy single-worker executors stay in place where they serialise
+    access to a connection; this pool is for work that does not need that,
+    so it no longer queues behind a proxy's I/O and no proxy needs a private
+    thread for it.  Size with ``PETAL_THREAD_POOL_SIZE`` (default 8); threads
+    are only started on demand.
+    """
+    global _shared_exe
+    if _shared_exe is None:
+        with _shared_exe_lock:
+            if _shared_exe is None:
+                _shared_exe = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=int(os.environ.get("PETAL_THREAD_POOL_SIZE", "8")),
+                    thread_name_prefix="petal-proxy",
+                )
+    return _shared_exe
 
 
 class BaseProxy(ABC):
@@ -53,6 +53,8 @@ class S3BucketProxy(BaseProxy):
             'credentials': None,
             'expires_at': 0
         }
+        # Only one refresh in flight; concurrent callers reuse its result
+        self._session_lock = asyncio.Lock()
         
         # S3 client (will be initialized in start())
         self.s3_client = None
@@ -234,7 +236,12 @@ class S3BucketProxy(BaseProxy):
                 raise Exception(f"Authentication service error: {str(e)}")
 
         try:
-            return await self._loop.run_in_executor(self._exe, _fetch_credentials)
+            async with self._session_lock:
+                # Another caller may have refreshed while we waited for the lock
+                if (self._session_cache['credentials'] and
+                    time.time() < self._session_cache['expires_at']):
+                    return self._session_cache['credentials']
+                return await self._loop.run_in_executor(self._exe, _fetch_credentials)
         except Exception as e:
             self.log.debug(f"Credential fetch failed: {type(e).__name__}")
             # Re-raise with a more user-friendly message or handle as needed
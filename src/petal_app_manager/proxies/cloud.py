@@ -14,6 +14,7 @@ the underlying authentication and HTTP communication details.
 from __future__ import annotations
 from typing import List, Dict, Any, Optional
 import asyncio
+import calendar
 import concurrent.futures
 import json
 import logging
@@ -64,6 +65,8 @@ class CloudDBProxy(BaseProxy):
             'credentials': None,
             'expires_at': 0
         }
+        # Only one refresh in flight; concurrent callers reuse its result
+        self._session_lock = asyncio.Lock()
 
     async def start(self):
         """Initialize the cloud proxy and fetch initial credentials."""
@@ -189,8 +192,9 @@ class CloudDBProxy(BaseProxy):
                 if 'expiresAt' in credentials:
                     expires_at = credentials['expiresAt']
                     if isinstance(expires_at, str):
-                        # Convert ISO 8601 string to timestamp
-                        expires_at = time.mktime(time.strptime(expires_at, '%Y-%m-%dT%H:%M:%S.%fZ'))
+                        # Convert ISO 8601 UTC ('Z') string to an epoch timestamp;
+                        # mktime would read it as local time
+                        expires_at = calendar.timegm(time.strptime(expires_at, '%Y-%m-%dT%H:%M:%S.%fZ'))
                     self._session_cache['expires_at'] = expires_at - 600  # Cache for 50 minutes
                 else:
                     # Default to 1 hour from now if expiresAt is not provided
@@ -203,7 +207,12 @@ class CloudDBProxy(BaseProxy):
                 self.log.debug(f"Session service error: {type(e).__name__}")
                 raise Exception(f"Authentication service error: {str(e)}")
 
-        return await self._loop.run_in_executor(self._exe, _fetch_token)
+        async with self._session_lock:
+            # Another caller may have refreshed while we waited for the lock
+            if (self._session_cache['credentials'] and
+                time.time() < self._session_cache['expires_at']):
+                return self._session_cache['credentials']
+            return await self._loop.run_in_executor(self._exe, _fetch_token)
         
     async def _cloud_request(
         self, 
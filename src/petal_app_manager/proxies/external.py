@@ -14,6 +14,7 @@ Key changes vs. the first draft:
 
 from __future__ import annotations
 
+import sys
 import threading
 import time
 import socket
@@ -30,11 +31,15 @@ from typing import (
     Mapping, 
     Tuple, 
     Generator,
+    Iterator,
     Awaitable,
     Optional,
+    Set,
     Union
 )
 import contextlib
+from itertools import chain
+from operator import itemgetter
 import logging
 from pathlib import Path
 import asyncio, shutil
@@ -42,7 +47,7 @@ from pydantic import BaseModel, Field
 import concurrent.futures
 from concurrent.futures import ThreadPoolExecutor
 
-from .base import BaseProxy
+from .base import BaseProxy, shared_executor
 from .. import Config
 from ..models.mavlink import (
     RebootStatusCode,
@@ -86,6 +91,9 @@ _FLOAT_TYPES = {
     mavutil.mavlink.MAV_PARAM_TYPE_REAL64,
 }
 
+# Sentinel for "duplicate key not computed yet" (a subclass key may be None)
+_NO_KEY = object()
+
 ParamSpec = Union[
     Any,                            # value only
     Tuple[Any, Union[str, int]],    # (value, "UINT16") or (value, MAV_PARAM_TYPE_INT32)
@@ -192,9 +200,12 @@ class ExternalProxy(BaseProxy):
     in a tight loop while the FastAPI event-loop thread stays unblocked.
 
     * **Send buffers** - ``self._send[key]`` (deque, newest → right side)
-      Outbound messages are enqueued here via :py:meth:`send`.
-      The I/O thread drains these buffers by calling
-      :py:meth:`_io_write_once` with all pending messages.
+      Outbound messages are enqueued here via :py:meth:`send`, which wakes
+      the send thread; it drains these buffers by calling
+      :py:meth:`_io_write_once` with all pending messages, and sleeps
+      while there is nothing to send.
+      ``deque.append``/``popleft`` are atomic, so producers on any thread
+      enqueue without a lock, and a full buffer drops its oldest message.
 
     * **Handlers** - ``self._handlers[key]``
       Callbacks registered via :py:meth:`register_handler` are stored here.
@@ -211,6 +222,10 @@ class ExternalProxy(BaseProxy):
         maxlen :
             Maximum number of messages kept *per key* in both send/recv maps.
             A value of 0 or ``None`` means *unbounded* (not recommended).
+        sleep_time_ms :
+            How long the send thread waits after being woken before it
+            drains, so messages sent close together share one write; also
+            the recv thread's read timeout. Negative values are treated as 0.
         """
         self._maxlen = maxlen
 
@@ -220,13 +235,30 @@ class ExternalProxy(BaseProxy):
         self._sleep_time_ms = sleep_time_ms
         self._sleep_time_reader_ms = sleep_time_ms
         self._send: Dict[str, Deque[Any]] = {}
+        # Keys appended to since the last drain; producers add *after* appending
+        self._dirty_keys: Set[str] = set()
+        # Set by producers after marking a key dirty; the idle send thread
+        # sleeps on it instead of polling
+        self._send_wakeup = threading.Event()
         self._handlers: Dict[str, List[Callable[[Any], None]]] = (
             defaultdict(list)
         )
         self._handler_configs: Dict[str, Dict[Callable[[Any], None], Dict[str, Any]]] = (
             defaultdict(dict)
         )
-        self._last_message_times: Dict[str, Dict[str, float]] = defaultdict(dict)
+        # (key, fn) -> (duplicate key, time) of the last message let through.
+        # Keyed by the function itself, not id(fn): an id can be reused once
+        # a handler is garbage collected, the function object cannot
+        self._last_message_times: Dict[Tuple[str, Callable[[Any], Awaitable[None]]], Tuple[Any, float]] = {}
+        # Read-only snapshot used by the recv thread:
+        # key -> ((fn, duplicate_filter_interval, cpu_heavy, (key, fn)), ...)
+        self._dispatch: Dict[str, Tuple[Tuple[Callable[[Any], Awaitable[None]], Optional[float], bool, Tuple[str, Callable[[Any], Awaitable[None]]]], ...]] = {}
+
+        # Idle send buffers are released so the key set does not only ever grow
+        self._idle_buffer_ttl = 30.0      # drop empty buffers unused for this long (s)
+        self._idle_sweep_interval = 1.0   # how often the send thread checks (s)
+        self._send_last_active: Dict[str, float] = {}
+        self._retired_send: List[Tuple[str, Deque[Any]]] = []
 
         # Thread management (I/O threads only)
         self._send_running = threading.Event()
@@ -281,12 +313,15 @@ class ExternalProxy(BaseProxy):
                 f"Got {type(fn).__name__} instead. "
                 f"Define your handler with 'async def' instead of 'def'."
             )
-        
+
+        # Interned keys make the per-message dict lookups pointer comparisons
+        key = sys.intern(key)
         self._handlers[key].append(fn)
         self._handler_configs[key][fn] = {
             'duplicate_filter_interval': duplicate_filter_interval,
             'cpu_heavy': cpu_heavy,
         }
+        self._rebuild_dispatch(key)
 
     def unregister_handler(self, key: str, fn: Callable[[Any], Awaitable[None]]) -> None:
         """
@@ -309,15 +344,40 @@ class ExternalProxy(BaseProxy):
             )
             return  # fn was not in the list; ignore
 
-        # Clean up handler config
+        # Clean up handler config and duplicate-filter state
         if key in self._handler_configs and fn in self._handler_configs[key]:
             del self._handler_configs[key][fn]
+        self._last_message_times.pop((key, fn), None)
 
         if not callbacks:
             # last handler -> prune everything for that key
             del self._handlers[key]
             if key in self._handler_configs:
                 del self._handler_configs[key]
+        self._rebuild_dispatch(key)
+
+    def _rebuild_dispatch(self, key: str) -> None:
+        """
+        Refresh the recv-thread snapshot of handlers for *key*.
+
+        The snapshot is replaced wholesale rather than mutated, so the recv
+        thread always iterates a consistent tuple without taking a lock.
+        """
+        callbacks = self._handlers.get(key)
+        if not callbacks:
+            self._dispatch.pop(key, None)
+            return
+        configs = self._handler_configs.get(key, {})
+        entries = []
+        for cb in callbacks:
+            config = configs.get(cb, {})
+            entries.append((
+                cb,
+                config.get('duplicate_filter_interval'),
+                config.get('cpu_heavy', False),
+                (key, cb),  # duplicate-filter state key, built once here
+            ))
+        self._dispatch[key] = tuple(entries)
 
     def send(self, key: str, msg: Any, burst_count: Optional[int] = None, 
              burst_interval: Optional[float] = None) -> None:
@@ -338,8 +398,9 @@ class ExternalProxy(BaseProxy):
             If None, all messages are sent immediately.
         """
         if burst_count is None or burst_count <= 1:
-            # Single message send
-            self._send.setdefault(key, deque(maxlen=self._maxlen)).append(msg)
+            # Single message send - the hot path
+            self._send_buffer(key).append(msg)
+            self._mark_dirty(key)
         else:
             # Burst send
             if burst_interval is None or burst_interval <= 0:
@@ -347,6 +408,7 @@ class ExternalProxy(BaseProxy):
                 send_queue = self._send.setdefault(key, deque(maxlen=self._maxlen))
                 for _ in range(burst_count):
                     send_queue.append(msg)
+                self._mark_dirty(key)
             else:
                 # Schedule burst with intervals using a background task
                 if self._loop is not None:
@@ -389,21 +451,44 @@ class ExternalProxy(BaseProxy):
                         send_queue = self._send.setdefault(key, deque(maxlen=self._maxlen))
                         for _ in range(burst_count):
                             send_queue.append(msg)
+                        self._mark_dirty(key)
                 else:
                     # If no loop is available, fall back to immediate send
                     self._log.warning("No event loop available for burst with interval, sending immediately")
                     send_queue = self._send.setdefault(key, deque(maxlen=self._maxlen))
                     for _ in range(burst_count):
                         send_queue.append(msg)
+                    self._mark_dirty(key)
+
+    def _send_buffer(self, key: str) -> Deque[Any]:
+        """
+        Return the live send buffer for *key*, creating it if needed.
+
+        setdefault() alone would build and discard a deque on every call,
+        so one is only created for a key that has no buffer yet. Callers
+        must not hold on to the result across an ``await``: the idle sweep
+        may retire the buffer in between.
+        """
+        send_queue = self._send.get(key)
+        if send_queue is None:
+            send_queue = self._send.setdefault(key, deque(maxlen=self._maxlen))
+        return send_queue
+
+    def _mark_dirty(self, key: str) -> None:
+        """Flag *key* for the send thread, waking it if it is idle."""
+        self._dirty_keys.add(key)
+        if not self._send_wakeup.is_set():  # already pending: skip set()'s lock
+            self._send_wakeup.set()
 
     async def _send_burst(self, key: str, msg: Any, count: int, interval: float) -> None:
         """Send a burst of messages with specified interval."""
-        send_queue = self._send.setdefault(key, deque(maxlen=self._maxlen))
-        
-        # Send messages with proper intervals
+        # Send messages with proper intervals. The buffer is looked up each
+        # time: a long interval can outlast the idle sweep, which retires the
+        # buffer, and appends to a retired deque would never be sent
         for i in range(count):
-            send_queue.append(msg)
-            self._log.debug(f"Burst message {i+1}/{count} queued for key '{key}'")
+            self._send_buffer(key).append(msg)
+            self._mark_dirty(key)
+            self._log.debug("Burst message %d/%d queued for key '%s'", i + 1, count, key)
             if i < count - 1:  # Don't sleep after the last message
                 await asyncio.sleep(interval)
 
@@ -426,6 +511,7 @@ class ExternalProxy(BaseProxy):
         """Ask the I/O threads to exit and join them (best-effort, 5 s timeout)."""
         self._send_running.clear()
         self._recv_running.clear()
+        self._send_wakeup.set()  # let an idle send thread see the stop now
         
         # Cancel any pending burst tasks
         if hasattr(self, '_burst_tasks'):
@@ -467,25 +553,110 @@ class ExternalProxy(BaseProxy):
     # ─────────────────────────────────────────── internal worker main-loop ──
     def _send_body(self) -> None:
         """I/O thread body - drains send queues."""
-        while self._send_running.is_set():
-            pending: Dict[str, List[Any]] = defaultdict(list)
-            for key, dq in list(self._send.items()):
-                while dq:
-                    pending[key].append(dq.popleft())
+        # Bound once as locals: this loop runs for the proxy's whole lifetime
+        monotonic = time.monotonic
+        sleep = time.sleep
+        coalesce_s = self._sleep_time_ms / 1000.0
+        wakeup = self._send_wakeup
+        running = self._send_running.is_set
+        send_buffers = self._send
+        dirty = self._dirty_keys
+        last_sweep = monotonic()
+        while running():
+            # Clear *before* draining: a producer that marks a key after this
+            # point sets the event again, so its message is never left behind
+            wakeup.clear()
+            pending: Dict[str, List[Any]] = {}
+            while dirty:
+                key = dirty.pop()
+                dq = send_buffers.get(key)
+                if dq:
+                    # Pop exactly what is queued now in one comprehension;
+                    # list(dq) + dq.clear() would lose anything a producer
+                    # appends between the two calls
+                    popleft = dq.popleft
+                    batch = [popleft() for _ in range(len(dq))]
+                    if key in pending:
+                        # re-marked by a producer while this cycle was draining
+                        pending[key].extend(batch)
+                    else:
+                        pending[key] = batch
             if pending:
-                self._io_write_once(pending)
+                self._io_write_once(pending)  # not hoisted: may be wrapped while running
+                now = monotonic()
+                for key in pending:
+                    self._send_last_active[key] = now
             else:
-                # Sleep briefly if there's nothing to send to avoid busy-waiting
-                time.sleep(self._sleep_time_ms / 1000.0)
+                # Nothing queued: block until send() wakes us, but no longer
+                # than the idle-buffer sweep interval. Once woken, give the
+                # rest of a burst sleep_time_ms to arrive so it goes out in
+                # one write instead of one write per message
+                if wakeup.wait(self._idle_sweep_interval) and coalesce_s:
+                    sleep(coalesce_s)
+                now = monotonic()
+
+            if now - last_sweep >= self._idle_sweep_interval:
+                self._sweep_idle_send_buffers(now)
+                last_sweep = now
+
+    def _sweep_idle_send_buffers(self, now: float) -> None:
+        """
+        Release send buffers that are empty and have not carried a message
+        for ``_idle_buffer_ttl`` seconds.
+
+        A producer may have fetched a buffer just before it was removed, so
+        removed buffers are kept for one more sweep; anything appended to
+        them in that window is moved back into the live buffers.
+        """
+        for key, dq in self._retired_send:
+            if dq:
+                self._send.setdefault(key, deque(maxlen=self._maxlen)).extend(dq)
+                self._dirty_keys.add(key)
+        self._retired_send = []
+
+        for key, dq in list(self._send.items()):
+            if dq:
+                # Safety net for buffers filled without going through send()
+                self._dirty_keys.add(key)
+                continue
+            last = self._send_last_active.setdefault(key, now)
+            if now - last >= self._idle_buffer_ttl:
+                self._retired_send.append((key, self._send.pop(key)))
+                del self._send_last_active[key]
+
+    def _io_dispatch_once(self, timeout: float = 0.0) -> None:
+        """
+        Read pending messages and hand each one to the registered handlers.
+
+        The default implementation iterates :py:meth:`_io_read_once`.
+        Subclasses that can push messages straight to
+        :py:meth:`_process_message_with_handlers` may override this to skip
+        building the intermediate ``(key, message)`` list.
+        """
+        for key, msg in self._io_read_once(timeout=timeout):
+            self._process_message_with_handlers(key, msg)
 
     def _recv_body(self) -> None:
         """I/O thread body - polls recv and processes messages with handlers directly."""
+        timeout = self._sleep_time_reader_ms / 1000.0
         while self._recv_running.is_set():
-            for key, msg in self._io_read_once(timeout=self._sleep_time_reader_ms/1000.0):                
-                # Process directly in recv thread (handlers are async, dispatched to event loop)
-                self._process_message_with_handlers(key, msg)
-            
+            # Process directly in recv thread (handlers are async, dispatched to event loop)
+            self._io_dispatch_once(timeout=timeout)
+
     # ─────────────────────────────────────────── message processing ──
+    def _duplicate_key(self, msg: Any) -> Any:
+        """
+        Value compared by ``duplicate_filter_interval`` to spot a repeat of
+        *msg*. Messages with equal keys count as duplicates.
+
+        ``str``/``bytes`` messages are immutable and compare by value, so they
+        are their own key; anything else may be mutated in place after it is
+        handed over, so it is snapshotted with ``str(msg)``.
+        """
+        if type(msg) is str or type(msg) is bytes:
+            return msg
+        return str(msg)
+
     def _invoke_callback_safely(
         self, callback: Callable, key: str, msg: Any, *, cpu_heavy: bool = False,
     ):
@@ -500,7 +671,7 @@ class ExternalProxy(BaseProxy):
             if self._loop and not self._loop.is_closed():
                 if cpu_heavy:
                     async def _offloaded():
-                        await self._loop.run_in_executor(self._exe, lambda: asyncio.run(callback(msg)))
+                        await self._loop.run_in_executor(shared_executor(), lambda: asyncio.run(callback(msg)))
                     asyncio.run_coroutine_threadsafe(_offloaded(), self._loop)
                 else:
                     asyncio.run_coroutine_threadsafe(callback(msg), self._loop)
@@ -522,37 +693,38 @@ class ExternalProxy(BaseProxy):
         This runs in the I/O recv thread and handles duplicate filtering.
         Handlers are async and scheduled on the event loop.
         """
-        current_time = time.time()
-        for cb in self._handlers.get(key, []):
+        entries = self._dispatch.get(key)
+        if not entries:
+            return  # most keys have no subscribers
+        # Hoisted out of the per-handler loop: this runs for every received message
+        last_message_times = self._last_message_times
+        invoke = self._invoke_callback_safely
+        log_debug = self._log.isEnabledFor(logging.DEBUG)
+        # Filter inputs are computed at most once, and only if some handler
+        # filters, so keys with only plain handlers skip them entirely
+        msg_key = _NO_KEY
+        for cb, filter_interval, is_cpu_heavy, handler_key in entries:
             try:
-                # Check if duplicate filtering is enabled for this handler
-                handler_config = self._handler_configs.get(key, {}).get(cb, {})
-                filter_interval = handler_config.get('duplicate_filter_interval')
-                
-                should_call_handler = True
                 if filter_interval is not None:
-                    # Convert message to string for comparison
-                    msg_str = str(msg)
-                    handler_key = f"{key}_{id(cb)}"
-                    
-                    # Check if we've seen this exact message recently for this handler
-                    if handler_key in self._last_message_times:
-                        last_msg_str, last_time = self._last_message_times[handler_key]
-                        if (msg_str == last_msg_str and 
-                            current_time - last_time < filter_interval):
-                            should_call_handler = False
+                    if msg_key is _NO_KEY:
+                        msg_key = self._duplicate_key(msg)
+                        # Monotonic: a wall-clock step (NTP) must not stretch or skip filter windows
+                        current_time = time.monotonic()
+
+                    # Skip if this handler saw the same message within its interval
+                    last = last_message_times.get(handler_key)
+                    if (last is not None and msg_key == last[0] and
+                            current_time - last[1] < filter_interval):
+                        if log_debug:
                             self._log.debug(
                                 "[ExternalProxy] Filtered duplicate message for handler %s on key '%s'",
                                 cb, key
                             )
-                    
-                    # Update last message time for this handler
-                    if should_call_handler:
-                        self._last_message_times[handler_key] = (msg_str, current_time)
-                
-                if should_call_handler:
-                    is_cpu_heavy = handler_config.get('cpu_heavy', False)
-                    self._invoke_callback_safely(cb, key, msg, cpu_heavy=is_cpu_heavy)
+                        continue
+                    last_message_times[handler_key] = (msg_key, current_time)
+
+                invoke(cb, key, msg, cpu_heavy=is_cpu_heavy)
+                if log_debug:
                     self._log.debug(
                         "[ExternalProxy] handler %s called for key '%s': %s",
                         cb, key, msg
@@ -621,6 +793,11 @@ class MavLinkExternalProxy(ExternalProxy):
         self._reconnect_pending = False
         self._mav_lock = threading.Lock()
         self._download_lock = threading.Lock()  # Prevent concurrent downloads
+        self._msgid_keys: Dict[int, str] = {}   # msg id -> interned str(msg id)
+        self._tx_batch_max_bytes = 1200         # flush a TX batch before it outgrows one UDP datagram
+        self._rx_socket_buffer_bytes = 2 * 1024 * 1024  # absorbs telemetry + FTP bursts without kernel drops
+        # (target_system, target_component, message_id) -> COMMAND_LONG fields
+        self._req_msg_long_cache: Dict[Tuple[int, int, int], Any] = {}
         
         # Rate limiting for logging
         self._last_log_time = {}
@@ -886,13 +1063,32 @@ class MavLinkExternalProxy(ExternalProxy):
 
     def _create_mavlink_connection(self):
         """Create MAVLink connection in a separate thread."""
-        return mavutil.mavlink_connection(
+        master = mavutil.mavlink_connection(
             self.endpoint, 
             baud=self.baud, 
             dialect="all",
             source_system=self.source_system_id,
             source_component=self.source_component_id
         )
+        self._tune_rx_socket(master)
+        return master
+
+    def _tune_rx_socket(self, master) -> None:
+        """
+        Enlarge the kernel receive buffer of a UDP/TCP endpoint.
+
+        The default (~208 KiB on Linux) overflows under high-rate telemetry
+        plus MAVFTP bursts, and every dropped FTP packet costs a retry gap.
+        Serial endpoints have no socket and are left alone; the kernel may
+        still cap the size at ``net.core.rmem_max``.
+        """
+        sock = getattr(master, "port", None)
+        if not isinstance(sock, socket.socket):
+            return
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self._rx_socket_buffer_bytes)
+        except OSError as e:
+            self._log.warning(f"Could not enlarge MAVLink receive buffer: {e}")
     
     def _wait_for_heartbeat(self):
         """Wait for heartbeat in a separate thread."""
@@ -1059,24 +1255,58 @@ class MavLinkExternalProxy(ExternalProxy):
         self.connected = False
 
     # ------------------- I/O primitives --------------------- #
+    def _duplicate_key(self, msg: Any) -> Any:
+        """
+        Compare received MAVLink messages by ID and packed payload.
+
+        This matches ``str(msg)`` (same type, same field values, header
+        ignored) without formatting every field. Messages built locally
+        and not yet packed fall back to ``str(msg)``.
+        """
+        get_payload = getattr(msg, "get_payload", None)
+        payload = get_payload() if get_payload is not None else None
+        if payload is None:
+            return super()._duplicate_key(msg)
+        return (msg.get_msgId(), payload)
+
     def _io_read_once(self, timeout: float = 0.0) -> List[Tuple[str, Any]]:
+        out: List[Tuple[str, Any]] = []
+        self._read_into(lambda key, msg: out.append((key, msg)), timeout)
+        return out
+
+    def _io_dispatch_once(self, timeout: float = 0.0) -> None:
+        if type(self)._io_read_once is not MavLinkExternalProxy._io_read_once:
+            # A subclass feeds messages through _io_read_once (replay, test
+            # injection): keep honouring it
+            super()._io_dispatch_once(timeout)
+            return
+        # Push every message straight to the handlers; no intermediate list
+        self._read_into(self._process_message_with_handlers, timeout)
+
+    def _read_into(self, consumer: Callable[[str, Any], None], timeout: float) -> None:
+        """
+        Drain the MAVLink connection, calling ``consumer(key, msg)`` for each
+        message under the ``"mav"``, numeric-ID and type-name keys.
+        """
         if not self.master or not self.connected:
-            return []
+            return
 
-        out: List[Tuple[str, Any]] = []
+        msgid_keys = self._msgid_keys
         try:
             while True:
                 with self._mav_lock:
                     msg = self.master.recv_match(blocking=True, timeout=timeout)
                     if msg is None:
                         break
-            
-                msg_type = msg.get_type()
+
                 msg_id = msg.get_msgId()
-                
-                out.append(("mav", msg))
-                out.append((str(msg_id), msg))
-                out.append((msg_type, msg))
+                id_key = msgid_keys.get(msg_id)
+                if id_key is None:
+                    id_key = msgid_keys[msg_id] = sys.intern(str(msg_id))
+
+                consumer("mav", msg)
+                consumer(id_key, msg)
+                consumer(msg.get_type(), msg)
 
         except (OSError, socket.error) as e:
             # Handle connection errors gracefully
@@ -1090,39 +1320,94 @@ class MavLinkExternalProxy(ExternalProxy):
             self._log_msgs.error(f"Error reading MAVLink messages: {e}")
             # Don't mark as disconnected here, let the heartbeat monitor handle it
             time.sleep(timeout)
-        
-        return out
 
     def _io_write_once(self, batches):
-        """Send queued MAVLink messages."""
+        """
+        Send queued MAVLink messages.
+
+        Messages drained in one cycle are packed back to back and written
+        with a single ``write`` (MAVLink frames are self-delimiting), so a
+        UDP link issues one ``sendto`` per cycle instead of one per message.
+        A write is flushed early once ``_tx_batch_max_bytes`` is reached to
+        keep datagrams below a typical MTU.
+        """
         if not self.master or not self.connected:
             return
-            
-        for key, msgs in batches.items():
+
+        with self._mav_lock:
+            mav = self.master.mav
+            buf = bytearray()
+            packed: List[Any] = []
+
+            for key, msgs in batches.items():
+                for msg in msgs:
+                    # Formatting a MAVLink message is expensive, so only touch it
+                    # when the TX log is enabled and rate limiting allows
+                    if self._log_msgs.isEnabledFor(logging.INFO):
+                        msg_type = msg.get_type() if hasattr(msg, 'get_type') else 'UNKNOWN'
+                        if self._should_log_message(msg_type):
+                            msg_id = msg.get_msgId() if hasattr(msg, 'get_msgId') else 'N/A'
+                            self._log_msgs.info("📤 MAVLink TX: %s (ID: %s) - %s", msg_type, msg_id, msg)
+
+                    try:
+                        frame = msg.pack(mav)
+                    except Exception as exc:
+                        self._log_msgs.error(
+                            "Failed to send MAVLink message %s: %s",
+                            key, exc
+                        )
+                        continue
+                    # Mirror MAVLink.send(): each packed frame takes the next sequence number
+                    mav.seq = (mav.seq + 1) % 256
+
+                    if buf and len(buf) + len(frame) > self._tx_batch_max_bytes:
+                        if not self._flush_tx(mav, buf, packed):
+                            return  # link is gone; drop the rest of this cycle
+                        buf = bytearray()
+                        packed = []
+                    buf += frame
+                    packed.append(msg)
+
+            if buf:
+                self._flush_tx(mav, buf, packed)
+
+    def _flush_tx(self, mav: Any, buf: bytearray, msgs: List[Any]) -> bool:
+        """
+        Write one batch of packed frames and update the link counters the way
+        ``MAVLink.send`` would.  Caller must hold ``_mav_lock``.
+
+        Returns
+        -------
+        bool
+            False if the connection was lost and the caller should stop writing.
+        """
+        try:
+            mav.file.write(bytes(buf))
+        except (OSError, socket.error) as e:
+            if e.errno in [errno.EBADF, errno.ECONNRESET, errno.ECONNREFUSED, errno.EPIPE]:
+                self._log_msgs.debug(f"MAVLink connection lost during write: {e}")
+                # Don't mark as disconnected here, let the heartbeat monitor handle it
+                return False
+            self._log_msgs.error(f"Unexpected error sending {len(msgs)} MAVLink message(s): {e}")
+            return True
+        except Exception as exc:
+            self._log_msgs.error(
+                "Failed to send %d MAVLink message(s): %s",
+                len(msgs), exc
+            )
+            return True
+
+        mav.total_packets_sent += len(msgs)
+        mav.total_bytes_sent += len(buf)
+        # Same guards as MAVLink.send: a callback assigned directly, without
+        # set_send_callback(), leaves args/kwargs as None and is not called
+        callback = mav.send_callback
+        args = mav.send_callback_args
+        kwargs = mav.send_callback_kwargs
+        if callback is not None and args is not None and kwargs is not None:
             for msg in msgs:
-                try:
-                    msg_type = msg.get_type() if hasattr(msg, 'get_type') else 'UNKNOWN'
-                    msg_id = msg.get_msgId() if hasattr(msg, 'get_msgId') else 'N/A'
-                    
-                    # Only log if rate limiting allows
-                    if self._should_log_message(msg_type):
-                        self._log_msgs.info(f"📤 MAVLink TX: {msg_type} (ID: {msg_id}) - {msg}")
-                    
-                    with self._mav_lock:
-                        self.master.mav.send(msg)
-                except (OSError, socket.error) as e:
-                    if e.errno in [errno.EBADF, errno.ECONNRESET, errno.ECONNREFUSED, errno.EPIPE]:
-                        self._log_msgs.debug(f"MAVLink connection lost during write: {e}")
-                        # Don't mark as disconnected here, let the heartbeat monitor handle it
-                        break  # Stop trying to send more messages
-                    else:
-                        self._log_msgs.error(f"Unexpected error sending MAVLink message {key}: {e}")
-                except Exception as exc:
-                    self._log_msgs.error(
-                        "Failed to send MAVLink message %s: %s",
-                        key, exc
-                    )
-                    # Don't mark as disconnected here, let the heartbeat monitor handle it
+                callback(msg, *args, **kwargs)
+        return True
 
     # ------------------- helpers exposed to petals --------- #
     def build_req_msg_long(self, message_id: int) -> mavutil.mavlink.MAVLink_command_long_message:
@@ -1138,6 +1423,7 @@ class MavLinkExternalProxy(ExternalProxy):
         -------
         mavutil.mavlink.MAVLink_command_long_message
             The MAVLink command message to request the specified message.
+            A new object on every call, so callers may change its fields.
         
         Raises
         ------
@@ -1146,21 +1432,29 @@ class MavLinkExternalProxy(ExternalProxy):
         """
         if not self.master or not self.connected:
             raise RuntimeError("MAVLink connection not established")
-                                
-        cmd = self.master.mav.command_long_encode(
-            self.master.target_system,
-            self.master.target_component,
-            mavutil.mavlink.MAV_CMD_REQUEST_MESSAGE, 
-            0,                # confirmation
-            float(message_id), # param1: Message ID to be streamed
-            0, 
-            0, 
-            0, 
-            0, 
-            0, 
-            0
-        )
-        return cmd
+
+        # Only the argument tuple is cached: a shared message object would
+        # let one caller's edits leak into every later request
+        cache_key = (self.master.target_system, self.master.target_component, int(message_id))
+        args = self._req_msg_long_cache.get(cache_key)
+        if args is None:
+            args = (
+                self.master.target_system,
+                self.master.target_component,
+                mavutil.mavlink.MAV_CMD_REQUEST_MESSAGE, 
+                0,                # confirmation
+                float(message_id), # param1: Message ID to be streamed
+                0, 
+                0, 
+                0, 
+                0, 
+                0, 
+                0
+            )
+            if len(self._req_msg_long_cache) >= 64:
+                self._req_msg_long_cache.clear()
+            self._req_msg_long_cache[cache_key] = args
+        return mavutil.mavlink.MAVLink_command_long_message(*args)
 
     def build_req_msg_log_request(self, message_id: int) -> mavutil.mavlink.MAVLink_log_request_list_message:
         """
@@ -2335,25 +2629,25 @@ class MavLinkExternalProxy(ExternalProxy):
         # send the request message after registering the handler
         self.send("mav", request_msg)
 
-        # create an asyncio task to monitor cancel_event if provided
+        # poll cancel_event from the loop instead of spawning a thread per call
+        cancel_watch: Optional[asyncio.Task] = None
         if cancel_event is not None:
-            def _cancel_checker():
+            async def _watch_cancel():
                 while not done.is_set():
                     if cancel_event.is_set():
-                        loop.call_soon_threadsafe(done.set)
+                        done.set()
                         break
-                    time.sleep(0.1)
+                    await asyncio.sleep(0.1)
 
-            cancel_checker = threading.Thread(target=_cancel_checker, daemon=True, name="_mavlink_send_and_wait_cancel_checker")
-            cancel_checker.start()
+            cancel_watch = asyncio.create_task(_watch_cancel())
 
         try:
             await asyncio.wait_for(done.wait(), timeout=timeout)
         except asyncio.TimeoutError:
             raise TimeoutError(f"No reply/condition for {match_key} in {timeout}s")
         finally:
-            if cancel_event is not None:
-                cancel_checker.join(timeout=0.1)
+            if cancel_watch is not None:
+                cancel_watch.cancel()
             self.unregister_handler(match_key, _handler)
 
     async def get_log_entries(
@@ -2789,7 +3083,7 @@ class MavLinkExternalProxy(ExternalProxy):
             buffer = bytearray()
 
         # sort messages and data by offset
-        sorted_msgs = sorted(zip(msgs_ofs, msgs_data), key=lambda x: x[0])
+        sorted_msgs = sorted(zip(msgs_ofs, msgs_data), key=itemgetter(0))
         msgs_ofs, msgs_data = zip(*sorted_msgs) if sorted_msgs else ([], [])
 
         # verify the integrity and reconstruct the log
@@ -3292,11 +3586,13 @@ class MavLinkFTPProxy(BaseProxy):
     def __init__(
         self,
         mavlink_proxy: MavLinkExternalProxy,
+        max_backlog: Optional[int] = None,
     ):
         self._log = logging.getLogger("MavLinkFTPProxy")
         self._loop: asyncio.AbstractEventLoop | None = None
         self._exe = ThreadPoolExecutor(max_workers=1, thread_name_prefix="MavLinkFTPProxyWorker")
         self.mavlink_proxy: MavLinkExternalProxy = mavlink_proxy
+        self._max_backlog = max_backlog   # MAVFTP gap re-reads in flight; None = pymavlink default
 
     # ------------------------ life-cycle --------------------- #
     async def start(self):
@@ -3322,7 +3618,8 @@ class MavLinkFTPProxy(BaseProxy):
                 self._log,
                 self.mavlink_proxy.master,
                 self.mavlink_proxy,
-                0
+                0,
+                max_backlog=self._max_backlog,
             )
         
         self._parser = await self._loop.run_in_executor(
@@ -3406,7 +3703,9 @@ class MavLinkFTPProxy(BaseProxy):
         # Attempt to list files via FTP
         try:
             raw = await self._loop.run_in_executor(self._exe, self._parser.list_ulogs, entries, base)
-            return [ULogInfo(**item) for item in raw]
+            # The parser builds these dicts from typed MAVFTP/LOG_ENTRY fields,
+            # so skip per-item validation on large listings
+            return [ULogInfo.model_construct(**item) for item in raw]
         except Exception as e:
             self._log.warning(f"Failed to list files via FTP: {e}")
             return []
@@ -3426,6 +3725,10 @@ class MavLinkFTPProxy(BaseProxy):
 
         Returns the Path actually written on success or None if cancelled.
         """
+        # Always (re)create the destination: it may have been removed since
+        # the last download, and exist_ok makes this a single stat when not.
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+
         # Check connection and attempt to establish if needed
 
         last_exception = None
@@ -3815,17 +4118,37 @@ def _match_ls_to_entries(
     entry_dict: Dict[int, Dict[str, int]],
     threshold_size: int = 4096,
 ) -> Dict[str, Tuple[int, int]]:
-    files  = sorted([(n, s) for n, s in ls_list], key=lambda x: x[1], reverse=True)
-    entries = sorted(entry_dict.items())
-    if len(files) != len(entries):
+    """
+    Pair each LOG_ENTRY with the ``.ulg`` file whose size is within
+    *threshold_size* bytes.
+
+    Both sides are sorted by size once and walked with two pointers, so
+    matching is O(n log n) rather than a rescan of the file list per entry.
+    Entries without a close-enough file are left out of the result.
+
+    Raises
+    ------
+    ValueError
+        If the number of files and entries differ.
+    """
+    files = list(ls_list)
+    if len(files) != len(entry_dict):
         raise ValueError("ls and entry counts differ; can't match safely")
+    files.sort(key=itemgetter(1))
+    entries = sorted(entry_dict.items(), key=lambda kv: (kv[1]['size'], kv[0]))
     mapping = {}
-    for log_id, info in entries:
-        for i, (name, sz) in enumerate(files):
-            if abs(sz - info['size']) <= threshold_size:
-                files.pop(i)
-                mapping[log_id] = (name, sz, info['utc'])
-                break
+    i = j = 0
+    while i < len(files) and j < len(entries):
+        name, sz = files[i]
+        log_id, info = entries[j]
+        if abs(sz - info['size']) <= threshold_size:
+            mapping[log_id] = (name, sz, info['utc'])
+            i += 1
+            j += 1
+        elif sz < info['size']:
+            i += 1   # file too small for any remaining entry
+        else:
+            j += 1   # entry too small for any remaining file
     return mapping
 
 class _BlockingParser:
@@ -3842,38 +4165,91 @@ class _BlockingParser:
             logger: logging.Logger,
             master: mavutil.mavserial,
             mavlink_proxy: MavLinkExternalProxy,
-            debug: int = 0
+            debug: int = 0,
+            burst_read_size: int = 239,
+            max_backlog: Optional[int] = None,
         ):
+        """
+        Parameters
+        ----------
+        burst_read_size : int
+            Payload bytes per packet in a burst read.  239 is the MAVFTP
+            ceiling (pymavlink clamps anything larger); a single burst
+            request already streams the whole file.
+        max_backlog : Optional[int]
+            Outstanding gap re-reads allowed while a burst is still running.
+            Raise on clean, fast links; None keeps the pymavlink default.
+        """
         self._log = logger.getChild("BlockingParser")
         self.master = master
         self.proxy = mavlink_proxy
         self.root_sd_path = self.proxy.root_sd_path
-        # try three times to init MAVFTP
+        self._debug = debug
+        self._burst_read_size = burst_read_size
+        self._max_backlog = max_backlog
+        self.ftp = None
         try:
-            for _ in range(3):
-                try:
-                    if self.master is None or not self.proxy.connected:
-                        raise RuntimeError("MAVLink master not initialized MAVFTP proxy failed")
-                    
-                    with self.proxy._mav_lock:
-                        self.ftp = mavftp.MAVFTP(
-                            self.master, self.master.target_system, self.master.target_component
-                        )
-                    break
-                except Exception as e:
-                    self._log.warning(f"MAVFTP init attempt failed: {e}")
+            self._open_ftp(attempts=3)
+        except Exception as e:
+            self._log.error(f"Failed to initialize MAVFTP: {e}")
+
+    def _open_ftp(self, attempts: int = 3) -> None:
+        """
+        Create the MAVFTP session on ``self.master`` and apply our settings.
+
+        The link itself is owned by the MAVLink proxy, so this never opens a
+        connection or waits for a heartbeat; it only binds MAVFTP to it.
+        """
+        for n in range(attempts):
+            try:
+                if self.master is None or not self.proxy.connected:
+                    raise RuntimeError("MAVLink master not initialized MAVFTP proxy failed")
+                
+                with self.proxy._mav_lock:
+                    self.ftp = mavftp.MAVFTP(
+                        self.master, self.master.target_system, self.master.target_component
+                    )
+                break
+            except Exception as e:
+                self._log.warning(f"MAVFTP init attempt failed: {e}")
+                if n < attempts - 1:
                     time.sleep(1)
-            else:
-                raise RuntimeError("MAVFTP init failed after 3 attempts")
+        else:
+            raise RuntimeError(f"MAVFTP init failed after {attempts} attempts")
 
-            self._log.info("MAVFTP initialized successfully")
-            self.ftp.ftp_settings.debug            = debug
-            self.ftp.ftp_settings.retry_time       = 0.2   # 200 ms instead of 1 s
-            self.ftp.ftp_settings.burst_read_size  = 239
-            self.ftp.burst_size                    = 239
+        self._log.info("MAVFTP initialized successfully")
+        self.ftp.ftp_settings.debug            = self._debug
+        self.ftp.ftp_settings.retry_time       = 0.2   # 200 ms instead of 1 s
+        self.ftp.ftp_settings.burst_read_size  = self._burst_read_size
+        self.ftp.burst_size                    = self._burst_read_size
+        if self._max_backlog is not None:
+            self.ftp.ftp_settings.max_backlog  = self._max_backlog
 
-        except Exception as e:
-            self._log.error(f"Failed to initialize MAVFTP: {e}")
+    def _rebind_connection(self) -> bool:
+        """
+        Follow the proxy onto its current link after a reconnect.
+
+        The proxy replaces its ``master`` when it reconnects, which leaves this
+        parser (and its MAVFTP session) pointing at the closed one.  Re-bind
+        MAVFTP to the new master instead of retrying on the dead descriptor.
+
+        Returns
+        -------
+        bool
+            False if the proxy has no usable connection right now.
+        """
+        master = self.proxy.master
+        if master is None or not self.proxy.connected:
+            return False
+        if master is not self.master or self.ftp is None:
+            self._log.info("MAVLink link changed, re-binding MAVFTP")
+            self.master = master
+            try:
+                self._open_ftp(attempts=1)
+            except Exception as e:
+                self._log.warning(f"Failed to re-bind MAVFTP: {e}")
+                return False
+        return True
 
     @property
     def system_id(self):          # convenience for log message in proxy.start()
@@ -3902,15 +4278,13 @@ class _BlockingParser:
                 # sort the mapping by utc descending
                 mapping = sorted(
                     mapping.values(),
-                    key=lambda x: x[2],  # sort by utc (index 2)
+                    key=itemgetter(2),  # sort by utc (index 2)
                     reverse=True
                 )
-                result = []
-                for i, (name, size, utc) in enumerate(mapping):
-                    result.append(
-                        dict(index=i, remote_path=name, size_bytes=size, utc=utc)
-                    )
-                return result
+                return [
+                    dict(index=i, remote_path=name, size_bytes=size, utc=utc)
+                    for i, (name, size, utc) in enumerate(mapping)
+                ]
             except ValueError as e:
                 self._log.warning(f"Failed to match files with log entries: {e}")
                 # Fall through to basic file listing
@@ -3935,27 +4309,45 @@ class _BlockingParser:
         """Blocking download with retry + tmp-file recovery with cancellation support."""
 
         # ------------------------------------------------------------------ #
+        # MAVFTP reports progress for every burst packet; forward at most one
+        # update per 1 % step or 100 ms so the event loop is not woken
+        # hundreds of times a second.
+        last_frac = -1.0
+        last_t = 0.0
+
         def _progress_cb(frac: float | None):
+            nonlocal last_frac, last_t
             if frac is None or on_progress is None:
                 return
             # Check for cancellation
             if cancel_event and cancel_event.is_set():
                 # Use our custom exception to signal cancellation
                 raise DownloadCancelledException("Download cancelled by user")
-                
+
+            now = time.monotonic()
+            if frac < 1.0 and frac - last_frac < 0.01 and now - last_t < 0.1:
+                return
+            last_frac, last_t = frac, now
+
             asyncio.run_coroutine_threadsafe(
                 on_progress(frac),
                 loop=self.proxy._loop
             )
         # ------------------------------------------------------------------ #
 
+        temp_path = local_path.with_name(local_path.name + ".part")
+        ftp = self.ftp
+        default_temp_filename = ftp.temp_filename
         try:
             self._log.info("Downloading %s → %s", remote_path, local_path)
-            local_path.parent.mkdir(parents=True, exist_ok=True)
-            
+
             with self.proxy._mav_lock:
                 with self.proxy._download_lock:
 
+                    # Stage MAVFTP's temp file beside the destination instead of
+                    # its default /tmp path: a large log stays off a RAM-backed
+                    # /tmp and temp-file recovery is a same-filesystem rename
+                    ftp.temp_filename = str(temp_path)
                     ret = self.ftp.cmd_get(
                         [remote_path, str(local_path.absolute())],
                         progress_callback=lambda x: _progress_cb(x)
@@ -3974,6 +4366,9 @@ class _BlockingParser:
 
                     # Process the reply with a try-except to handle potential issues
                     try:
+                        # timeout=0 means "no overall deadline", not a busy poll:
+                        # each recv_match inside blocks for up to 0.1 s, and a
+                        # fixed deadline would abort large logs mid-transfer.
                         result = self.ftp.process_ftp_reply(ret.operation_name, timeout=0)
                     
                         if result.return_code != 0:
@@ -4002,8 +4397,15 @@ class _BlockingParser:
                         # handle temp-file move failure
                         tmp = Path(self.ftp.temp_filename)
                         if tmp.exists():
-                            shutil.move(tmp, local_path)
-                            self._log.warning("Temp file recovered to %s", local_path)
+                            try:
+                                # same filesystem: O(1) atomic rename
+                                os.replace(tmp, local_path)
+                                how = "renamed"
+                            except OSError:
+                                # e.g. EXDEV across filesystems: copy + delete
+                                shutil.move(str(tmp), str(local_path))
+                                how = "copied"
+                            self._log.warning("Temp file recovered to %s (%s)", local_path, how)
 
                     self._reset_ftp_state() # for next download
 
@@ -4066,6 +4468,13 @@ class _BlockingParser:
             # Re-raise the original exception
             raise
 
+        finally:
+            # MAVFTP leaves its temp file behind even after a good download;
+            # point the shared MAVFTP object back at its own temp path so
+            # later commands don't reuse the deleted one
+            temp_path.unlink(missing_ok=True)
+            ftp.temp_filename = default_temp_filename
+
     # 3) clear error logs ---------------------------------------------------- #
     def clear_error_logs(self, base: str = "fs/microsd") -> None:
         fail_logs = self._list_fail_logs(base)
@@ -4220,28 +4629,64 @@ class _BlockingParser:
         if hasattr(self.ftp, 'burst_state'):
             self.ftp.burst_state = 0
 
-    def _walk_ulogs(self, base="fs/microsd/log") -> Generator[Tuple[str, int], None, None]:
-        dates = self._ls(base)
-        for date, _, is_dir in dates:
-            if not is_dir:
-                continue
-            try:
-                entries = self._ls(f"{base}/{date}", retries=1)
-            except Exception as exc:
-                self._log.warning(
-                    f"Skipping {base}/{date}: listing failed ({exc})"
-                )
-                continue
-            for name, size, is_dir in entries:
-                if not is_dir and name.endswith(".ulg"):
-                    yield f"{base}/{date}/{name}", size
+    def _walk_ulogs(self, base="fs/microsd/log") -> Iterator[Tuple[str, int]]:
+        """
+        Lazily yield ``(remote_path, size)`` for every ``.ulg`` one date
+        directory below *base*.
+
+        Only the top-level listing and the current date directory's listing
+        are held at a time; each date is listed when the consumer reaches it.
+        """
+        dates = (date for date, _, is_dir in self._ls(base) if is_dir)
+        return chain.from_iterable(self._ulogs_in(base, date) for date in dates)
+
+    def _ulogs_in(self, base: str, date: str) -> Iterator[Tuple[str, int]]:
+        directory = f"{base}/{date}"
+        try:
+            entries = self._ls(directory, retries=1)
+        except Exception as exc:
+            self._log.warning(
+                f"Skipping {directory}: listing failed ({exc})"
+            )
+            return iter(())
+        prefix = directory + "/"   # built once, not per file
+        return (
+            (prefix + name, size)
+            for name, size, is_dir in entries
+            if not is_dir and name.endswith(".ulg")
+        )
+
+    @staticmethod
+    def _dedupe_listing(list_result) -> List[Tuple[str, int, bool]]:
+        """
+        Convert a MAVFTP ``list_result`` into ``(name, size, is_dir)`` tuples,
+        dropping repeats (seen when a listing page is re-sent) while keeping
+        the vehicle's order.
+        """
+        seen = set()
+        out = []
+        for e in list_result:
+            item = (e.name, e.size_b, e.is_dir)
+            if item not in seen:
+                seen.add(item)
+                out.append(item)
+        return out
 
     # plain MAVFTP ls
     def _ls(self, path: str, retries=5, delay=2.0):
+        """
+        List *path* over MAVFTP, retrying up to *retries* times.
+
+        Retries after a command failure back off exponentially from 0.25 s
+        up to *delay*, so a transient NACK costs a fraction of a second.
+        When the link itself is down, every retry waits the full *delay* so
+        a reconnect has time to land before the next attempt.
+        """
         for n in range(1, retries + 1):
+            wait = min(delay, 0.25 * 2 ** (n - 1))
             try:
                 # Check if connection and master are valid before attempting operation
-                if not self.master or not self.proxy.connected:
+                if not self._rebind_connection():
                     self._log.warning(f"Connection not available, skipping ls for {path} (attempt {n}/{retries})")
                     if n >= retries:
                         return []  # Return empty list if all retries exhausted
@@ -4276,7 +4721,7 @@ class _BlockingParser:
                             
                         ack = self.ftp.cmd_list([path])
                         if ack.return_code == 0:
-                            return list(set((e.name, e.size_b, e.is_dir) for e in self.ftp.list_result))
+                            return self._dedupe_listing(self.ftp.list_result)
                         else:
                             # FTP command failed - check if it's a retryable error
                             if ack.return_code == 1:
@@ -4294,6 +4739,7 @@ class _BlockingParser:
                 # Handle connection errors gracefully
                 if e.errno in [errno.EBADF, errno.ECONNRESET, errno.ECONNREFUSED, errno.EPIPE]:
                     self._log.warning(f"Connection lost during ls operation")
+                    wait = delay
                     if n >= retries:
                         raise RuntimeError(f"ls('{path}') failed after {retries} attempts due to connection loss")
                 else:
@@ -4306,8 +4752,8 @@ class _BlockingParser:
             
             # If we reach here, the operation failed but we can retry
             if n < retries:
-                self._log.info(f"Retrying ls operation for {path} in {delay}s (attempt {n+1}/{retries})")
-                time.sleep(delay)
+                self._log.info(f"Retrying ls operation for {path} in {wait}s (attempt {n+1}/{retries})")
+                time.sleep(wait)
 
         raise RuntimeError(f"ls('{path}') failed {retries}×")
 
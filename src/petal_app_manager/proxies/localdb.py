@@ -18,13 +18,11 @@ import concurrent.futures
 import http.client
 import json
 import logging
-import platform
-import subprocess
-from pathlib import Path
 import os
 
 from .base import BaseProxy
 from ..organization_manager import get_organization_manager
+from ..utils import get_machine_id
 
 class LocalDBProxy(BaseProxy):
     """
@@ -112,29 +110,7 @@ class LocalDBProxy(BaseProxy):
     def _get_machine_id(self) -> Optional[str]:
         """Get the machine ID using the machine ID executable."""
         try:
-            # Determine architecture
-            arch = platform.machine().lower()
-            is_arm = "aarch64" in arch
-            
-            # Build path to executable
-            utils_dir = Path(__file__).parent.parent / "utils"
-            machine_id_exe = utils_dir / (
-                "machineid_arm" if is_arm else "machineid_x86"
-            )
-            
-            # Check if executable exists
-            if not machine_id_exe.exists():
-                self.log.error(f"Machine ID executable not found at {machine_id_exe}")
-                return None
-            
-            # Execute and get output
-            result = subprocess.run(
-                [str(machine_id_exe)], 
-                capture_output=True, 
-                text=True,
-                check=True
-            )
-            return result.stdout.strip()
+            return get_machine_id()
         except Exception as e:
             self.log.error(f"Failed to get machine ID: {e}")
             return None
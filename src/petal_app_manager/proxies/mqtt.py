@@ -28,7 +28,7 @@ import requests
 from fastapi import FastAPI, HTTPException, APIRouter
 from pydantic import BaseModel
 
-from .base import BaseProxy
+from .base import BaseProxy, shared_executor
 from ..organization_manager import get_organization_manager
 
 class MessageCallback(BaseModel):
@@ -102,6 +102,10 @@ class MQTTProxy(BaseProxy):
         self._shutdown_flag = False
         
         self._device_topics = {}
+
+        # Identity is resolved in start(); OrganizationManager owns the lookup
+        self.robot_instance_id: Optional[str] = None
+        self.device_id: Optional[str] = None
         
         # Health monitoring
         self._health_monitor_task = None
@@ -109,6 +113,8 @@ class MQTTProxy(BaseProxy):
 
         self._loop = None
         self._exe = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="MQTTProxy")
+        # Keep-alive connection pool to the TypeScript client
+        self._http = requests.Session()
         self.log = logging.getLogger("MQTTProxy")
         
         # Setup callback router in __init__ so it's available for registration with main app
@@ -200,6 +206,7 @@ class MQTTProxy(BaseProxy):
         # Shutdown executor
         if self._exe:
             self._exe.shutdown(wait=False)
+        self._http.close()
             
         self.log.info("MQTTProxy stopped")
 
@@ -342,7 +349,7 @@ class MQTTProxy(BaseProxy):
                 if cpu_heavy:
                     async def _offloaded():
                         await self._loop.run_in_executor(
-                            self._exe, lambda: asyncio.run(callback(topic, payload))
+                            shared_executor(), lambda: asyncio.run(callback(topic, payload))
                         )
                     self._loop.create_task(_offloaded())
                 else:
@@ -359,7 +366,7 @@ class MQTTProxy(BaseProxy):
         try:
             response = await self._loop.run_in_executor(
                 self._exe,
-                lambda: requests.get(f"{self.ts_base_url}/health", timeout=self.request_timeout)
+                lambda: self._http.get(f"{self.ts_base_url}/health", timeout=self.request_timeout)
             )
             return response.status_code == 200
         except Exception as e:
@@ -432,7 +439,7 @@ class MQTTProxy(BaseProxy):
             response = await self._loop.run_in_executor(
                 self._exe,
                 functools.partial(
-                    requests.request,
+                    self._http.request,
                     method=method,
                     url=url,
                     json=data,
@@ -14,7 +14,7 @@ import logging
 
 import redis
 
-from .base import BaseProxy
+from .base import BaseProxy, shared_executor
 
 
 class RedisProxy(BaseProxy):
@@ -573,7 +573,7 @@ class RedisProxy(BaseProxy):
                 if cpu_heavy:
                     async def _offloaded():
                         await self._loop.run_in_executor(
-                            self._exe, lambda: asyncio.run(callback(channel, data))
+                            shared_executor(), lambda: asyncio.run(callback(channel, data))
                         )
                     asyncio.run_coroutine_threadsafe(_offloaded(), self._loop)
                 else:
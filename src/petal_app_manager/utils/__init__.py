@@ -0,0 +1,51 @@
+"""
+Shared helpers for petal-app-manager.
+"""
+
+from __future__ import annotations
+import platform
+import subprocess
+import threading
+from pathlib import Path
+from typing import Optional
+
+# Resolved once at import: the architecture cannot change while we run
+MACHINE_ID_EXE = Path(__file__).parent / (
+    "machineid_arm" if "aarch64" in platform.machine().lower() else "machineid_x86"
+)
+
+_machine_id: Optional[str] = None
+_machine_id_lock = threading.Lock()
+
+
+def get_machine_id() -> str:
+    """
+    Return this machine's ID from the bundled ``machineid`` executable.
+
+    The ID does not change for the life of the process, so the first
+    successful result is cached and later calls skip the subprocess.
+    Failures are not cached.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the executable for this architecture is missing.
+    subprocess.SubprocessError
+        If the executable fails or does not answer within 2 s.
+    """
+    global _machine_id
+    if _machine_id is not None:
+        return _machine_id
+    with _machine_id_lock:
+        if _machine_id is None:
+            if not MACHINE_ID_EXE.exists():
+                raise FileNotFoundError(f"Machine ID executable not found at {MACHINE_ID_EXE}")
+            result = subprocess.run(
+                [str(MACHINE_ID_EXE)],
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=2,
+            )
+            _machine_id = result.stdout.strip()
+    return _machine_id
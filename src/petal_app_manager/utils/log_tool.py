@@ -48,6 +48,13 @@ logger = logging.getLogger("loggingtool")
 # Registry of open channels to ensure proper cleanup
 _open_channels = weakref.WeakSet()
 
+# Write buffer per channel file; full buffers are written in one syscall
+_FILE_BUFFER_BYTES = 1 << 20
+
+# Wall clock jumping ahead of the monotonic anchor by more than this (e.g. the
+# first NTP/GPS sync on a board without an RTC) moves the anchor forward
+_REANCHOR_NS = 1_000_000_000
+
 class LogChannel:
     """
     A channel for logging scalar or multi-dimensional signals to a CSV file.
@@ -63,7 +70,8 @@ class LogChannel:
         file_name: Optional[str] = None,
         use_ms: bool = True,
         buffer_size: int = 100,
-        append: bool = False
+        append: bool = False,
+        flush_every: bool = False
     ):
         """
         Initialize a logging channel.
@@ -82,6 +90,10 @@ class LogChannel:
             Number of records to buffer before writing to disk, by default 100
         append : bool, optional
             If True, append to an existing file rather than creating a new one, by default False
+        flush_every : bool, optional
+            If True, flush the OS file buffer every time *buffer_size* records are
+            written; otherwise data reaches the file when the 1 MiB write buffer
+            fills, on :py:meth:`flush`, or on :py:meth:`close`. By default False
         
         Raises
         ------
@@ -96,7 +108,15 @@ class LogChannel:
         self.headers = [headers] if isinstance(headers, str) else headers
         self.is_scalar = isinstance(headers, str)
         self.use_ms = use_ms
+        # Row timestamps are a wall-clock anchor plus monotonic time, so they
+        # stay epoch-based but never step backwards. The anchor is taken at
+        # open and moved forward on a buffer write if the wall clock has
+        # since jumped ahead by over a second (clock sync after boot);
+        # backward steps are ignored
+        self._t0_ns = time.time_ns() - time.monotonic_ns()
+        self._ts_div = 1_000_000 if use_ms else 1_000_000_000
         self.buffer_size = buffer_size
+        self.flush_every = flush_every
         
         # Create directory
         self.base_dir = Path(base_dir)
@@ -117,15 +137,19 @@ class LogChannel:
         # Set up headers for CSV - always include timestamp as first column
         csv_headers = ["timestamp"]
         csv_headers.extend(self.headers)
+
+        # Data rows are numeric, so they skip csv.writer's per-cell quoting
+        # checks: one format string per row, same "\r\n" terminator.
+        self._format_row = (",".join(["{}"] * len(csv_headers)) + "\r\n").format
         
         # Initialize buffer and file
         self.buffer = []
         self.file_mode = 'a' if append else 'w'
         self.file = None
-        self.writer = None
+        self._writer = None
         self._open_file()
         
-        # Write headers if in write mode
+        # Write headers if in write mode; buffered rows bypass csv.writer
         if self.file_mode == 'w':
             self.writer.writerow(csv_headers)
             self.file.flush()
@@ -135,14 +159,25 @@ class LogChannel:
         logger.debug(f"Created log channel for {self.headers} at {self.file_path}")
     
     def _open_file(self):
-        """Open the CSV file and create writer."""
+        """Open the CSV file."""
         try:
-            self.file = open(self.file_path, self.file_mode, newline='')
-            self.writer = csv.writer(self.file)
+            self.file = open(self.file_path, self.file_mode, newline='', buffering=_FILE_BUFFER_BYTES)
         except Exception as e:
             logger.error(f"Failed to open log file {self.file_path}: {e}")
             raise
     
+    @property
+    def writer(self):
+        """
+        ``csv.writer`` over the channel file, created on first use.
+
+        Kept for code that writes rows directly; call :py:meth:`flush`
+        first so those rows land after the buffered ones.
+        """
+        if self._writer is None and self.file is not None:
+            self._writer = csv.writer(self.file)
+        return self._writer
+    
     def push(self, value: Union[float, int, List[float], List[int]]) -> None:
         """
         Record a value to this channel.
@@ -165,43 +200,54 @@ class LogChannel:
         if self.is_scalar:
             if isinstance(value, (list, tuple)):
                 raise ValueError(f"Expected scalar value but got {value}")
-            data = [value]
         else:
             if not isinstance(value, (list, tuple)):
                 raise ValueError(f"Expected list but got {value}")
             if len(value) != len(self.headers):
                 raise ValueError(f"Expected {len(self.headers)} values but got {len(value)}")
-            data = value
             
-        # Always add timestamp as the first column (Unix epoch time)
-        if self.use_ms:
-            # Millisecond precision (int)
-            timestamp = int(time.time() * 1000)
-        else:
-            # Second precision (int)
-            timestamp = int(time.time())
+        # Always add timestamp as the first column (Unix epoch time, int ms or s)
+        timestamp = (self._t0_ns + time.monotonic_ns()) // self._ts_div
             
-        row = [timestamp]
-        row.extend(data)
-        
-        # Add to buffer
-        self.buffer.append(row)
+        # Rows are tuples built in one step; flush formats them as-is
+        if self.is_scalar:
+            self.buffer.append((timestamp, value))
+        else:
+            self.buffer.append((timestamp, *value))
         
-        # Flush if buffer is full
+        # Hand the records to the file once the buffer is full
         if len(self.buffer) >= self.buffer_size:
-            self.flush()
-    
-    def flush(self) -> None:
-        """Write all buffered values to the file."""
+            if self.flush_every:
+                self.flush()
+            else:
+                self._write_buffer()
+
+    def _write_buffer(self) -> None:
+        """Move buffered records into the file's write buffer (no OS flush)."""
         if self.file is None or not self.buffer:
             return
-            
+
+        t0_ns = time.time_ns() - time.monotonic_ns()
+        if t0_ns - self._t0_ns > _REANCHOR_NS:
+            self._t0_ns = t0_ns
+
         try:
-            self.writer.writerows(self.buffer)
-            self.file.flush()
+            fmt = self._format_row
+            self.file.write("".join([fmt(*row) for row in self.buffer]))
             self.buffer = []
         except Exception as e:
             logger.error(f"Failed to write to log file {self.file_path}: {e}")
+
+    def flush(self) -> None:
+        """Write all buffered values to the file."""
+        if self.file is None:
+            return
+
+        self._write_buffer()
+        try:
+            self.file.flush()
+        except Exception as e:
+            logger.error(f"Failed to flush log file {self.file_path}: {e}")
     
     def close(self) -> None:
         """Close the channel and its associated file."""
@@ -210,9 +256,13 @@ class LogChannel:
             
         try:
             self.flush()
+            try:
+                os.fsync(self.file.fileno())
+            except OSError as e:
+                logger.warning(f"Could not fsync log file {self.file_path}: {e}")
             self.file.close()
             self.file = None
-            self.writer = None
+            self._writer = None
             logger.debug(f"Closed log channel at {self.file_path}")
         except Exception as e:
             logger.error(f"Error closing log file {self.file_path}: {e}")
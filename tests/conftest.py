@@ -2,6 +2,27 @@
 import os
 import pytest
 import tempfile
+from pathlib import Path
+
+@pytest.fixture(scope="session")
+def client():
+    """One TestClient for the config API router, shared by the whole session."""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from petal_app_manager.api.config_api import router
+
+    app = FastAPI()
+    app.include_router(router)
+    # entered once so lifespan startup/shutdown run once per session
+    with TestClient(app) as c:
+        yield c
+
+@pytest.fixture
+def mem_tmp_path():
+    """A fresh temporary directory, on /dev/shm (tmpfs) when available."""
+    root = "/dev/shm" if os.access("/dev/shm", os.W_OK) else None
+    with tempfile.TemporaryDirectory(prefix="petal_test_", dir=root) as d:
+        yield Path(d)
 
 def pytest_addoption(parser):
     parser.addoption(
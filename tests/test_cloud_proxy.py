@@ -38,6 +38,54 @@ async def proxy() -> AsyncGenerator[CloudDBProxy, None]:
         yield proxy
         await proxy.stop()
 
+@pytest.mark.asyncio
+async def test_get_access_token_single_flight():
+    """Concurrent cache misses share one token request."""
+    proxy = CloudDBProxy(
+        access_token_url="http://example.com/token",
+        endpoint="https://api.example.com",
+    )
+    proxy._loop = asyncio.get_running_loop()
+
+    expires = time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime(time.time() + 3600))
+    response = MagicMock(status=200)
+    response.read.return_value = json.dumps({"accessToken": "tok", "expiresAt": expires}).encode()
+
+    with patch('petal_app_manager.proxies.cloud.http.client.HTTPConnection') as conn_cls:
+        conn_cls.return_value.getresponse.side_effect = lambda: (time.sleep(0.05), response)[1]
+        results = await asyncio.gather(*(proxy._get_access_token() for _ in range(5)))
+
+    assert all(r["accessToken"] == "tok" for r in results)
+    assert conn_cls.return_value.request.call_count == 1
+    proxy._exe.shutdown(wait=False)
+
+@pytest.mark.asyncio
+async def test_get_access_token_expiry_is_utc(monkeypatch):
+    """The 'Z' expiresAt is read as UTC whatever the host timezone."""
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    try:
+        proxy = CloudDBProxy(
+            access_token_url="http://example.com/token",
+            endpoint="https://api.example.com",
+        )
+        proxy._loop = asyncio.get_running_loop()
+
+        expires = time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime(time.time() + 3600))
+        response = MagicMock(status=200)
+        response.read.return_value = json.dumps({"accessToken": "tok", "expiresAt": expires}).encode()
+
+        with patch('petal_app_manager.proxies.cloud.http.client.HTTPConnection') as conn_cls:
+            conn_cls.return_value.getresponse.return_value = response
+            await proxy._get_access_token()
+
+        # expiresAt minus the 10-minute safety margin
+        assert abs(proxy._session_cache['expires_at'] - (time.time() + 3000)) < 5
+        proxy._exe.shutdown(wait=False)
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
 @pytest.mark.asyncio
 async def test_get_access_token_caching():
     """Test that access tokens are properly cached."""
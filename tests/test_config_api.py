@@ -1,54 +1,41 @@
+import copy
 import pytest
 import json
 import tempfile
-import yaml
 import importlib.metadata as md
+from contextlib import contextmanager
 from pathlib import Path
-from unittest.mock import patch, mock_open
-from fastapi.testclient import TestClient
+from types import MappingProxyType
+from unittest.mock import patch
 
-from src.petal_app_manager.api.config_api import router
-from fastapi import FastAPI
+from petal_app_manager.api import config_api
 
-# Create a test app with our config router
-# Note: Named app_under_test to avoid pytest collection (test_ prefix)
-app_under_test = FastAPI()
-app_under_test.include_router(router)
-
-# Create test client
-client = TestClient(app_under_test)
-
-@pytest.fixture
-def sample_config():
-    return {
-        "enabled_proxies": ["redis", "ext_mavlink", "db"],
-        "enabled_petals": ["petal_warehouse", "mission_planner"],
-        "petal_dependencies": {
-            "petal_warehouse": ["redis", "ext_mavlink"],
-            "flight_records": ["redis", "cloud"],
-            "mission_planner": ["redis", "ext_mavlink"]
-        }
+# Read-only; build variants with {**SAMPLE_CONFIG, key: value}
+SAMPLE_CONFIG = MappingProxyType({
+    "enabled_proxies": ["redis", "ext_mavlink", "db"],
+    "enabled_petals": ["petal_warehouse", "mission_planner"],
+    "petal_dependencies": {
+        "petal_warehouse": ["redis", "ext_mavlink"],
+        "flight_records": ["redis", "cloud"],
+        "mission_planner": ["redis", "ext_mavlink"]
     }
+})
 
-@pytest.fixture
-def mock_config_file(sample_config):
-    """Mock the config file reading/writing"""
-    config_data = yaml.safe_dump(sample_config)
-    
-    def mock_file_operations(filename, mode='r', *args, **kwargs):
-        if 'r' in mode:
-            return mock_open(read_data=config_data)()
-        elif 'w' in mode:
-            # For write operations, we'll just return a mock that captures the data
-            mock_file = mock_open()()
-            return mock_file
-    
-    return mock_file_operations
+def normalize(deps):
+    """Dependency mapping with order-insensitive values."""
+    return {k: frozenset(v) for k, v in deps.items()}
+
+@contextmanager
+def patched_config(config):
+    """Serve *config* to config_api in memory; writes are dropped."""
+    with patch.object(config_api, "_load_config", lambda: copy.deepcopy(dict(config))), \
+         patch.object(config_api, "_save_config"):
+        yield
 
-def test_get_config_status(sample_config, mock_config_file):
+def test_get_config_status(client):
     """Test getting the current configuration status"""
     
-    with patch("builtins.open", mock_config_file):
+    with patched_config(SAMPLE_CONFIG):
         response = client.get("/api/petal-proxies-control/status")
     
     assert response.status_code == 200
@@ -57,91 +44,50 @@ def test_get_config_status(sample_config, mock_config_file):
     assert "enabled_proxies" in data
     assert "enabled_petals" in data
     assert "petal_dependencies" in data
+    assert normalize(data["petal_dependencies"]) == normalize(SAMPLE_CONFIG["petal_dependencies"])
     
-    assert set(data["enabled_proxies"]) == set(sample_config["enabled_proxies"])
-    assert set(data["enabled_petals"]) == set(sample_config["enabled_petals"])
-
-def test_enable_petals_success(sample_config, mock_config_file):
-    """Test successfully enabling petals with met dependencies"""
-    
-    with patch("builtins.open", mock_config_file):
-        response = client.post("/api/petal-proxies-control/petals/control", json={
-            "petals": ["flight_records"],
-            "action": "ON"
-        })
-    
-    assert response.status_code == 200
-    data = response.json()
-    
-    assert data["success"] is False  # Should fail because cloud proxy is not enabled
-    assert "errors" in data
-    assert any("missing dependencies" in error for error in data["errors"])
-
-def test_enable_petals_missing_dependencies(sample_config, mock_config_file):
-    """Test enabling petals with missing dependencies"""
-    
-    with patch("builtins.open", mock_config_file):
-        response = client.post("/api/petal-proxies-control/petals/control", json={
-            "petals": ["flight_records"],
-            "action": "ON"
-        })
-    
-    assert response.status_code == 200
-    data = response.json()
-    
-    assert data["success"] is False
-    assert "errors" in data
-    assert any("missing dependencies ['cloud']" in error for error in data["errors"])
-
-def test_disable_petals_success(sample_config, mock_config_file):
-    """Test successfully disabling petals"""
-    
-    with patch("builtins.open", mock_config_file):
-        response = client.post("/api/petal-proxies-control/petals/control", json={
-            "petals": ["petal_warehouse"],
-            "action": "OFF"
-        })
-    
-    assert response.status_code == 200
-    data = response.json()
-    
-    assert data["success"] is True
-    assert len(data["results"]) == 1
-    assert "Disabled petal: petal_warehouse" in data["results"]
-
-def test_enable_proxies_success(sample_config, mock_config_file):
-    """Test successfully enabling proxies"""
-    
-    with patch("builtins.open", mock_config_file):
-        response = client.post("/api/petal-proxies-control/proxies/control", json={
-            "petals": ["cloud"],  # Using petals field for proxy names
-            "action": "ON"
-        })
-    
-    assert response.status_code == 200
-    data = response.json()
-    
-    assert data["success"] is True
-    assert len(data["results"]) == 1
-    assert "Enabled proxy: cloud" in data["results"]
+    assert set(data["enabled_proxies"]) == set(SAMPLE_CONFIG["enabled_proxies"])
+    assert set(data["enabled_petals"]) == set(SAMPLE_CONFIG["enabled_petals"])
 
-def test_disable_proxy_with_dependencies(sample_config, mock_config_file):
-    """Test disabling a proxy that petals depend on"""
-    
-    with patch("builtins.open", mock_config_file):
-        response = client.post("/api/petal-proxies-control/proxies/control", json={
-            "petals": ["redis"],  # Redis is required by enabled petals
-            "action": "OFF"
-        })
+@pytest.mark.parametrize(
+    "endpoint, payload, expected_success, expected_field, expected_items",
+    [
+        # flight_records needs the cloud proxy, which is not enabled
+        ("petals", {"petals": ["flight_records"], "action": "ON"},
+         False, "errors",
+         ["Cannot enable flight_records: missing dependencies ['cloud']. Enable those proxies first."]),
+        ("petals", {"petals": ["petal_warehouse"], "action": "OFF"},
+         True, "results", ["Disabled petal: petal_warehouse"]),
+        # proxy names travel in the petals field
+        ("proxies", {"petals": ["cloud"], "action": "ON"},
+         True, "results", ["Enabled proxy: cloud"]),
+        # redis is required by enabled petals, listed in sorted order
+        ("proxies", {"petals": ["redis"], "action": "OFF"},
+         False, "errors",
+         ["Cannot disable redis: required by petals ['mission_planner', 'petal_warehouse']. "
+          "Disable those first."]),
+    ],
+    ids=[
+        "enable_petal_missing_dependencies",
+        "disable_petal",
+        "enable_proxy",
+        "disable_proxy_with_dependents",
+    ],
+)
+def test_control(client, endpoint, payload, expected_success,
+                 expected_field, expected_items):
+    """Switching petals/proxies reports success and the reason per item"""
+    
+    with patched_config(SAMPLE_CONFIG):
+        response = client.post(f"/api/petal-proxies-control/{endpoint}/control", json=payload)
     
     assert response.status_code == 200
     data = response.json()
     
-    assert data["success"] is False
-    assert "errors" in data
-    assert any("required by petals" in error for error in data["errors"])
+    assert data["success"] is expected_success
+    assert data[expected_field] == expected_items
 
-def test_invalid_action():
+def test_invalid_action(client):
     """Test using an invalid action"""
     
     response = client.post("/api/petal-proxies-control/petals/control", json={
@@ -152,7 +98,7 @@ def test_invalid_action():
     assert response.status_code == 400
     assert "Action must be either 'ON' or 'OFF'" in response.json()["detail"]
 
-def test_empty_petals_list():
+def test_empty_petals_list(client):
     """Test with empty petals list"""
     
     response = client.post("/api/petal-proxies-control/petals/control", json={
@@ -163,10 +109,10 @@ def test_empty_petals_list():
     assert response.status_code == 400
     assert "At least one petal name must be provided" in response.json()["detail"]
 
-def test_batch_operations(sample_config, mock_config_file):
+def test_batch_operations(client):
     """Test enabling/disabling multiple petals at once"""
     
-    with patch("builtins.open", mock_config_file):
+    with patched_config(SAMPLE_CONFIG):
         # First enable cloud proxy
         response = client.post("/api/petal-proxies-control/proxies/control", json={
             "petals": ["cloud"],
@@ -187,24 +133,18 @@ def test_batch_operations(sample_config, mock_config_file):
     assert data["success"] is True
     assert len(data["results"]) == 0
 
-def test_list_all_components(sample_config, mock_config_file):
+def test_list_all_components(client):
     """Test the list all components endpoint"""
     
-    # Update sample config to include proxy dependencies
-    config_with_proxy_deps = sample_config.copy()
-    config_with_proxy_deps["proxy_dependencies"] = {
-        "db": ["cloud"],
-        "bucket": ["cloud"]
+    # Sample config plus proxy dependencies
+    config_with_proxy_deps = {
+        **SAMPLE_CONFIG,
+        "proxy_dependencies": {
+            "db": ["cloud"],
+            "bucket": ["cloud"]
+        },
     }
     
-    def mock_file_operations(path, mode="r"):
-        if "r" in mode:
-            mock_file = mock_open(read_data=yaml.safe_dump(config_with_proxy_deps))()
-            return mock_file
-        else:
-            mock_file = mock_open()()
-            return mock_file
-    
     # Mock entry points for petals
     class MockEntryPoint:
         def __init__(self, name):
@@ -216,7 +156,7 @@ def test_list_all_components(sample_config, mock_config_file):
         MockEntryPoint("mission_planner")
     ]
     
-    with patch("builtins.open", mock_file_operations), \
+    with patched_config(config_with_proxy_deps), \
          patch("importlib.metadata.entry_points") as mock_ep:
         
         mock_ep.return_value = mock_entry_points
@@ -244,8 +184,11 @@ def test_list_all_components(sample_config, mock_config_file):
     assert petal_dict["flight_records"]["enabled"] is False  # Not in enabled_petals
     
     # Check petal dependencies
-    assert petal_dict["petal_warehouse"]["dependencies"] == ["redis", "ext_mavlink"]
-    assert petal_dict["flight_records"]["dependencies"] == ["redis", "cloud"]
+    assert normalize({name: p["dependencies"] for name, p in petal_dict.items()}) == {
+        "petal_warehouse": frozenset({"redis", "ext_mavlink"}),
+        "flight_records": frozenset({"redis", "cloud"}),
+        "mission_planner": frozenset({"redis", "ext_mavlink"}),
+    }
     
     # Check proxy information
     proxy_names = [p["name"] for p in data["proxies"]]
@@ -261,13 +204,16 @@ def test_list_all_components(sample_config, mock_config_file):
     assert proxy_dict["cloud"]["enabled"] is False  # Not in enabled_proxies
     
     # Check proxy dependencies
-    assert proxy_dict["db"]["dependencies"] == ["cloud"]
-    assert proxy_dict["bucket"]["dependencies"] == ["cloud"]
+    proxy_deps = normalize({name: p["dependencies"] for name, p in proxy_dict.items()})
+    assert proxy_deps["db"] == frozenset({"cloud"})
+    assert proxy_deps["bucket"] == frozenset({"cloud"})
     
     # Check dependents (what depends on each proxy)
-    assert "petal:petal_warehouse" in proxy_dict["redis"]["dependents"]
-    assert "petal:flight_records" in proxy_dict["cloud"]["dependents"]
-    assert "proxy:db" in proxy_dict["cloud"]["dependents"]
+    dependents = normalize({name: p["dependents"] for name, p in proxy_dict.items()})
+    assert dependents["redis"] == frozenset({
+        "petal:petal_warehouse", "petal:flight_records", "petal:mission_planner",
+    })
+    assert dependents["cloud"] == frozenset({"petal:flight_records", "proxy:db", "proxy:bucket"})
     
     # Check totals
     assert data["total_petals"] == len(data["petals"])
@@ -5,6 +5,7 @@ from types import SimpleNamespace
 from typing import Any
 
 import pytest
+import pytest_asyncio
 from pymavlink import mavutil
 from pymavlink.dialects.v10 import common as mavlink
 from pymavlink.dialects.v20 import all as mavlink_v20
@@ -16,22 +17,26 @@ from petal_app_manager.proxies.external import (
     MavLinkExternalProxy
 )
 
-# @pytest.mark.hardware
-# def test_external_proxy():
-#     # Use a pytest fixture to run async test
-#     asyncio.run(_test_mavlink_proxy())
+# Encoder for test messages; never sends, so one instance serves every test
+_MAVLINK_ENCODER = mavlink.MAVLink(None)
+
+# Needs a MAVLink endpoint on udp:127.0.0.1:14551; run with --hardware
+@pytest.mark.hardware
+@pytest.mark.asyncio
+async def test_external_proxy():
+    await _test_mavlink_proxy()
 
 async def _test_mavlink_proxy():
     # Create proxy (use a local connection - adjust as needed)
     proxy = MavLinkExternalProxy(endpoint="udp:127.0.0.1:14551", baud=57600, maxlen=200, source_system_id=1, source_component_id=1)
     
-    # Track received heartbeats
-    heartbeats_received = []
+    loop = asyncio.get_running_loop()
+    got_heartbeat = asyncio.Event()
     
     # Register handler for HEARTBEAT messages
     async def heartbeat_handler(msg):
         print(f"Received HEARTBEAT: {msg}")
-        heartbeats_received.append(msg)
+        loop.call_soon_threadsafe(got_heartbeat.set)
     
     proxy.register_handler(str(mavlink_v20.MAVLINK_MSG_ID_HEARTBEAT), heartbeat_handler)
     
@@ -41,18 +46,15 @@ async def _test_mavlink_proxy():
     try:
         # Wait up to 5 seconds for a heartbeat
         print("Waiting for HEARTBEAT messages...")
-        timeout = time.time() + 5
-        while time.time() < timeout and not heartbeats_received:
-            await asyncio.sleep(0.1)
-        
-        # Verify we got at least one heartbeat
-        assert len(heartbeats_received) > 0, "No HEARTBEAT messages received"
+        try:
+            await asyncio.wait_for(got_heartbeat.wait(), timeout=5.0)
+        except asyncio.TimeoutError:
+            pytest.fail("No HEARTBEAT messages received")
         
         # Create and send a GPS_RAW_INT message
         print("Sending GPS_RAW_INT message...")
-        mav = mavlink.MAVLink(None)
-        gps_msg = mav.gps_raw_int_encode(
-            time_usec=int(time.time() * 1e6),
+        gps_msg = _MAVLINK_ENCODER.gps_raw_int_encode(
+            time_usec=time.time_ns() // 1000,
             fix_type=3,  # 3D fix
             lat=int(45.5017 * 1e7),  # Montreal latitude
             lon=int(-73.5673 * 1e7),  # Montreal longitude
@@ -64,11 +66,20 @@ async def _test_mavlink_proxy():
             satellites_visible=10,  # Number of satellites
         )
         
+        # Signal once the send thread has written our message
+        gps_sent = asyncio.Event()
+        io_write_once = proxy._io_write_once
+        
+        def write_and_signal(batches):
+            io_write_once(batches)
+            if any(m is gps_msg for m in batches.get("mav", ())):
+                loop.call_soon_threadsafe(gps_sent.set)
+        
+        proxy._io_write_once = write_and_signal
+        
         # Send the message
         proxy.send("mav", gps_msg)
-        
-        # Wait a bit for the message to be sent
-        await asyncio.sleep(0.5)
+        await asyncio.wait_for(gps_sent.wait(), timeout=1.0)
         
         print("Test complete.")
         
@@ -80,7 +91,7 @@ async def _test_mavlink_proxy():
 # Test burst sending and duplicate filtering functionality                    #
 # --------------------------------------------------------------------------- #
 
-from collections import defaultdict, deque
+from collections import deque
 from unittest.mock import Mock
 
 
@@ -89,7 +100,7 @@ class MockExternalProxy(MavLinkExternalProxy):
     
     def __init__(self, maxlen: int = 10):
         super().__init__(endpoint="udp:dummy:14550", baud=57600, maxlen=maxlen, source_system_id=1, source_component_id=1)
-        self.sent_messages = defaultdict(list)
+        self.sent_messages: dict[str, list] = {}
         self.received_messages = []
         self.master = None  # Override to avoid MAVLink connection
         # Initialize _recv for message buffering (needed for duplicate filtering test)
@@ -113,12 +124,25 @@ class MockExternalProxy(MavLinkExternalProxy):
     def _io_write_once(self, batches):
         # Store sent messages for verification
         for key, msgs in batches.items():
-            self.sent_messages[key].extend(msgs)
+            self.sent_messages.setdefault(key, []).extend(msgs)
     
+    def drain_pending(self) -> dict[str, list]:
+        """Empty every send buffer into a ``{key: [msgs]}`` batch for ``_io_write_once``."""
+        # counted popleft: safe even if the send thread appends meanwhile
+        return {
+            key: [dq.popleft() for _ in range(len(dq))]
+            for key, dq in list(self._send.items())
+            if dq
+        }
+
     def simulate_receive(self, key: str, msg: str):
         """Simulate receiving a message."""
         self.received_messages.append((key, msg))
 
+    def simulate_receive_many(self, pairs):
+        """Simulate receiving every ``(key, msg)`` in *pairs*, in order."""
+        self.received_messages.extend(pairs)
+
     async def wait_for_burst_completion(self) -> None:
         """
         Wait for all pending burst tasks to complete.
@@ -131,6 +155,41 @@ class MockExternalProxy(MavLinkExternalProxy):
             await asyncio.gather(*list(self._burst_tasks), return_exceptions=True)
     
 
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def shared_mock_proxy():
+    """
+    One MockExternalProxy for the whole module, bound to the module loop.
+
+    Its I/O threads are deliberately not started: the tests drain and read
+    by hand, and live send/recv threads would race them for the messages.
+    """
+    proxy = MockExternalProxy()
+    proxy._loop = asyncio.get_running_loop()
+    proxy._burst_tasks = set()
+    yield proxy
+    await proxy.stop()  # cancels any burst task a test left behind
+
+
+@pytest.fixture
+def mock_proxy(shared_mock_proxy):
+    """The shared proxy with every per-key structure and test record reset."""
+    p = shared_mock_proxy
+    p.sent_messages.clear()
+    p.received_messages.clear()
+    p._send.clear()
+    p._dirty_keys.clear()
+    p._send_wakeup.clear()
+    p._send_last_active.clear()
+    p._retired_send.clear()
+    p._burst_tasks.clear()
+    p._recv.clear()
+    p._handlers.clear()
+    p._handler_configs.clear()
+    p._dispatch.clear()
+    p._last_message_times.clear()
+    return p
+
+
 def test_burst_send_immediate():
     """Test burst sending without intervals (backwards compatible)."""
     proxy = MockExternalProxy()
@@ -142,11 +201,7 @@ def test_burst_send_immediate():
     proxy.send("test_key", "burst_message", burst_count=3, burst_interval=None)
     
     # Trigger a write cycle manually
-    pending = defaultdict(list)
-    for key, dq in proxy._send.items():
-        while dq:
-            pending[key].append(dq.popleft())
-    proxy._io_write_once(pending)
+    proxy._io_write_once(proxy.drain_pending())
     
     # Check that 4 messages were sent total (1 single + 3 burst)
     assert len(proxy.sent_messages["test_key"]) == 4
@@ -154,13 +209,10 @@ def test_burst_send_immediate():
     assert all(msg == "burst_message" for msg in proxy.sent_messages["test_key"][1:])
 
 
-@pytest.mark.asyncio
-async def test_burst_send_with_interval():
+@pytest.mark.asyncio(loop_scope="module")
+async def test_burst_send_with_interval(mock_proxy):
     """Test burst sending with intervals."""
-    proxy = MockExternalProxy()
-    
-    # Start the proxy
-    await proxy.start()
+    proxy = mock_proxy
     
     start_time = time.time()
     
@@ -171,11 +223,7 @@ async def test_burst_send_with_interval():
     await proxy.wait_for_burst_completion()
     
     # Trigger a write cycle
-    pending = defaultdict(list)
-    for key, dq in proxy._send.items():
-        while dq:
-            pending[key].append(dq.popleft())
-    proxy._io_write_once(pending)
+    proxy._io_write_once(proxy.drain_pending())
     
     # Check that 3 messages were sent
     assert len(proxy.sent_messages["test_key"]) == 3
@@ -184,69 +232,68 @@ async def test_burst_send_with_interval():
     # Check that it took at least 0.2 seconds (2 intervals)
     elapsed = time.time() - start_time
     assert elapsed >= 0.2, f"Expected at least 0.2s, got {elapsed:.3f}s"
-    
-    await proxy.stop()
 
 
-@pytest.mark.asyncio
-async def test_duplicate_filtering():
-    """Test duplicate message filtering (backwards compatible)."""
+def test_duplicate_filtering(monkeypatch):
+    """The recv-thread dispatch suppresses repeats only within the filter window."""
     proxy = MockExternalProxy()
-    
-    # Test backwards compatibility - handler without filtering
-    normal_calls = []
-    async def normal_handler(msg):
-        normal_calls.append(msg)
-    
-    proxy.register_handler("normal_key", normal_handler)
-    
-    # Test handler with duplicate filtering
-    filtered_calls = []
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    calls = []
+    monkeypatch.setattr(
+        proxy, "_invoke_callback_safely",
+        lambda cb, key, msg, cpu_heavy=False: calls.append(msg),
+    )
+
     async def filtered_handler(msg):
-        filtered_calls.append(msg)
-    
+        pass
+
     proxy.register_handler("filtered_key", filtered_handler, duplicate_filter_interval=0.5)
-    
-    # Simulate receiving messages
-    proxy.simulate_receive("normal_key", "normal_message")
-    proxy.simulate_receive("normal_key", "normal_message")  # Should not be filtered
-    proxy.simulate_receive("filtered_key", "filtered_message")
-    proxy.simulate_receive("filtered_key", "filtered_message")  # Should be filtered
-    
-    # Manually trigger the main loop logic
-    current_time = time.time()
-    for key, msg in proxy._io_read_once():
-        dq = proxy._recv.setdefault(key, deque(maxlen=proxy._maxlen))
-        dq.append(msg)
-        
-        for cb in proxy._handlers.get(key, []):
-            handler_config = proxy._handler_configs.get(key, {}).get(cb, {})
-            filter_interval = handler_config.get('duplicate_filter_interval')
-            
-            should_call_handler = True
-            if filter_interval is not None:
-                msg_str = str(msg)
-                handler_key = f"{key}_{id(cb)}"
-                
-                if handler_key in proxy._last_message_times:
-                    last_msg_str, last_time = proxy._last_message_times[handler_key]
-                    if (msg_str == last_msg_str and 
-                        current_time - last_time < filter_interval):
-                        should_call_handler = False
-                
-                if should_call_handler:
-                    proxy._last_message_times[handler_key] = (msg_str, current_time)
-            
-            if should_call_handler:
-                await cb(msg)
-    
-    # Normal handler should receive both messages
-    assert len(normal_calls) == 2
-    assert all(msg == "normal_message" for msg in normal_calls)
-    
-    # Filtered handler should receive only the first message
-    assert len(filtered_calls) == 1
-    assert filtered_calls[0] == "filtered_message"
+
+    proxy._process_message_with_handlers("filtered_key", "A")
+    now[0] += 0.2
+    proxy._process_message_with_handlers("filtered_key", "A")  # repeat inside window
+    assert calls == ["A"]
+
+    proxy._process_message_with_handlers("filtered_key", "B")  # new payload
+    assert calls == ["A", "B"]
+
+    now[0] += 0.6
+    proxy._process_message_with_handlers("filtered_key", "B")  # window expired
+    assert calls == ["A", "B", "B"]
+
+
+def test_duplicate_filter_is_per_handler(monkeypatch):
+    """A filtering handler must not suppress delivery to a plain handler on the same key."""
+    proxy = MockExternalProxy()
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    calls = []
+    monkeypatch.setattr(
+        proxy, "_invoke_callback_safely",
+        lambda cb, key, msg, cpu_heavy=False: calls.append((cb, msg)),
+    )
+
+    async def plain_handler(msg):
+        pass
+
+    async def filtered_handler(msg):
+        pass
+
+    proxy.register_handler("shared", plain_handler)
+    proxy.register_handler("shared", filtered_handler, duplicate_filter_interval=0.5)
+
+    for _ in range(3):
+        proxy._process_message_with_handlers("shared", "A")
+        now[0] += 0.1
+
+    assert [m for cb, m in calls if cb is plain_handler] == ["A", "A", "A"]
+    assert [m for cb, m in calls if cb is filtered_handler] == ["A"]
+
+    now[0] += 0.5
+    proxy._process_message_with_handlers("shared", "A")
+    assert [m for cb, m in calls if cb is plain_handler] == ["A"] * 4
+    assert [m for cb, m in calls if cb is filtered_handler] == ["A", "A"]
 
 
 def test_sync_callback_rejected():
@@ -319,17 +366,19 @@ async def test_cpu_heavy_handler_dispatch():
     await proxy.start()
 
     call_log = []
+    loop = asyncio.get_running_loop()
+    handled = asyncio.Event()
 
     async def heavy_handler(msg):
         call_log.append(("heavy", msg))
+        loop.call_soon_threadsafe(handled.set)  # runs on a worker thread's loop
 
     proxy.register_handler("test_key", heavy_handler, cpu_heavy=True)
 
     # Process a message - the handler should be invoked (offloaded to executor)
     proxy._process_message_with_handlers("test_key", "test_msg")
 
-    # Give the event loop a moment to process the future
-    await asyncio.sleep(0.2)
+    await asyncio.wait_for(handled.wait(), timeout=1.0)
 
     # The handler should have been called (via the executor offloading path)
     assert len(call_log) == 1
@@ -338,11 +387,10 @@ async def test_cpu_heavy_handler_dispatch():
     await proxy.stop()
 
 
-@pytest.mark.asyncio
-async def test_mavlink_burst_integration():
+@pytest.mark.asyncio(loop_scope="module")
+async def test_mavlink_burst_integration(mock_proxy):
     """Test burst sending with actual MAVLink-style usage."""
-    proxy = MockExternalProxy()
-    await proxy.start()
+    proxy = mock_proxy
     
     # Simulate a MAVLink message-like object
     class MockMAVLinkMessage:
@@ -358,24 +406,17 @@ async def test_mavlink_burst_integration():
     proxy.send("mav", heartbeat_msg, burst_count=5)
     
     # Trigger write
-    pending = defaultdict(list)
-    for key, dq in proxy._send.items():
-        while dq:
-            pending[key].append(dq.popleft())
-    proxy._io_write_once(pending)
+    proxy._io_write_once(proxy.drain_pending())
     
     # Verify burst was sent
     assert len(proxy.sent_messages["mav"]) == 5
     assert all(isinstance(msg, MockMAVLinkMessage) for msg in proxy.sent_messages["mav"])
-    
-    await proxy.stop()
 
 
-@pytest.mark.asyncio
-async def test_backwards_compatibility():
+@pytest.mark.asyncio(loop_scope="module")
+async def test_backwards_compatibility(mock_proxy):
     """Ensure all existing functionality works unchanged."""
-    proxy = MockExternalProxy()
-    await proxy.start()
+    proxy = mock_proxy
     
     received_messages = []
     async def simple_handler(msg):
@@ -392,19 +433,13 @@ async def test_backwards_compatibility():
             await cb(msg)
     
     # Trigger send
-    pending = defaultdict(list)
-    for key, dq in proxy._send.items():
-        while dq:
-            pending[key].append(dq.popleft())
-    proxy._io_write_once(pending)
+    proxy._io_write_once(proxy.drain_pending())
     
     # Verify everything works as before
     assert len(proxy.sent_messages["test_key"]) == 1
     assert proxy.sent_messages["test_key"][0] == "test_message"
     assert len(received_messages) == 1
     assert received_messages[0] == "received_message"
-    
-    await proxy.stop()
 
 
 @pytest.mark.asyncio
@@ -492,11 +527,7 @@ async def test_burst_interval_real_world_scenario():
     await proxy.wait_for_burst_completion()
     
     # Manually trigger a write cycle to simulate the worker thread
-    pending = defaultdict(list)
-    for key, dq in proxy._send.items():
-        while dq:
-            pending[key].append(dq.popleft())
-    proxy._io_write_once(pending)
+    proxy._io_write_once(proxy.drain_pending())
     
     # Verify all 5 messages were sent on our test key
     test_messages = [msg for _, key, msg in sent_messages_with_time if key == "test_heartbeat"]
@@ -507,4 +538,273 @@ async def test_burst_interval_real_world_scenario():
     total_time = time.time() - start_time
     assert total_time >= 0.8, f"Expected at least 0.8s total time, got {total_time:.3f}s"
     
-    await proxy.stop()
\ No newline at end of file
+    await proxy.stop()
+
+
+def test_io_dispatch_once_fans_out_keys():
+    """Each received message is dispatched under the mav, numeric-ID and type keys."""
+    class _LinkProxy(MockExternalProxy):
+        _io_read_once = MavLinkExternalProxy._io_read_once  # read from master
+
+    proxy = _LinkProxy()
+
+    class _Msg:
+        def get_type(self): return "HEARTBEAT"
+        def get_msgId(self): return 0
+
+    msg = _Msg()
+    pending = [msg]
+    proxy.master = SimpleNamespace(
+        recv_match=lambda blocking=True, timeout=None: pending.pop() if pending else None
+    )
+    proxy.connected = True
+
+    dispatched = []
+    proxy._process_message_with_handlers = lambda key, m: dispatched.append((key, m))
+
+    MavLinkExternalProxy._io_dispatch_once(proxy, timeout=0)
+
+    assert dispatched == [("mav", msg), ("0", msg), ("HEARTBEAT", msg)]
+
+
+def test_io_dispatch_once_honours_overridden_io_read_once():
+    """A subclass that injects messages via _io_read_once still reaches the handlers."""
+    proxy = MockExternalProxy()
+    dispatched = []
+    proxy._process_message_with_handlers = lambda key, m: dispatched.append((key, m))
+
+    proxy.simulate_receive_many([("a", "1"), ("b", "2")])
+    proxy._io_dispatch_once(timeout=0)
+
+    assert dispatched == [("a", "1"), ("b", "2")]
+
+
+def test_idle_send_buffers_are_released():
+    """Empty send buffers idle past the TTL are dropped; late writes are not lost."""
+    proxy = MockExternalProxy()
+    proxy._idle_buffer_ttl = 10.0
+
+    proxy.send("busy", "A")
+    proxy._send["busy"].popleft()
+    proxy._send_last_active["busy"] = 100.0
+
+    proxy._sweep_idle_send_buffers(105.0)
+    assert "busy" in proxy._send
+
+    proxy._sweep_idle_send_buffers(111.0)
+    assert "busy" not in proxy._send
+
+    # A producer still holding the retired buffer appends to it
+    retired_key, retired_dq = proxy._retired_send[0]
+    retired_dq.append("LATE")
+
+    proxy._sweep_idle_send_buffers(112.0)
+    assert list(proxy._send[retired_key]) == ["LATE"]
+    assert retired_key in proxy._dirty_keys
+    assert proxy._retired_send == []
+
+
+async def test_burst_survives_idle_sweep_mid_burst():
+    """A burst keeps reaching the send thread after the sweep retires its buffer."""
+    proxy = MockExternalProxy()
+    proxy._idle_buffer_ttl = 10.0
+
+    burst = asyncio.create_task(proxy._send_burst("slow", "PING", 3, 0.05))
+    await asyncio.sleep(0.01)  # first message queued, burst now sleeping
+    assert proxy.drain_pending() == {"slow": ["PING"]}
+
+    # Idle past the TTL: retire the empty buffer, then drop it for good
+    proxy._send_last_active["slow"] = 0.0
+    proxy._sweep_idle_send_buffers(100.0)
+    proxy._sweep_idle_send_buffers(101.0)
+    assert "slow" not in proxy._send and proxy._retired_send == []
+
+    await burst
+    assert proxy.drain_pending() == {"slow": ["PING", "PING"]}
+    assert "slow" in proxy._dirty_keys
+
+
+def test_dispatch_snapshot_tracks_handler_registration():
+    """The recv-thread handler snapshot follows register/unregister."""
+    proxy = MockExternalProxy()
+
+    async def handler(msg):
+        pass
+
+    proxy.register_handler("HEARTBEAT", handler, duplicate_filter_interval=0.5, cpu_heavy=True)
+    assert proxy._dispatch["HEARTBEAT"] == ((handler, 0.5, True, ("HEARTBEAT", handler)),)
+
+    proxy.unregister_handler("HEARTBEAT", handler)
+    assert "HEARTBEAT" not in proxy._dispatch
+
+
+def test_io_write_once_batches_frames_into_few_writes():
+    """A drain cycle is written in MTU-sized chunks that parse back in sequence."""
+    proxy = MockExternalProxy()
+    writes = []
+    mav = mavlink_v20.MAVLink(SimpleNamespace(write=writes.append), srcSystem=1, srcComponent=1)
+    proxy.master = SimpleNamespace(mav=mav)
+    proxy.connected = True
+
+    msgs = [mav.heartbeat_encode(1, 2, 3, 4, 5) for _ in range(100)]
+    MavLinkExternalProxy._io_write_once(proxy, {"mav": msgs})
+
+    assert 1 < len(writes) < len(msgs)
+    assert all(len(w) <= proxy._tx_batch_max_bytes for w in writes)
+    assert mav.seq == 100 and mav.total_packets_sent == 100
+
+    rx = mavlink_v20.MAVLink(None)
+    parsed = [m for w in writes for m in (rx.parse_buffer(w) or [])]
+    assert [m.get_seq() for m in parsed] == list(range(100))
+
+
+def test_io_write_once_send_callback_matches_mavlink_send():
+    """The send callback fires per message, and is skipped without its args, like MAVLink.send."""
+    proxy = MockExternalProxy()
+    mav = mavlink_v20.MAVLink(SimpleNamespace(write=lambda buf: None), srcSystem=1, srcComponent=1)
+    proxy.master = SimpleNamespace(mav=mav)
+    proxy.connected = True
+    seen = []
+
+    mav.set_send_callback(lambda msg, tag: seen.append(tag), "cb")
+    MavLinkExternalProxy._io_write_once(proxy, {"mav": [mav.heartbeat_encode(1, 2, 3, 4, 5)] * 2})
+    assert seen == ["cb", "cb"]
+
+    # assigned directly: args/kwargs stay None
+    mav.send_callback = lambda msg: seen.append("direct")
+    mav.send_callback_args = mav.send_callback_kwargs = None
+    MavLinkExternalProxy._io_write_once(proxy, {"mav": [mav.heartbeat_encode(1, 2, 3, 4, 5)]})
+    assert seen == ["cb", "cb"] and mav.total_packets_sent == 3
+
+
+def test_build_req_msg_long_is_cached_per_target():
+    """Repeated requests reuse the cached fields, but each caller gets its own message."""
+    proxy = MockExternalProxy()
+    mav = mavlink_v20.MAVLink(None)
+    proxy.master = SimpleNamespace(mav=mav, target_system=1, target_component=1)
+    proxy.connected = True
+
+    first = proxy.build_req_msg_long(mavlink_v20.MAVLINK_MSG_ID_ATTITUDE)
+    assert first.param1 == float(mavlink_v20.MAVLINK_MSG_ID_ATTITUDE)
+    assert first.command == mavlink_v20.MAV_CMD_REQUEST_MESSAGE
+    assert len(proxy._req_msg_long_cache) == 1
+
+    first.param2 = 5.0  # a caller's edit must not leak into later requests
+    again = proxy.build_req_msg_long(mavlink_v20.MAVLINK_MSG_ID_ATTITUDE)
+    assert again is not first and again.param2 == 0
+    assert again.to_dict() == mav.command_long_encode(
+        1, 1, mavlink_v20.MAV_CMD_REQUEST_MESSAGE, 0,
+        float(mavlink_v20.MAVLINK_MSG_ID_ATTITUDE), 0, 0, 0, 0, 0, 0,
+    ).to_dict()
+    assert len(proxy._req_msg_long_cache) == 1
+
+    proxy.master.target_system = 2
+    other = proxy.build_req_msg_long(mavlink_v20.MAVLINK_MSG_ID_ATTITUDE)
+    assert other is not first and other.target_system == 2
+
+
+def test_udp_connection_gets_larger_receive_buffer(monkeypatch):
+    """A socket-backed endpoint has SO_RCVBUF raised; serial ports are skipped."""
+    import socket
+    proxy = MockExternalProxy()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        before = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+        monkeypatch.setattr(mavutil, "mavlink_connection", lambda *a, **kw: SimpleNamespace(port=sock))
+        assert proxy._create_mavlink_connection().port is sock
+        assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF) > before
+    finally:
+        sock.close()
+
+    serial = SimpleNamespace(port=SimpleNamespace())
+    monkeypatch.setattr(mavutil, "mavlink_connection", lambda *a, **kw: serial)
+    assert proxy._create_mavlink_connection() is serial
+
+
+def test_duplicate_key_ignores_header_but_not_fields():
+    """Received MAVLink repeats match on payload even when seq differs."""
+    proxy = MockExternalProxy()
+    tx = mavlink_v20.MAVLink(None, srcSystem=1, srcComponent=1)
+    rx = mavlink_v20.MAVLink(None)
+
+    def received(msg):
+        buf = msg.pack(tx)
+        tx.seq = (tx.seq + 1) % 256   # as MAVLink.send would
+        return rx.parse_buffer(buf)[0]
+
+    first = received(tx.heartbeat_encode(1, 2, 3, 4, 5))
+    repeat = received(tx.heartbeat_encode(1, 2, 3, 4, 5))
+    changed = received(tx.heartbeat_encode(1, 2, 3, 4, 6))
+
+    assert first.get_seq() != repeat.get_seq()
+    assert proxy._duplicate_key(first) == proxy._duplicate_key(repeat)
+    assert proxy._duplicate_key(first) != proxy._duplicate_key(changed)
+    # not yet packed: compared by its string form
+    assert proxy._duplicate_key(tx.heartbeat_encode(1, 2, 3, 4, 5)) == str(tx.heartbeat_encode(1, 2, 3, 4, 5))
+    assert proxy._duplicate_key("plain") == "plain"
+    # raw frames are their own key (no str() copy); mutable objects are snapshotted
+    frame = b"\xfd\x09\x00"
+    assert proxy._duplicate_key(frame) is frame
+    assert proxy._duplicate_key({"a": 1}) == "{'a': 1}"
+
+
+def test_send_marks_only_touched_keys_dirty():
+    """send() flags its key so the send thread drains just that buffer."""
+    proxy = MockExternalProxy()
+    proxy._send.setdefault("quiet", deque(maxlen=proxy._maxlen))
+
+    proxy.send("busy", "A")
+    proxy.send("busy", "B", burst_count=2)
+
+    assert proxy._dirty_keys == {"busy"}
+    assert list(proxy._send["busy"]) == ["A", "B", "B"]
+
+
+async def test_send_thread_coalesces_a_burst_into_one_write():
+    """Messages sent while the send thread wakes up go out in a single write."""
+    proxy = MockExternalProxy()
+    proxy._sleep_time_ms = 250.0
+    writes = []
+    proxy._io_write_once = lambda batches: writes.append(batches)
+    await proxy.start()
+    try:
+        await asyncio.sleep(0.01)  # let the send thread go idle
+        for i in range(5):  # spread over ~20 ms, well inside the 250 ms window
+            proxy.send("burst", i)
+            await asyncio.sleep(0.005)
+        await asyncio.sleep(0.5)
+    finally:
+        await proxy.stop()
+
+    assert writes == [{"burst": [0, 1, 2, 3, 4]}]
+
+
+@pytest.mark.asyncio
+async def test_send_and_wait_honours_cancel_event_without_threads():
+    """A set cancel_event ends send_and_wait early and spawns no helper thread."""
+    import threading
+
+    proxy = MockExternalProxy()
+    proxy._loop = asyncio.get_running_loop()
+    proxy.connected = True
+    cancel = threading.Event()
+    threads_before = threading.active_count()
+
+    async def _cancel_soon():
+        await asyncio.sleep(0.05)
+        cancel.set()
+
+    canceller = asyncio.create_task(_cancel_soon())
+    start = time.monotonic()
+    await proxy.send_and_wait(
+        match_key="HEARTBEAT",
+        request_msg="REQ",
+        collector=lambda pkt: False,
+        timeout=2.0,
+        cancel_event=cancel,
+    )
+    await canceller
+
+    assert time.monotonic() - start < 1.0
+    assert threading.active_count() == threads_before
+    assert "HEARTBEAT" not in proxy._handlers
@@ -13,9 +13,13 @@ import uuid
 
 from typing import Generator, AsyncGenerator
 
-@pytest_asyncio.fixture
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
 async def proxy() -> AsyncGenerator[LocalDBProxy, None]:
-    """Create a LocalDBProxy instance for testing."""
+    """
+    One started LocalDBProxy for the module. Tests only patch
+    ``_remote_file_request``/``update_item`` per call, so no state carries
+    over between them.
+    """
     proxy = LocalDBProxy(
         host="localhost", 
         port=3000, 
@@ -60,6 +64,23 @@ def test_get_machine_id():
     else:
         raise AssertionError("Machine ID should not be None, unless running in an environment without the executable.")
 
+def test_machine_id_is_memoized(tmp_path):
+    """The machineid executable runs once; failures are not cached."""
+    from petal_app_manager import utils
+
+    exe = tmp_path / "machineid"
+    exe.touch()
+    completed = subprocess.CompletedProcess(args=[], returncode=0, stdout="abc-123\n")
+    with patch.object(utils, "_machine_id", None), \
+         patch.object(utils, "MACHINE_ID_EXE", exe), \
+         patch.object(utils.subprocess, "run", side_effect=[subprocess.TimeoutExpired("id", 2), completed]) as run:
+        with pytest.raises(subprocess.TimeoutExpired):
+            utils.get_machine_id()
+        assert utils.get_machine_id() == "abc-123"
+        assert utils.get_machine_id() == "abc-123"
+        assert run.call_count == 2
+        assert run.call_args.args[0] == [str(exe)]
+
 @pytest.mark.asyncio
 async def test_get_current_instance_with_mock():
     """Test _get_current_instance method with mocking."""
@@ -136,32 +157,70 @@ async def test_get_current_instance_without_mock():
         # Always clean up
         await proxy.stop()
 
-@pytest.mark.asyncio
-async def test_get_item(proxy: LocalDBProxy):
-    """Test retrieving an item from the database."""
-    mock_response = {"data": {"id": "123", "name": "Test Item", "status": "active", "robot_instance_id": "test-machine-id"}, "success": True}
-    
-    # Mock the _remote_file_request method
+_ROBOT_FILTER = {"filter_key_name": "robot_instance_id", "filter_key_value": "test-machine-id"}
+_ORG_FILTER = {"filter_key_name": "organization_id", "filter_key_value": "org-123"}
+
+@pytest.mark.parametrize(
+    "method, kwargs, mock_response, expected_body, expected_path",
+    [
+        (
+            "get_item",
+            {"table_name": "test-table", "partition_key": "id", "partition_value": "123"},
+            {"data": {"id": "123", "name": "Test Item", "status": "active", "robot_instance_id": "test-machine-id"}, "success": True},
+            {"onBoardId": "test-machine-id", "table_name": "test-table", "partition_key": "id", "partition_value": "123"},
+            '/drone/onBoard/config/getData',
+        ),
+        (
+            "scan_items",
+            {"table_name": "test-table"},
+            {
+                "data": [
+                    {"id": "123", "name": "Item 1", "robot_instance_id": "test-machine-id"},
+                    {"id": "456", "name": "Item 2", "robot_instance_id": "test-machine-id"}
+                ],
+                "success": True
+            },
+            {"table_name": "test-table", "onBoardId": "test-machine-id", "scanFilter": [_ROBOT_FILTER]},
+            '/drone/onBoard/config/scanData',
+        ),
+        (
+            "scan_items",
+            {"table_name": "test-table", "filters": [_ORG_FILTER]},
+            {"data": [{"id": "123", "name": "Item 1", "robot_instance_id": "test-machine-id"}], "success": True},
+            {"table_name": "test-table", "onBoardId": "test-machine-id", "scanFilter": [_ORG_FILTER, _ROBOT_FILTER]},
+            '/drone/onBoard/config/scanData',
+        ),
+        (
+            "update_item",
+            {"table_name": "test-table", "filter_key": "id", "filter_value": "123",
+             "data": {"id": "123", "name": "Updated Item", "status": "inactive"}},
+            {"success": True},
+            {"onBoardId": "test-machine-id", "table_name": "test-table", "filter_key": "id", "filter_value": "123",
+             "data": {"id": "123", "name": "Updated Item", "status": "inactive", "robot_instance_id": "test-machine-id"}},
+            '/drone/onBoard/config/updateData',
+        ),
+        (
+            "set_item",
+            {"table_name": "test-table", "filter_key": "id", "filter_value": "123",
+             "data": {"id": "123", "name": "New Item", "status": "active"}},
+            {"success": True},
+            {"onBoardId": "test-machine-id", "table_name": "test-table", "filter_key": "id", "filter_value": "123",
+             "data": {"id": "123", "name": "New Item", "status": "active", "robot_instance_id": "test-machine-id"}},
+            '/drone/onBoard/config/setData',
+        ),
+    ],
+    ids=["get_item", "scan_items_without_filters", "scan_items_with_filters", "update_item", "set_item"],
+)
+@pytest.mark.asyncio(loop_scope="module")
+async def test_crud_request(proxy: LocalDBProxy, method, kwargs, mock_response, expected_body, expected_path):
+    """Each CRUD call posts the expected body to its endpoint and returns the reply."""
     with patch.object(proxy, '_remote_file_request', return_value=mock_response):
-        result = await proxy.get_item(
-            table_name="test-table",
-            partition_key="id",
-            partition_value="123"
-        )
+        result = await getattr(proxy, method)(**kwargs)
         
         assert result == mock_response
-        proxy._remote_file_request.assert_called_once_with(
-            {
-                "onBoardId": "test-machine-id",
-                "table_name": "test-table",
-                "partition_key": "id",
-                "partition_value": "123"
-            },
-            '/drone/onBoard/config/getData',
-            'POST'
-        )
+        proxy._remote_file_request.assert_called_once_with(expected_body, expected_path, 'POST')
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="module")
 async def test_get_item_soft_deleted(proxy: LocalDBProxy):
     """Test that soft-deleted items are filtered out."""
     mock_response = {"data": {"id": "123", "name": "Test Item", "status": "active", "deleted": True, "robot_instance_id": "test-machine-id"}, "success": True}
@@ -176,7 +235,7 @@ async def test_get_item_soft_deleted(proxy: LocalDBProxy):
         assert "error" in result
         assert result["error"] == "Item not found or has been deleted"
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="module")
 async def test_get_item_wrong_robot_id(proxy: LocalDBProxy):
     """Test that items belonging to different machines are filtered out."""
     mock_response = {"data": {"id": "123", "name": "Test Item", "robot_instance_id": "different-machine-id"}, "success": True}
@@ -191,32 +250,7 @@ async def test_get_item_wrong_robot_id(proxy: LocalDBProxy):
         assert "error" in result
         assert result["error"] == "Item not found or access denied"
 
-@pytest.mark.asyncio
-async def test_scan_items_without_filters(proxy: LocalDBProxy):
-    """Test scanning items without filters."""
-    mock_response = {
-        "data": [
-            {"id": "123", "name": "Item 1", "robot_instance_id": "test-machine-id"},
-            {"id": "456", "name": "Item 2", "robot_instance_id": "test-machine-id"}
-        ],
-        "success": True
-    }
-    
-    with patch.object(proxy, '_remote_file_request', return_value=mock_response):
-        result = await proxy.scan_items(table_name="test-table")
-        
-        assert result == mock_response
-        proxy._remote_file_request.assert_called_once_with(
-            {
-                "table_name": "test-table",
-                "onBoardId": "test-machine-id",
-                "scanFilter": [{"filter_key_name": "robot_instance_id", "filter_key_value": "test-machine-id"}]
-            },
-            '/drone/onBoard/config/scanData',
-            'POST'
-        )
-
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="module")
 async def test_scan_items_filters_soft_deleted(proxy: LocalDBProxy):
     """Test that soft-deleted items are filtered out from scan results."""
     mock_response = {
@@ -241,7 +275,7 @@ async def test_scan_items_filters_soft_deleted(proxy: LocalDBProxy):
         
         assert result == expected_filtered
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="module")
 async def test_scan_items_filters_wrong_robot_id(proxy: LocalDBProxy):
     """Test that items belonging to different machines are filtered out from scan results."""
     mock_response = {
@@ -266,88 +300,7 @@ async def test_scan_items_filters_wrong_robot_id(proxy: LocalDBProxy):
         
         assert result == expected_filtered
 
-@pytest.mark.asyncio
-async def test_scan_items_with_filters(proxy: LocalDBProxy):
-    """Test scanning items with filters."""
-    mock_response = {
-        "data": [{"id": "123", "name": "Item 1", "robot_instance_id": "test-machine-id"}],
-        "success": True
-    }
-    filters = [{"filter_key_name": "organization_id", "filter_key_value": "org-123"}]
-    
-    with patch.object(proxy, '_remote_file_request', return_value=mock_response):
-        result = await proxy.scan_items(table_name="test-table", filters=filters)
-        
-        assert result == mock_response
-        proxy._remote_file_request.assert_called_once_with(
-            {
-                "table_name": "test-table",
-                "onBoardId": "test-machine-id",
-                "scanFilter": filters + [{"filter_key_name": "robot_instance_id", "filter_key_value": "test-machine-id"}]
-            },
-            '/drone/onBoard/config/scanData',
-            'POST'
-        )
-
-@pytest.mark.asyncio
-async def test_update_item(proxy: LocalDBProxy):
-    """Test updating an item in the database."""
-    mock_response = {"success": True}
-    item_data = {"id": "123", "name": "Updated Item", "status": "inactive"}
-    expected_data = item_data.copy()
-    expected_data["robot_instance_id"] = "test-machine-id"
-    
-    with patch.object(proxy, '_remote_file_request', return_value=mock_response):
-        result = await proxy.update_item(
-            table_name="test-table",
-            filter_key="id",
-            filter_value="123",
-            data=item_data
-        )
-        
-        assert result == mock_response
-        proxy._remote_file_request.assert_called_once_with(
-            {
-                "onBoardId": "test-machine-id",
-                "table_name": "test-table",
-                "filter_key": "id",
-                "filter_value": "123",
-                "data": expected_data
-            },
-            '/drone/onBoard/config/updateData',
-            'POST'
-        )
-
-@pytest.mark.asyncio
-async def test_set_item(proxy: LocalDBProxy):
-    """Test setting an item in the database."""
-    mock_response = {"success": True}
-    item_data = {"id": "123", "name": "New Item", "status": "active"}
-    expected_data = item_data.copy()
-    expected_data["robot_instance_id"] = "test-machine-id"
-    
-    with patch.object(proxy, '_remote_file_request', return_value=mock_response):
-        result = await proxy.set_item(
-            table_name="test-table",
-            filter_key="id",
-            filter_value="123",
-            data=item_data
-        )
-        
-        assert result == mock_response
-        proxy._remote_file_request.assert_called_once_with(
-            {
-                "onBoardId": "test-machine-id",
-                "table_name": "test-table",
-                "filter_key": "id",
-                "filter_value": "123",
-                "data": expected_data
-            },
-            '/drone/onBoard/config/setData',
-            'POST'
-        )
-
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="module")
 async def test_delete_item(proxy: LocalDBProxy):
     """Test soft deleting an item from the database."""
     # Mock the existing item retrieval (direct database call)
@@ -390,7 +343,7 @@ async def test_delete_item(proxy: LocalDBProxy):
             data=expected_data
         )
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="module")
 async def test_delete_item_not_found(proxy: LocalDBProxy):
     """Test deleting an item that doesn't exist."""
     mock_get_response = {"error": "Item not found", "success": False}
@@ -405,7 +358,7 @@ async def test_delete_item_not_found(proxy: LocalDBProxy):
         assert "error" in result
         assert result["error"] == "Item not found"
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="module")
 async def test_scan_items_all_deleted(proxy: LocalDBProxy):
     """Test scanning when all items are soft-deleted."""
     mock_response = {
@@ -426,7 +379,7 @@ async def test_scan_items_all_deleted(proxy: LocalDBProxy):
         
         assert result == expected_filtered
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="module")
 async def test_get_item_deleted_false_explicitly(proxy: LocalDBProxy):
     """Test that items with deleted=False are returned normally."""
     mock_response = {"data": {"id": "123", "name": "Test Item", "deleted": False, "robot_instance_id": "test-machine-id"}, "success": True}
@@ -440,7 +393,7 @@ async def test_get_item_deleted_false_explicitly(proxy: LocalDBProxy):
         
         assert result == mock_response
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="module")
 async def test_scan_items_mixed_deleted_states(proxy: LocalDBProxy):
     """Test scanning with a mix of deleted states."""
     mock_response = {
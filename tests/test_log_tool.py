@@ -4,191 +4,287 @@ Unit tests for the CSV signal logging tool.
 
 import os
 import csv
-import tempfile
 import pytest
 from pathlib import Path
+from unittest.mock import patch
 
 from petal_app_manager.utils.log_tool import open_channel, LogChannel
 
 
-def test_scalar_channel():
+def test_scalar_channel(mem_tmp_path):
     """Test logging scalar values."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Create a scalar channel
-        channel = open_channel(
-            "test_value",
-            base_dir=tmpdir,
-            file_name="scalar_test"
-        )
-        
-        # Push some values
-        test_values = [1.0, 2.5, 3.7]
-        for val in test_values:
-            channel.push(val)
+    # Create a scalar channel
+    channel = open_channel(
+        "test_value",
+        base_dir=mem_tmp_path,
+        file_name="scalar_test"
+    )
+    
+    # Push some values
+    test_values = [1.0, 2.5, 3.7]
+    for val in test_values:
+        channel.push(val)
+    
+    # Close the channel to ensure data is written
+    channel.close()
+    
+    # Find the created file
+    csv_files = list(mem_tmp_path.glob("*.csv"))
+    assert len(csv_files) == 1
+    
+    # Check file contents
+    with open(csv_files[0], 'r', newline='') as f:
+        reader = csv.reader(f)
+        rows = list(reader)
         
-        # Close the channel to ensure data is written
-        channel.close()
+        # First row should be the header with timestamp
+        assert rows[0] == ["timestamp", "test_value"]
         
-        # Find the created file
-        csv_files = list(Path(tmpdir).glob("*.csv"))
-        assert len(csv_files) == 1
+        # Check data rows
+        data_rows = rows[1:]
+        assert len(data_rows) == len(test_values)
         
-        # Check file contents
-        with open(csv_files[0], 'r', newline='') as f:
-            reader = csv.reader(f)
-            rows = list(reader)
-            
-            # First row should be the header with timestamp
-            assert rows[0] == ["timestamp", "test_value"]
-            
-            # Check data rows
-            data_rows = rows[1:]
-            assert len(data_rows) == len(test_values)
-            
-            for i, val in enumerate(test_values):
-                # Check that timestamp is present (index 0) and value is correct (index 1)
-                assert float(data_rows[i][1]) == val
-
-
-def test_multidim_channel():
+        for i, val in enumerate(test_values):
+            # Check that timestamp is present (index 0) and value is correct (index 1)
+            assert float(data_rows[i][1]) == val
+
+
+def test_multidim_channel(mem_tmp_path):
     """Test logging multi-dimensional values."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Create a multi-dimensional channel
-        headers = ["x", "y", "z"]
-        channel = open_channel(
-            headers,
-            base_dir=tmpdir,
-            file_name="vector_test"
-        )
-        
-        # Push some values
-        test_values = [
-            [1.0, 2.0, 3.0],
-            [4.0, 5.0, 6.0],
-            [7.0, 8.0, 9.0]
-        ]
-        for val in test_values:
-            channel.push(val)
+    # Create a multi-dimensional channel
+    headers = ["x", "y", "z"]
+    channel = open_channel(
+        headers,
+        base_dir=mem_tmp_path,
+        file_name="vector_test"
+    )
+    
+    # Push some values
+    test_values = [
+        [1.0, 2.0, 3.0],
+        [4.0, 5.0, 6.0],
+        [7.0, 8.0, 9.0]
+    ]
+    for val in test_values:
+        channel.push(val)
+    
+    # Close the channel to ensure data is written
+    channel.close()
+    
+    # Find the created file
+    csv_files = list(mem_tmp_path.glob("*.csv"))
+    assert len(csv_files) == 1
+    
+    # Check file contents
+    with open(csv_files[0], 'r', newline='') as f:
+        reader = csv.reader(f)
+        rows = list(reader)
         
-        # Close the channel to ensure data is written
-        channel.close()
+        # First row should be the header with timestamp
+        expected_headers = ["timestamp"] + headers
+        assert rows[0] == expected_headers
         
-        # Find the created file
-        csv_files = list(Path(tmpdir).glob("*.csv"))
-        assert len(csv_files) == 1
+        # Check data rows
+        data_rows = rows[1:]
+        assert len(data_rows) == len(test_values)
         
-        # Check file contents
-        with open(csv_files[0], 'r', newline='') as f:
-            reader = csv.reader(f)
-            rows = list(reader)
-            
-            # First row should be the header with timestamp
-            expected_headers = ["timestamp"] + headers
-            assert rows[0] == expected_headers
-            
-            # Check data rows
-            data_rows = rows[1:]
-            assert len(data_rows) == len(test_values)
-            
-            for i, expected_vals in enumerate(test_values):
-                # Skip the timestamp column (index 0)
-                actual_vals = [float(v) for v in data_rows[i][1:]]
-                assert actual_vals == expected_vals
-
-
-def test_timestamp_precision():
+        for i, expected_vals in enumerate(test_values):
+            # Skip the timestamp column (index 0)
+            actual_vals = [float(v) for v in data_rows[i][1:]]
+            assert actual_vals == expected_vals
+
+
+def test_timestamp_precision(mem_tmp_path):
     """Test that timestamp precision can be customized."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Test with seconds precision
-        seconds_channel = open_channel(
-            "test_value",
-            base_dir=tmpdir,
-            file_name="seconds_timestamp_test",
-            use_ms=False  # Use seconds precision
-        )
-        
-        # Push a value
-        seconds_channel.push(1.0)
-        seconds_channel.close()
-        
-        # Find the created file
-        seconds_files = list(Path(tmpdir).glob("seconds_*.csv"))
-        
-        # Check file contents
-        with open(seconds_files[0], 'r', newline='') as f:
-            reader = csv.reader(f)
-            rows = list(reader)
-            
-            # Verify timestamp is an integer with seconds precision
-            timestamp = int(rows[1][0])
-            # Should be a 10-digit number (seconds precision, valid for many decades)
-            assert 1000000000 < timestamp < 10000000000
-            
-        # Test with milliseconds precision (default)
-        ms_channel = open_channel(
-            "test_value",
-            base_dir=tmpdir,
-            file_name="ms_timestamp_test",
-            use_ms=True  # Use milliseconds precision (default)
-        )
+    # Test with seconds precision
+    seconds_channel = open_channel(
+        "test_value",
+        base_dir=mem_tmp_path,
+        file_name="seconds_timestamp_test",
+        use_ms=False  # Use seconds precision
+    )
+    
+    # Push a value
+    seconds_channel.push(1.0)
+    seconds_channel.close()
+    
+    # Find the created file
+    seconds_files = list(mem_tmp_path.glob("seconds_*.csv"))
+    
+    # Check file contents
+    with open(seconds_files[0], 'r', newline='') as f:
+        reader = csv.reader(f)
+        rows = list(reader)
         
-        # Push a value
-        ms_channel.push(1.0)
-        ms_channel.close()
+        # Verify timestamp is an integer with seconds precision
+        timestamp = int(rows[1][0])
+        # Should be a 10-digit number (seconds precision, valid for many decades)
+        assert 1000000000 < timestamp < 10000000000
         
-        # Find the created file
-        ms_files = list(Path(tmpdir).glob("ms_*.csv"))
+    # Test with milliseconds precision (default)
+    ms_channel = open_channel(
+        "test_value",
+        base_dir=mem_tmp_path,
+        file_name="ms_timestamp_test",
+        use_ms=True  # Use milliseconds precision (default)
+    )
+    
+    # Push a value
+    ms_channel.push(1.0)
+    ms_channel.close()
+    
+    # Find the created file
+    ms_files = list(mem_tmp_path.glob("ms_*.csv"))
+    
+    # Check file contents
+    with open(ms_files[0], 'r', newline='') as f:
+        reader = csv.reader(f)
+        rows = list(reader)
         
-        # Check file contents
-        with open(ms_files[0], 'r', newline='') as f:
-            reader = csv.reader(f)
-            rows = list(reader)
-            
-            # Verify timestamp is an integer with milliseconds precision
-            timestamp = int(rows[1][0])
-            # Should be a 13-digit number (milliseconds precision)
-            assert 1000000000000 < timestamp < 10000000000000
-
-
-def test_buffer_flushing():
+        # Verify timestamp is an integer with milliseconds precision
+        timestamp = int(rows[1][0])
+        # Should be a 13-digit number (milliseconds precision)
+        assert 1000000000000 < timestamp < 10000000000000
+
+
+def test_timestamps_ignore_wall_clock_steps(mem_tmp_path):
+    """A wall-clock step after open must not move row timestamps backwards."""
+    channel = open_channel("test_value", base_dir=mem_tmp_path, file_name="clock_step_test")
+    channel.push(1.0)
+    with patch("time.time", return_value=0.0), patch("time.time_ns", return_value=0):
+        channel.push(2.0)
+    channel.close()
+
+    with open(next(mem_tmp_path.glob("clock_step_*.csv")), 'r', newline='') as f:
+        rows = list(csv.reader(f))
+    first, second = int(rows[1][0]), int(rows[2][0])
+    assert 1000000000000 < first <= second
+
+
+def test_timestamps_follow_forward_clock_sync(mem_tmp_path):
+    """A wall clock set forward after open (NTP/GPS sync) is picked up at the next write."""
+    channel = open_channel("test_value", base_dir=mem_tmp_path, file_name="clock_sync_test")
+    channel._t0_ns -= 3600 * 1_000_000_000  # opened an hour before the clock was set
+    channel.push(1.0)
+    channel.flush()
+    channel.push(2.0)
+    channel.close()
+
+    with open(channel.file_path, 'r', newline='') as f:
+        rows = list(csv.reader(f))
+    first, second = int(rows[1][0]), int(rows[2][0])
+    assert second - first > 3500 * 1000
+
+
+def test_buffer_flushing(mem_tmp_path):
     """Test that buffer is flushed when it reaches buffer_size."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        buffer_size = 5
-        channel = open_channel(
-            "test_value",
-            base_dir=tmpdir,
-            file_name="buffer_test",
-            buffer_size=buffer_size
-        )
-        
-        # Push values up to buffer_size - 1
-        for i in range(buffer_size - 1):
-            channel.push(float(i))
-            
-        # Find the created file
-        csv_files = list(Path(tmpdir).glob("*.csv"))
-        
-        # Check that only the header is written
-        with open(csv_files[0], 'r', newline='') as f:
-            reader = csv.reader(f)
-            rows = list(reader)
-            assert len(rows) == 1  # Just the header
-        
-        # Push one more value to trigger flush
-        channel.push(float(buffer_size))
-        
-        # Check that all values are written
-        with open(csv_files[0], 'r', newline='') as f:
-            reader = csv.reader(f)
-            rows = list(reader)
-            assert len(rows) == buffer_size + 1  # Header + buffer_size rows
+    buffer_size = 5
+    channel = open_channel(
+        "test_value",
+        base_dir=mem_tmp_path,
+        file_name="buffer_test",
+        buffer_size=buffer_size,
+        flush_every=True
+    )
+    
+    # Push values up to buffer_size - 1
+    for i in range(buffer_size - 1):
+        channel.push(float(i))
         
-        channel.close()
+    # Find the created file
+    csv_files = list(mem_tmp_path.glob("*.csv"))
+    
+    # Check that only the header is written
+    with open(csv_files[0], 'r', newline='') as f:
+        reader = csv.reader(f)
+        rows = list(reader)
+        assert len(rows) == 1  # Just the header
+    
+    # Push one more value to trigger flush
+    channel.push(float(buffer_size))
+    
+    # Check that all values are written
+    with open(csv_files[0], 'r', newline='') as f:
+        reader = csv.reader(f)
+        rows = list(reader)
+        assert len(rows) == buffer_size + 1  # Header + buffer_size rows
+    
+    channel.close()
+
+
+def test_buffer_held_until_flush(mem_tmp_path):
+    """Without flush_every, full buffers stay in the file buffer until flush()."""
+    channel = open_channel("test_value", base_dir=mem_tmp_path, buffer_size=2)
+    for i in range(4):
+        channel.push(float(i))
+    assert channel.buffer == []
+
+    def rows():
+        with open(channel.file_path, 'r', newline='') as f:
+            return list(csv.reader(f))
+
+    assert len(rows()) == 1  # header only
+    channel.flush()
+    assert len(rows()) == 5
+    channel.close()
+
+
+def test_batched_flush_single_write(mem_tmp_path):
+    """A full buffer reaches the file in one write() call."""
+    buffer_size = 10
+    channel = open_channel(["x", "y"], base_dir=mem_tmp_path, buffer_size=buffer_size)
+
+    writes = []
+    channel.file = _WriteCounter(channel.file, writes)
+
+    for i in range(buffer_size * 2):
+        channel.push([i, i + 0.5])
+    assert len(writes) == 2
+    channel.file = channel.file.wrapped
+    channel.close()
 
+    with open(channel.file_path, 'r', newline='') as f:
+        rows = list(csv.reader(f))
+    assert len(rows) == 1 + buffer_size * 2
+    assert [float(v) for v in rows[-1][1:]] == [19, 19.5]
+    # same line terminator as csv.writer
+    assert open(channel.file_path, 'rb').read().count(b"\r\n") == len(rows)
 
-def test_error_handling():
+
+def test_writer_still_available(mem_tmp_path):
+    """channel.writer writes rows straight into the channel file."""
+    channel = open_channel(["x", "y"], base_dir=mem_tmp_path)
+    channel.push([1, 2])
+    channel.flush()
+    channel.writer.writerow(["note", "raw row"])
+    channel.close()
+    assert channel.writer is None
+
+    with open(channel.file_path, 'r', newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["timestamp", "x", "y"]
+    assert rows[1][1:] == ["1", "2"]
+    assert rows[2] == ["note", "raw row"]
+
+
+class _WriteCounter:
+    """File proxy that records each write() call."""
+
+    def __init__(self, wrapped, writes):
+        self.wrapped = wrapped
+        self._writes = writes
+
+    def write(self, data):
+        self._writes.append(data)
+        return self.wrapped.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.wrapped, name)
+
+
+def test_error_handling(mem_tmp_path):
     """Test error handling for invalid inputs."""
-    channel = open_channel("test")
+    channel = open_channel("test", base_dir=mem_tmp_path)
     
     # Test pushing wrong type to scalar channel
     with pytest.raises(ValueError):
@@ -197,7 +293,7 @@ def test_error_handling():
     channel.close()
     
     # Test multi-dimensional channel with wrong size
-    channel = open_channel(["x", "y", "z"])
+    channel = open_channel(["x", "y", "z"], base_dir=mem_tmp_path)
     
     with pytest.raises(ValueError):
         channel.push([1, 2])  # Only 2 values for 3 headers
@@ -205,27 +301,26 @@ def test_error_handling():
     channel.close()
 
 
-def test_cleanup():
+def test_cleanup(mem_tmp_path):
     """Test that channels are properly cleaned up."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Create a channel but don't explicitly close it
-        channel = open_channel(
-            "test_value",
-            base_dir=tmpdir,
-            file_name="cleanup_test"
-        )
-        
-        # Push a value
-        channel.push(1.0)
-        
-        # Let the channel go out of scope, which should trigger __del__
-        del channel
-        
-        # Find the created file
-        csv_files = list(Path(tmpdir).glob("*.csv"))
-        
-        # Check file contents to ensure data was written
-        with open(csv_files[0], 'r', newline='') as f:
-            reader = csv.reader(f)
-            rows = list(reader)
-            assert len(rows) == 2  # Header + 1 data row
+    # Create a channel but don't explicitly close it
+    channel = open_channel(
+        "test_value",
+        base_dir=mem_tmp_path,
+        file_name="cleanup_test"
+    )
+    
+    # Push a value
+    channel.push(1.0)
+    
+    # Let the channel go out of scope, which should trigger __del__
+    del channel
+    
+    # Find the created file
+    csv_files = list(mem_tmp_path.glob("*.csv"))
+    
+    # Check file contents to ensure data was written
+    with open(csv_files[0], 'r', newline='') as f:
+        reader = csv.reader(f)
+        rows = list(reader)
+        assert len(rows) == 2  # Header + 1 data row
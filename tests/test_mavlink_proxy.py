@@ -1,11 +1,15 @@
 from __future__ import annotations
 import asyncio, sys, time
+from collections import deque
 from pathlib import Path
 from types import SimpleNamespace
 from unittest.mock import MagicMock, patch, AsyncMock
+import logging
 import threading
+import shutil
 
 import pytest
+import pytest_asyncio
 
 # --------------------------------------------------------------------------- #
 # package under test                                                          #
@@ -59,27 +63,24 @@ class MockMavlink:
         self._log_entry_sent   = not log_entry
         self._px4_time_msg     = px4_time_msg
         self.mav               = MagicMock()
-        self._log_counter      = 0
+        self._log_queue        = deque([
+            SimpleNamespace(id=1, size=1024, time_utc=1612345678, num_logs=2),
+            SimpleNamespace(id=2, size=2048, time_utc=1612345679, num_logs=2),
+        ])
+        self._replies = {
+            "LOG_ENTRY": self._next_log_entry,
+            "AUTOPILOT_VERSION": lambda: self._px4_time_msg,
+        }
 
     def wait_heartbeat(self, timeout=5):
         return True
 
+    def _next_log_entry(self):
+        return self._log_queue.popleft() if self._log_queue else None
+
     def recv_match(self, blocking=False, type=None, timeout=None):
-        if type == "LOG_ENTRY":
-            if self._log_counter < 2:
-                self._log_counter += 1
-                idx     = self._log_counter
-                mock_msg = MagicMock()
-                mock_msg.id        = idx
-                mock_msg.size      = 1024 if idx == 1 else 2048
-                mock_msg.time_utc  = 1612345678 + (idx - 1)
-                mock_msg.num_logs  = 2
-                return mock_msg
-        elif type == "AUTOPILOT_VERSION":
-            if self._px4_time_msg is not None:
-                return self._px4_time_msg
-            return None
-        return None
+        reply = self._replies.get(type)
+        return reply() if reply is not None else None
     
     def close(self):
         return None
@@ -143,7 +144,7 @@ class MockFTP:
 # --------------------------------------------------------------------------- #
 
 class MockBlockingParser:
-    def __init__(self, logger, master, mavlink_proxy, debug=0):
+    def __init__(self, logger, master, mavlink_proxy, debug=0, max_backlog=None):
         self._log = logger.getChild("MockBlockingParser")
         self.master = master
         self.proxy = mavlink_proxy
@@ -223,6 +224,10 @@ class MockBlockingParser:
 
 from petal_app_manager.proxies import external as _px
 
+# MavLinkFTPProxy.stop() leaves its MavLinkExternalProxy running, so every
+# proxy built here is recorded and stopped by the stop_leaked_proxies fixture
+_live_proxies: list[MavLinkExternalProxy] = []
+
 def _patch_pymavlink(px4_time_msg=None):
     """Return context-manager patches for testing."""
     dummy_mavutil = SimpleNamespace(
@@ -256,6 +261,7 @@ async def build_proxy(px4_time_msg=None) -> MavLinkExternalProxy:
     p_pkg, p_mod1, p_mod2, p_mod3 = _patch_pymavlink(px4_time_msg)
     with p_pkg, p_mod1, p_mod2, p_mod3:
         proxy = MavLinkExternalProxy(endpoint="udp:dummy:14550", baud=57600, maxlen=200, source_system_id=1, source_component_id=1)
+        _live_proxies.append(proxy)
         await proxy.start()
         
         # Force connection establishment for testing
@@ -280,6 +286,7 @@ async def build_ftp_proxy(px4_time_msg=None) -> MavLinkFTPProxy:
         proxy = MavLinkExternalProxy(endpoint="udp:dummy:14550", baud=57600, maxlen=200, source_system_id=1, source_component_id=1)
 
         ftp_proxy = MavLinkFTPProxy(mavlink_proxy=proxy)
+        _live_proxies.append(proxy)
         await proxy.start()
         await ftp_proxy.start()
         
@@ -305,12 +312,22 @@ async def build_ftp_proxy(px4_time_msg=None) -> MavLinkFTPProxy:
 #  Pytest fixtures                                                            #
 # --------------------------------------------------------------------------- #
 
-@pytest.fixture(scope="session")
-def event_loop():
-    """Provide a session-wide asyncio loop (pytest-asyncio)."""
-    loop = asyncio.new_event_loop()
-    yield loop
-    loop.close()
+@pytest_asyncio.fixture(autouse=True)
+async def stop_leaked_proxies():
+    """Stop every MAVLink proxy a test built, so no I/O threads outlive it."""
+    started = len(_live_proxies)
+    yield
+    while len(_live_proxies) > started:
+        await _live_proxies.pop().stop()
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def shared_ftp_proxy():
+    """One started FTP proxy shared by the tests that only read through it."""
+    proxy = await build_ftp_proxy()
+    yield proxy
+    await proxy.stop()
+    _live_proxies.remove(proxy.mavlink_proxy)
+    await proxy.mavlink_proxy.stop()
 
 @pytest.fixture
 def hardware_cleanup():
@@ -362,23 +379,51 @@ def test_match_ls_to_entries_size_tolerance():
     assert len(res) == 2
     assert res[2][0] == "file2.ulg"
 
+
+def test_match_ls_to_entries_pairs_by_size_rank():
+    # Every file is within threshold of every entry; pairing must follow size order
+    ls_list = [("big.ulg", 5000), ("small.ulg", 3000), ("mid.ulg", 4000)]
+    entry_dict = {
+        1: {"size": 4010, "utc": 1},
+        2: {"size": 2990, "utc": 2},
+        3: {"size": 5020, "utc": 3},
+    }
+    res = _match_ls_to_entries(ls_list, entry_dict, threshold_size=4096)
+    assert {k: v[0] for k, v in res.items()} == {1: "mid.ulg", 2: "small.ulg", 3: "big.ulg"}
+
+def test_match_ls_to_entries_large_listing():
+    # Fleet-sized listing, shuffled, with per-entry size jitter inside the threshold
+    import random
+    rng = random.Random(0)
+    sizes = rng.sample(range(100_000, 100_000_000, 10_000), 2000)
+    ls_list = [(f"log{i}.ulg", size) for i, size in enumerate(sizes)]
+    rng.shuffle(ls_list)
+    entry_dict = {i: {"size": size + rng.randint(-100, 100), "utc": i} for i, size in enumerate(sizes)}
+
+    res = _match_ls_to_entries(ls_list, entry_dict, threshold_size=4096)
+    assert len(res) == 2000
+    assert all(res[i][0] == f"log{i}.ulg" for i in res)
+
+def test_dedupe_listing_keeps_order():
+    entry = lambda name, size, is_dir: SimpleNamespace(name=name, size_b=size, is_dir=is_dir)
+    listing = [entry("b.ulg", 2, False), entry("a.ulg", 1, False), entry("b.ulg", 2, False)]
+    assert _px._BlockingParser._dedupe_listing(listing) == [("b.ulg", 2, False), ("a.ulg", 1, False)]
+
 # --------------------------------------------------------------------------- #
 #  Tests – proxy init / list / ls / walk                                      #
 # --------------------------------------------------------------------------- #
 
-@pytest.mark.asyncio
-async def test_init():
+@pytest.mark.asyncio(loop_scope="module")
+async def test_init(shared_ftp_proxy):
     """Ensure proxy starts and has an FTP handle."""
-    proxy = await build_ftp_proxy()
+    proxy = shared_ftp_proxy
     # The parser is now initialized in start()
     assert proxy._parser is not None
     assert proxy._parser.ftp is not None
-    await proxy.stop()
 
-@pytest.mark.asyncio
-async def test_list_ulogs():
-    # Use build_proxy to set up a properly connected proxy
-    proxy = await build_ftp_proxy()
+@pytest.mark.asyncio(loop_scope="module")
+async def test_list_ulogs(shared_ftp_proxy):
+    proxy = shared_ftp_proxy
     
     # Patch the get_log_entries method to return mock data directly
     async def mock_get_log_entries(**kwargs):
@@ -397,10 +442,10 @@ async def test_list_ulogs():
         paths = {u.remote_path for u in ulogs}
         assert "fs/microsd/log/2023-01-01/log1.ulg" in paths
 
-@pytest.mark.asyncio
-async def test_ls():
+@pytest.mark.asyncio(loop_scope="module")
+async def test_ls(shared_ftp_proxy):
     """Test directory listing through mock."""
-    proxy = await build_ftp_proxy()
+    proxy = shared_ftp_proxy
     
     # Access through mock BlockingParser's _ls method
     dir_list = proxy._parser._ls("fs/microsd/log")
@@ -411,7 +456,6 @@ async def test_ls():
     
     # Verify directory flags
     assert all(item[2] is True for item in dir_list)
-    await proxy.stop()
 
 # --------------------------------------------------------------------------- #
 #  Tests – proxy download                                                     #
@@ -425,7 +469,7 @@ async def test_download(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
 
     proxy = await build_ftp_proxy()
     remote = "fs/microsd/log/2023-01-01/log1.ulg"
-    local = tmp_path / "log1.ulg"
+    local = tmp_path / "2023-01-01" / "log1.ulg"
 
     progress = []
     async def on_prog(frac):
@@ -437,6 +481,11 @@ async def test_download(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
     assert local.exists() and local.read_text() == "mock data"
     assert progress[-1] == 1.0
     assert completed_event.is_set()
+
+    # A destination directory removed between downloads is recreated
+    shutil.rmtree(local.parent)
+    await proxy.download_ulog(remote, local, threading.Event())
+    assert local.exists()
     await proxy.stop()
 
 # --------------------------------------------------------------------------- #
@@ -603,10 +652,10 @@ async def test_download_logs_hardware_integration(hardware_cleanup):
 #  Tests – _list_fail_logs and _delete functionality                          #
 # --------------------------------------------------------------------------- #
 
-@pytest.mark.asyncio
-async def test_list_fail_logs():
+@pytest.mark.asyncio(loop_scope="module")
+async def test_list_fail_logs(shared_ftp_proxy):
     """Test listing fail logs from the vehicle."""
-    proxy = await build_ftp_proxy()
+    proxy = shared_ftp_proxy
     
     # Test the _list_fail_logs method
     fail_logs = proxy._parser._list_fail_logs("fs/microsd")
@@ -625,58 +674,49 @@ async def test_list_fail_logs():
     paths = {log.remote_path for log in fail_logs}
     assert "fs/microsd/fail_boot.log" in paths
     assert "fs/microsd/fail_startup.log" in paths
-    
-    await proxy.stop()
 
-@pytest.mark.asyncio
-async def test_list_fail_logs_empty_directory():
+@pytest.mark.asyncio(loop_scope="module")
+async def test_list_fail_logs_empty_directory(shared_ftp_proxy):
     """Test listing fail logs from an empty directory."""
-    proxy = await build_ftp_proxy()
+    proxy = shared_ftp_proxy
     
     # Test with path that has no fail logs
     fail_logs = proxy._parser._list_fail_logs("fs/microsd/log")
     
     # Should find no fail logs
     assert len(fail_logs) == 0
-    
-    await proxy.stop()
 
-@pytest.mark.asyncio
-async def test_delete_functionality():
+@pytest.mark.asyncio(loop_scope="module")
+async def test_delete_functionality(shared_ftp_proxy):
     """Test the _delete method."""
-    proxy = await build_ftp_proxy()
+    proxy = shared_ftp_proxy
     
     # Test deleting a file
     result = proxy._parser._delete("fs/microsd/fail_boot.log")
     
     # Should return True for successful deletion
     assert result is True
-    
-    await proxy.stop()
 
-@pytest.mark.asyncio
-async def test_clear_error_logs():
+@pytest.mark.asyncio(loop_scope="module")
+async def test_clear_error_logs(shared_ftp_proxy):
     """Test clearing error logs functionality."""
-    proxy = await build_ftp_proxy()
+    proxy = shared_ftp_proxy
     
     # Test clearing error logs
     proxy._parser.clear_error_logs("fs/microsd")
     
     # The mock implementation should complete without error
     # In a real implementation, this would delete all fail_*.log files
-    
-    await proxy.stop()
 
-@pytest.mark.asyncio
-async def test_clear_error_logs_via_ftp_proxy():
+@pytest.mark.asyncio(loop_scope="module")
+async def test_clear_error_logs_via_ftp_proxy(shared_ftp_proxy):
     """Test clearing error logs through the FTP proxy."""
-    proxy = await build_ftp_proxy()
+    proxy = shared_ftp_proxy
     
     # Test clearing error logs through the proxy interface
     await proxy.clear_error_logs("fs/microsd")
     
     # Should complete without error
-    await proxy.stop()
 
 @pytest.mark.asyncio
 async def test_clear_error_logs_connection_error():
@@ -794,3 +834,119 @@ async def test_delete_with_retries():
             assert ftp_proxy._parser.delete_attempts == 3  # Should have taken 3 attempts
             
             await ftp_proxy.stop()
+
+
+def test_blocking_parser_rebinds_after_proxy_reconnect():
+    """After the proxy swaps its master, the parser follows without re-running __init__."""
+    old_master = SimpleNamespace(target_system=1, target_component=1)
+    new_master = SimpleNamespace(target_system=1, target_component=1)
+    proxy = SimpleNamespace(
+        master=old_master, connected=True, _mav_lock=threading.Lock(), root_sd_path="fs/microsd/log"
+    )
+    with patch.object(_px.mavftp, "MAVFTP", side_effect=lambda m, s, c: MockFTP(m, s, c)):
+        parser = _px._BlockingParser(logging.getLogger("test"), old_master, proxy)
+        first_ftp = parser.ftp
+        assert parser._rebind_connection() and parser.ftp is first_ftp
+
+        proxy.master = new_master
+        assert parser._rebind_connection()
+        assert parser.master is new_master and parser.ftp is not first_ftp
+
+        proxy.connected = False
+        assert not parser._rebind_connection()
+
+
+@pytest.mark.asyncio
+async def test_blocking_download_throttles_progress(tmp_path):
+    """Per-packet progress is coalesced, but the final 100 % always gets through."""
+    master = SimpleNamespace(target_system=1, target_component=1)
+    proxy = SimpleNamespace(
+        master=master, connected=True, _mav_lock=threading.Lock(),
+        _download_lock=threading.Lock(), root_sd_path="fs/microsd/log",
+        _loop=asyncio.get_running_loop(),
+    )
+    ftp = MockFTP(master)
+
+    def cmd_get(args, progress_callback=None):
+        for i in range(1001):
+            progress_callback(i / 1000)
+        Path(args[1]).write_text("mock data")
+        return MockFTPAck()
+    ftp.cmd_get = cmd_get
+
+    with patch.object(_px.mavftp, "MAVFTP", return_value=ftp):
+        parser = _px._BlockingParser(logging.getLogger("test"), master, proxy)
+    parser._reset_ftp_state = lambda: None
+
+    seen = []
+    async def on_progress(frac):
+        seen.append(frac)
+
+    await asyncio.get_running_loop().run_in_executor(
+        None, parser.download_ulog, "fs/microsd/log/a.ulg", tmp_path / "a.ulg", on_progress
+    )
+    await asyncio.sleep(0.05)
+
+    assert len(seen) <= 110
+    assert seen[-1] == 1.0
+
+
+def test_blocking_download_recovers_temp_file(tmp_path):
+    """If MAVFTP leaves the data in its temp file, it is moved into place."""
+    master = SimpleNamespace(target_system=1, target_component=1)
+    proxy = SimpleNamespace(
+        master=master, connected=True, _mav_lock=threading.Lock(),
+        _download_lock=threading.Lock(), root_sd_path="fs/microsd/log", _loop=None,
+    )
+    ftp = MockFTP(master)
+    ftp.temp_filename = str(tmp_path / "mavftp.tmp")
+    used = []
+
+    def cmd_get(args, progress_callback=None):
+        used.append(ftp.temp_filename)
+        Path(ftp.temp_filename).write_text("ulog bytes")
+        return MockFTPAck()
+    ftp.cmd_get = cmd_get
+
+    with patch.object(_px.mavftp, "MAVFTP", return_value=ftp):
+        parser = _px._BlockingParser(logging.getLogger("test"), master, proxy)
+    parser._reset_ftp_state = lambda: None
+
+    local = tmp_path / "a.ulg"
+    assert parser.download_ulog("fs/microsd/log/a.ulg", local) == str(local)
+    assert local.read_text() == "ulog bytes"
+    assert used == [str(local) + ".part"]
+    assert not Path(used[0]).exists()
+    # the shared MAVFTP object gets its own temp path back
+    assert ftp.temp_filename == str(tmp_path / "mavftp.tmp")
+
+
+def test_walk_ulogs_lists_dates_lazily():
+    """Each date directory is listed only when the walk reaches it."""
+    master = SimpleNamespace(target_system=1, target_component=1)
+    proxy = SimpleNamespace(
+        master=master, connected=True, root_sd_path="fs/microsd/log", _loop=None,
+    )
+    with patch.object(_px.mavftp, "MAVFTP", return_value=MockFTP(master)):
+        parser = _px._BlockingParser(logging.getLogger("test"), master, proxy)
+
+    listed = []
+    tree = {
+        "log": [("d1", 0, True), ("d2", 0, True), ("d3", 0, True), ("x.ulg", 1, False)],
+        "log/d1": [("a.ulg", 10, False), ("a.txt", 5, False)],
+        "log/d3": [("b.ulg", 20, False), ("sub", 0, True)],
+    }
+
+    def fake_ls(path, retries=5, delay=2.0):
+        listed.append(path)
+        if path not in tree:
+            raise RuntimeError("ls failed")
+        return tree[path]
+    parser._ls = fake_ls
+
+    walk = parser._walk_ulogs("log")
+    assert next(walk) == ("log/d1/a.ulg", 10)
+    assert listed == ["log", "log/d1"]
+    # d2 fails to list and is skipped
+    assert list(walk) == [("log/d3/b.ulg", 20)]
+    assert listed == ["log", "log/d1", "log/d2", "log/d3"]
@@ -3,7 +3,6 @@ Tests for the @mqtt_action decorator and auto-generated master command handler.
 """
 import asyncio
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
 
 from petal_app_manager.plugins.base import Petal
 from petal_app_manager.plugins.decorators import mqtt_action
@@ -35,6 +34,34 @@ class EmptyPetal(Petal):
     version = "0.1.0"
 
 
+class MqttStub:
+    """Records what a petal sends to / registers with the MQTT proxy."""
+    organization_id = "org-1"
+
+    def __init__(self):
+        self.sent = []
+        self.registered = []
+
+    async def send_command_response(self, **kwargs):
+        self.sent.append(kwargs)
+
+    def register_handler(self, handler, *args, **kwargs):
+        self.registered.append(handler)
+        return "sub-id-999"
+
+
+@pytest.fixture
+def ready_petal():
+    """A started SamplePetal with its dispatch table built and a stub MQTT proxy."""
+    petal = SamplePetal()
+    petal.startup()
+    handlers, cpu_flags = petal._collect_mqtt_actions()
+    petal._mqtt_command_handlers = handlers
+    petal._mqtt_cpu_heavy_commands = cpu_flags
+    petal._proxies = {"mqtt": MqttStub()}
+    return petal
+
+
 # ─── Decorator metadata tests ──────────────────────────────────────────────
 
 def test_mqtt_action_sets_metadata():
@@ -82,21 +109,25 @@ def test_collect_mqtt_actions():
     assert cpu_flags["test-petal/heavy_action"] is True
 
 
-# ─── Master handler dispatch tests ─────────────────────────────────────────
+def test_collect_mqtt_actions_follows_inheritance():
+    """Inherited actions are kept; an undecorated override drops one."""
+    class DerivedPetal(SamplePetal):
+        name = "derived-petal"
 
-@pytest.mark.asyncio
-async def test_master_handler_dispatches_light():
-    """Light command should be dispatched directly (no offloading)."""
-    petal = SamplePetal()
-    petal.startup()
+        async def handle_heavy(self, topic: str, message: dict):
+            pass
 
-    # Build handler table
-    handlers, cpu_flags = petal._collect_mqtt_actions()
-    petal._mqtt_command_handlers = handlers
-    petal._mqtt_cpu_heavy_commands = cpu_flags
+    handlers, cpu_flags = DerivedPetal()._collect_mqtt_actions()
 
-    mock_proxy = MagicMock()
-    petal._proxies = {"mqtt": mock_proxy}
+    assert list(handlers) == ["derived-petal/light_action"]
+    assert cpu_flags == {"derived-petal/light_action": False}
+
+
+# ─── Master handler dispatch tests ─────────────────────────────────────────
+
+async def test_master_handler_dispatches_light(ready_petal):
+    """Light command should be dispatched directly (no offloading)."""
+    petal = ready_petal
 
     await petal._mqtt_master_command_handler(
         "some/topic",
@@ -107,18 +138,9 @@ async def test_master_handler_dispatches_light():
     assert petal._call_log[0][0] == "light"
 
 
-@pytest.mark.asyncio
-async def test_master_handler_dispatches_heavy():
+async def test_master_handler_dispatches_heavy(ready_petal):
     """Heavy command should be dispatched via run_in_executor offloading."""
-    petal = SamplePetal()
-    petal.startup()
-
-    handlers, cpu_flags = petal._collect_mqtt_actions()
-    petal._mqtt_command_handlers = handlers
-    petal._mqtt_cpu_heavy_commands = cpu_flags
-
-    mock_proxy = MagicMock()
-    petal._proxies = {"mqtt": mock_proxy}
+    petal = ready_petal
     petal._loop = asyncio.get_running_loop()
 
     await petal._mqtt_master_command_handler(
@@ -130,19 +152,10 @@ async def test_master_handler_dispatches_heavy():
     assert petal._call_log[0][0] == "heavy"
 
 
-@pytest.mark.asyncio
-async def test_master_handler_unknown_command_for_petal():
+async def test_master_handler_unknown_command_for_petal(ready_petal):
     """Unknown command matching petal prefix should send error response."""
-    petal = SamplePetal()
-    petal.startup()
-
-    handlers, cpu_flags = petal._collect_mqtt_actions()
-    petal._mqtt_command_handlers = handlers
-    petal._mqtt_cpu_heavy_commands = cpu_flags
-
-    mock_proxy = MagicMock()
-    mock_proxy.send_command_response = AsyncMock()
-    petal._proxies = {"mqtt": mock_proxy}
+    petal = ready_petal
+    mock_proxy = petal._proxies["mqtt"]
 
     await petal._mqtt_master_command_handler(
         "some/topic",
@@ -154,25 +167,16 @@ async def test_master_handler_unknown_command_for_petal():
     )
 
     # Should have sent an error response
-    mock_proxy.send_command_response.assert_awaited_once()
-    call_kwargs = mock_proxy.send_command_response.call_args
-    assert call_kwargs.kwargs["response_data"]["error_code"] == "UNKNOWN_COMMAND"
-    assert "test-petal/light_action" in call_kwargs.kwargs["response_data"]["available_commands"]
+    assert len(mock_proxy.sent) == 1
+    response_data = mock_proxy.sent[0]["response_data"]
+    assert response_data["error_code"] == "UNKNOWN_COMMAND"
+    assert "test-petal/light_action" in response_data["available_commands"]
 
 
-@pytest.mark.asyncio
-async def test_master_handler_ignores_other_petal_commands():
+async def test_master_handler_ignores_other_petal_commands(ready_petal):
     """Commands not matching petal prefix should be silently ignored."""
-    petal = SamplePetal()
-    petal.startup()
-
-    handlers, cpu_flags = petal._collect_mqtt_actions()
-    petal._mqtt_command_handlers = handlers
-    petal._mqtt_cpu_heavy_commands = cpu_flags
-
-    mock_proxy = MagicMock()
-    mock_proxy.send_command_response = AsyncMock()
-    petal._proxies = {"mqtt": mock_proxy}
+    petal = ready_petal
+    mock_proxy = petal._proxies["mqtt"]
 
     await petal._mqtt_master_command_handler(
         "some/topic",
@@ -181,18 +185,16 @@ async def test_master_handler_ignores_other_petal_commands():
 
     # Should NOT have called any handler or sent error response
     assert len(petal._call_log) == 0
-    mock_proxy.send_command_response.assert_not_awaited()
+    assert mock_proxy.sent == []
 
 
-@pytest.mark.asyncio
 async def test_master_handler_not_initialized():
     """Master handler should warn when handlers not yet built."""
     petal = SamplePetal()
     petal.startup()
     # Do NOT build handlers
 
-    mock_proxy = MagicMock()
-    petal._proxies = {"mqtt": mock_proxy}
+    petal._proxies = {"mqtt": MqttStub()}
 
     # Should not raise, just warn
     await petal._mqtt_master_command_handler(
@@ -205,34 +207,29 @@ async def test_master_handler_not_initialized():
 
 # ─── _setup_mqtt_actions integration ───────────────────────────────────────
 
-@pytest.mark.asyncio
 async def test_setup_mqtt_actions_registers_handler():
     """_setup_mqtt_actions should call mqtt_proxy.register_handler."""
     petal = SamplePetal()
     petal.startup()
 
-    mock_proxy = MagicMock()
-    mock_proxy.register_handler = MagicMock(return_value="sub-id-999")
+    mock_proxy = MqttStub()
     petal._proxies = {"mqtt": mock_proxy}
 
     sub_id = await petal._setup_mqtt_actions()
 
     assert sub_id == "sub-id-999"
-    mock_proxy.register_handler.assert_called_once()
     # The registered handler should be the master handler
-    registered_fn = mock_proxy.register_handler.call_args[0][0]
-    assert registered_fn == petal._mqtt_master_command_handler
+    assert mock_proxy.registered == [petal._mqtt_master_command_handler]
 
 
-@pytest.mark.asyncio
 async def test_setup_mqtt_actions_no_actions():
     """_setup_mqtt_actions should return None for petals with no @mqtt_action."""
     petal = EmptyPetal()
 
-    mock_proxy = MagicMock()
+    mock_proxy = MqttStub()
     petal._proxies = {"mqtt": mock_proxy}
 
     sub_id = await petal._setup_mqtt_actions()
 
     assert sub_id is None
-    mock_proxy.register_handler.assert_not_called()
+    assert mock_proxy.registered == []
@@ -15,8 +15,8 @@ async def proxy() -> AsyncGenerator[MQTTProxy, None]:
     
     # Mock the OrganizationManager for testing - this needs to be active throughout the test
     with patch('petal_app_manager.proxies.mqtt.get_organization_manager') as mock_get_org_manager, \
-         patch('petal_app_manager.proxies.mqtt.requests.get') as mock_get, \
-         patch('petal_app_manager.proxies.mqtt.requests.request') as mock_request:
+         patch('petal_app_manager.proxies.mqtt.requests.Session.get') as mock_get, \
+         patch('petal_app_manager.proxies.mqtt.requests.Session.request') as mock_request:
         
         mock_org_manager = MagicMock()
         mock_org_manager.organization_id = "e8fc2cd9-f040-4229-84c0-62ea693b99f6"
@@ -71,8 +71,8 @@ async def proxy_no_callbacks() -> AsyncGenerator[MQTTProxy, None]:
     
     # Mock the OrganizationManager for testing - this needs to be active throughout the test
     with patch('petal_app_manager.proxies.mqtt.get_organization_manager') as mock_get_org_manager, \
-         patch('petal_app_manager.proxies.mqtt.requests.get') as mock_get, \
-         patch('petal_app_manager.proxies.mqtt.requests.request') as mock_request:
+         patch('petal_app_manager.proxies.mqtt.requests.Session.get') as mock_get, \
+         patch('petal_app_manager.proxies.mqtt.requests.Session.request') as mock_request:
         
         mock_org_manager = MagicMock()
         mock_org_manager.organization_id = "e8fc2cd9-f040-4229-84c0-62ea693b99f6"
@@ -166,7 +166,7 @@ async def test_connection_error_handling():
             enable_callbacks=False  # Disable callbacks to avoid port conflicts in tests
         )
         
-        with patch('requests.get') as mock_get:
+        with patch('requests.Session.get') as mock_get:
             # Make health check fail
             mock_get.side_effect = Exception("Connection failed")
             
@@ -191,7 +191,7 @@ async def test_missing_organization_id():
         proxy = MQTTProxy(enable_callbacks=False)  # Disable callbacks to avoid port conflicts
         
         # Mock health check to pass
-        with patch('petal_app_manager.proxies.mqtt.requests.get') as mock_get:
+        with patch('petal_app_manager.proxies.mqtt.requests.Session.get') as mock_get:
             mock_health_response = MagicMock()
             mock_health_response.status_code = 200
             mock_get.return_value = mock_health_response
@@ -246,7 +246,7 @@ async def test_check_ts_client_health_failure():
         
         proxy = MQTTProxy(enable_callbacks=False)  # Disable callbacks to avoid port conflicts
         
-        with patch('requests.get') as mock_get:
+        with patch('requests.Session.get') as mock_get:
             mock_get.side_effect = Exception("Connection failed")
             
             health_status = await proxy._check_ts_client_health()
@@ -261,7 +261,7 @@ async def test_make_ts_request_success(proxy: MQTTProxy):
     mock_response.status_code = 200
     mock_response.json.return_value = {"result": "success"}
     
-    with patch('requests.request', return_value=mock_response):
+    with patch('requests.Session.request', return_value=mock_response):
         result = await proxy._make_ts_request("POST", "/test", {"data": "test"})
         assert result == {"result": "success"}
 
@@ -274,7 +274,7 @@ async def test_make_ts_request_error(proxy: MQTTProxy):
     mock_response.status_code = 500
     mock_response.text = "Internal Server Error"
     
-    with patch('requests.request', return_value=mock_response):
+    with patch('requests.Session.request', return_value=mock_response):
         result = await proxy._make_ts_request("POST", "/test", {"data": "test"})
         assert "error" in result
         assert "500" in result["error"]
@@ -283,7 +283,7 @@ async def test_make_ts_request_error(proxy: MQTTProxy):
 @pytest.mark.asyncio
 async def test_make_ts_request_exception(proxy: MQTTProxy):
     """Test TypeScript client request with exception."""
-    with patch('requests.request', side_effect=Exception("Network error")):
+    with patch('requests.Session.request', side_effect=Exception("Network error")):
         result = await proxy._make_ts_request("POST", "/test", {"data": "test"})
         assert "error" in result
         assert "Network error" in result["error"]
@@ -299,7 +299,7 @@ async def test_publish_message_success(proxy: MQTTProxy):
     mock_response.status_code = 200
     mock_response.json.return_value = {"status": "success"}
     
-    with patch('requests.request', return_value=mock_response):
+    with patch('requests.Session.request', return_value=mock_response):
         result = await proxy.publish_message(
             {"message": "hello world"},
             qos=1
@@ -335,7 +335,7 @@ async def test_publish_message_error(proxy: MQTTProxy):
     mock_response.status_code = 200
     mock_response.json.return_value = {"error": "Publish failed"}
     
-    with patch('requests.request', return_value=mock_response):
+    with patch('requests.Session.request', return_value=mock_response):
         result = await proxy.publish_message({"message": "hello"})
         assert result is False
 
@@ -348,7 +348,7 @@ async def test_send_command_response(proxy: MQTTProxy):
     mock_response.status_code = 200
     mock_response.json.return_value = {"status": "success"}
     
-    with patch('requests.request', return_value=mock_response):
+    with patch('requests.Session.request', return_value=mock_response):
         result = await proxy.send_command_response(
             "msg-123",
             {"result": "completed"}
@@ -470,7 +470,7 @@ async def test_process_command_message(proxy: MQTTProxy):
     mock_response.status_code = 200
     mock_response.json.return_value = {"status": "success"}
     
-    with patch('requests.request', return_value=mock_response):
+    with patch('requests.Session.request', return_value=mock_response):
         command_topic = f"org/{proxy.organization_id}/device/{proxy.device_id}/command"
         command_payload = {
             "command": "get_status",
@@ -576,7 +576,7 @@ async def test_basic_workflow(proxy: MQTTProxy):
     async def test_callback(topic: str, payload: dict):
         messages_received.append((topic, payload))
     
-    with patch('requests.request', return_value=mock_response):
+    with patch('requests.Session.request', return_value=mock_response):
         # 1. Setup command topic subscription
         command_topic = f"org/{proxy.organization_id}/device/{proxy.device_id}/{proxy.command_edge_topic}"
         proxy.subscribed_topics.add(command_topic)
@@ -655,7 +655,7 @@ async def test_concurrent_operations(proxy: MQTTProxy):
     mock_response.status_code = 200
     mock_response.json.return_value = {"status": "success"}
     
-    with patch('requests.request', return_value=mock_response):
+    with patch('requests.Session.request', return_value=mock_response):
         # Run multiple publish operations concurrently (all to command/web topic)
         publish_tasks = [
             proxy.publish_message({"message": f"test{i}"})
@@ -847,3 +847,11 @@ async def test_cpu_heavy_handler_invoked(proxy: MQTTProxy):
 
     assert len(call_log) == 1
     assert call_log[0] == ("heavy", command_topic, {"data": "heavy_test"})
+
+
+def test_identity_unset_before_start():
+    """Identity attributes exist (as None) before start() resolves them."""
+    proxy = MQTTProxy(enable_callbacks=False)
+    assert proxy.robot_instance_id is None
+    assert proxy.device_id is None
+    assert proxy._get_base_topic() is None
@@ -28,93 +28,66 @@ def dummy_proxies():
     # Simulate proxies dict with dummy objects
     return {"redis": MagicMock(), "cloud": MagicMock(), "ext_mavlink": MagicMock()}
 
+class DummyEP:
+    def __init__(self, name):
+        self.name = name
+    def load(self):
+        class DummyPetal:
+            name = self.name
+            version = "1.0"
+            def inject_proxies(self, proxies): self._proxies = proxies
+            def startup(self): pass
+        return DummyPetal
+
+# Entry points never change between tests, so build them once
+DUMMY_EPS = (
+    DummyEP("petal_warehouse"),
+    DummyEP("flight_records"),
+    DummyEP("mission_planner"),
+)
+
+PETAL_NAMES = ["petal_warehouse", "flight_records", "mission_planner"]
+PETAL_DEPENDENCIES = {
+    "petal_warehouse": ["redis", "ext_mavlink"],
+    "flight_records": ["redis", "cloud"],
+    "mission_planner": ["redis", "ext_mavlink"]
+}
+
 @pytest.fixture
 def dummy_entry_points(monkeypatch):
-    class DummyEP:
-        def __init__(self, name):
-            self.name = name
-        def load(self):
-            class DummyPetal:
-                name = self.name
-                version = "1.0"
-                def inject_proxies(self, proxies): self._proxies = proxies
-                def startup(self): pass
-            return DummyPetal
-    eps = [
-        DummyEP("petal_warehouse"),
-        DummyEP("flight_records"),
-        DummyEP("mission_planner"),
-    ]
-    monkeypatch.setattr("importlib.metadata.entry_points", lambda group=None: eps if group == "petal.plugins" else [])
+    monkeypatch.setattr("importlib.metadata.entry_points", lambda group=None: list(DUMMY_EPS) if group == "petal.plugins" else [])
     yield
 
-def test_petals_loaded_when_dependencies_met(tmp_path, monkeypatch, dummy_app, dummy_proxies, mock_logger, dummy_entry_points):
-    config = {
-        "enabled_proxies": ["redis", "cloud", "ext_mavlink"],
-        "enabled_petals": ["petal_warehouse", "flight_records", "mission_planner"],
-        "petal_dependencies": {
-            "petal_warehouse": ["redis", "ext_mavlink"],
-            "flight_records": ["redis", "cloud"],
-            "mission_planner": ["redis", "ext_mavlink"]
-        }
+def make_config(enabled_proxies):
+    """A parsed proxies.yaml enabling *enabled_proxies*."""
+    return {
+        "enabled_proxies": enabled_proxies,
+        "enabled_petals": PETAL_NAMES,
+        "petal_dependencies": PETAL_DEPENDENCIES,
     }
-    
-    # Mock load_proxies_config directly - simpler and more reliable
-    def mock_load_config(config_path):
-        return config
-    
-    monkeypatch.setattr("petal_app_manager.config.load_proxies_config", mock_load_config)
 
-    petal_name_list = ["petal_warehouse", "flight_records", "mission_planner"]
-    petals = load_petals(dummy_app, petal_name_list, dummy_proxies, mock_logger)
+def test_petals_loaded_when_dependencies_met(dummy_app, dummy_proxies, mock_logger, dummy_entry_points):
+    config = make_config(["redis", "cloud", "ext_mavlink"])
+
+    petals = load_petals(dummy_app, PETAL_NAMES, dummy_proxies, mock_logger, proxies_config=config)
     loaded_names = [p.name for p in petals]
     assert set(loaded_names) == {"petal_warehouse", "flight_records", "mission_planner"}
     assert not mock_logger.errors
 
-def test_petals_skipped_when_proxy_missing(tmp_path, monkeypatch, dummy_app, dummy_proxies, mock_logger, dummy_entry_points):
-    config = {
-        "enabled_proxies": ["redis"],
-        "enabled_petals": ["petal_warehouse", "flight_records", "mission_planner"],
-        "petal_dependencies": {
-            "petal_warehouse": ["redis", "ext_mavlink"],
-            "flight_records": ["redis", "cloud"],
-            "mission_planner": ["redis", "ext_mavlink"]
-        }
-    }
-    
-    # Mock load_proxies_config directly - simpler and more reliable
-    def mock_load_config(config_path):
-        return config
-    
-    monkeypatch.setattr("petal_app_manager.config.load_proxies_config", mock_load_config)
+def test_petals_skipped_when_proxy_missing(dummy_app, dummy_proxies, mock_logger, dummy_entry_points):
+    config = make_config(["redis"])
 
-    petal_name_list = ["petal_warehouse", "flight_records", "mission_planner"]
-    petals = load_petals(dummy_app, petal_name_list, {"redis": MagicMock()}, mock_logger)
+    petals = load_petals(dummy_app, PETAL_NAMES, {"redis": MagicMock()}, mock_logger, proxies_config=config)
     loaded_names = [p.name for p in petals]
     assert loaded_names == []
     assert any("Cannot load petal_warehouse" in e for e in mock_logger.errors)
     assert any("Cannot load flight_records" in e for e in mock_logger.errors)
     assert any("Cannot load mission_planner" in e for e in mock_logger.errors)
 
-def test_partial_petals_loaded(tmp_path, monkeypatch, dummy_app, dummy_proxies, mock_logger, dummy_entry_points):
-    config = {
-        "enabled_proxies": ["redis", "ext_mavlink"],
-        "enabled_petals": ["petal_warehouse", "flight_records", "mission_planner"],
-        "petal_dependencies": {
-            "petal_warehouse": ["redis", "ext_mavlink"],
-            "flight_records": ["redis", "cloud"],
-            "mission_planner": ["redis", "ext_mavlink"]
-        }
-    }
-    
-    # Mock load_proxies_config directly - simpler and more reliable
-    def mock_load_config(config_path):
-        return config
-    
-    monkeypatch.setattr("petal_app_manager.config.load_proxies_config", mock_load_config)
+def test_partial_petals_loaded(dummy_app, dummy_proxies, mock_logger, dummy_entry_points):
+    config = make_config(["redis", "ext_mavlink"])
 
-    petal_name_list = ["petal_warehouse", "flight_records", "mission_planner"]
-    petals = load_petals(dummy_app, petal_name_list, {"redis": MagicMock(), "ext_mavlink": MagicMock()}, mock_logger)
+    petals = load_petals(dummy_app, PETAL_NAMES, {"redis": MagicMock(), "ext_mavlink": MagicMock()}, mock_logger, proxies_config=config)
     loaded_names = [p.name for p in petals]
     print("Loaded petals:", loaded_names)
     print("Logger errors:", mock_logger.errors)
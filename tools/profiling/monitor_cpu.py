@@ -12,29 +12,48 @@ Usage:
 
 import argparse
 import subprocess
-import psutil
 import time
 import sys
-import csv
 import signal
+import threading
+from array import array
 from datetime import datetime
 from pathlib import Path
 
-# Global flag for graceful shutdown
-interrupted = False
+# Imported by ProcessCPUMonitor so that --help and argument errors skip it
+psutil = None
 
 
-def signal_handler(signum, frame):
-    """Handle interruption signals gracefully"""
-    global interrupted
-    interrupted = True
-    print("\n[Monitor] Received interrupt signal, saving data...")
+def install_stop_handlers(stop_event: threading.Event):
+    """Set *stop_event* on SIGINT/SIGTERM so monitoring ends gracefully"""
+    def signal_handler(signum, frame):
+        stop_event.set()
+        print("\n[Monitor] Received interrupt signal, saving data...")
+    
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
 
 
 class ProcessCPUMonitor:
     """Monitor CPU usage for PAM process over time"""
     
-    def __init__(self, max_retries: int = 10, retry_delay: float = 1.0):
+    __slots__ = (
+        'max_retries', 'retry_delay', 'pid', 'process', '_stop',
+        'timestamps', 'elapsed_seconds', 'cpu_percent', 'memory_mb', 'memory_percent',
+        'csv_path', '_csv_file',
+    )
+    
+    CSV_HEADER = 'elapsed_seconds,cpu_percent,memory_mb,memory_percent,timestamp\r\n'
+    # All fields are numbers or ISO dates, so rows need no CSV quoting
+    CSV_ROW = '%.2f,%r,%.2f,%.2f,%s\r\n'
+    
+    def __init__(self, max_retries: int = 10, retry_delay: float = 1.0, csv_path: str = None,
+                 stop_event: threading.Event = None):
+        global psutil
+        import psutil
+        
+        # Set to end monitor_continuous; waiting on it doubles as the tick sleep
+        self._stop = stop_event if stop_event is not None else threading.Event()
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.pid = self._find_pam_pid()
@@ -43,7 +62,16 @@ class ProcessCPUMonitor:
             raise RuntimeError("PAM process not found. Is it running?")
         
         self.process = psutil.Process(self.pid)
-        self.timeseries_data = []
+        # One packed float64 column per series instead of a dict per sample
+        self.timestamps = array('d')        # Unix epoch seconds
+        self.elapsed_seconds = array('d')
+        self.cpu_percent = array('d')
+        self.memory_mb = array('d')
+        self.memory_percent = array('d')
+        
+        # Rows are streamed here as they are sampled, so a killed run keeps them
+        self.csv_path = csv_path
+        self._csv_file = None
         
         # Get system info
         cpu_count_logical = psutil.cpu_count(logical=True)
@@ -60,7 +88,7 @@ class ProcessCPUMonitor:
         for attempt in range(self.max_retries):
             try:
                 # List processes with an open INET listening socket on port 9000
-                for proc in psutil.process_iter(attrs=["pid", "name", "cmdline"]):
+                for proc in psutil.process_iter(attrs=["pid", "cmdline"]):
                     try:
                         cmd = " ".join(proc.info.get("cmdline") or [])
                         if "uvicorn" not in cmd or "petal_app_manager" not in cmd:
@@ -83,15 +111,24 @@ class ProcessCPUMonitor:
         return None
 
     
+    def __len__(self):
+        """Number of snapshots collected so far"""
+        return len(self.timestamps)
+
     def get_cpu_snapshot(self, interval: float = 1.0, elapsed_time: float = 0.0):
-        """Get single CPU and memory measurement"""
-        timestamp = datetime.now()
+        """Get single CPU and memory measurement (interval=None: since last call)"""
+        timestamp = time.time()
         
         try:
-            cpu_percent = self.process.cpu_percent(interval=interval)
-            mem_info = self.process.memory_info()
-            mem_mb = mem_info.rss / (1024 * 1024)  # Convert bytes to MB
-            mem_percent = self.process.memory_percent()
+            if interval:
+                # Same as cpu_percent(interval=interval): measure over a fresh window
+                self.process.cpu_percent(interval=None)
+                time.sleep(interval)
+            # One pass over /proc/<pid> for all three values
+            info = self.process.as_dict(attrs=['cpu_percent', 'memory_info', 'memory_percent'])
+            cpu_percent = info['cpu_percent']
+            mem_mb = info['memory_info'].rss / (1 << 20)  # Convert bytes to MB
+            mem_percent = info['memory_percent']
         except psutil.NoSuchProcess:
             # Process terminated, return 0
             print(f"\nWarning: PAM process terminated (PID: {self.pid})")
@@ -99,92 +136,115 @@ class ProcessCPUMonitor:
             mem_mb = 0.0
             mem_percent = 0.0
         
-        self.timeseries_data.append({
-            'timestamp': timestamp,
-            'elapsed_seconds': elapsed_time,
-            'cpu_percent': cpu_percent,
-            'memory_mb': mem_mb,
-            'memory_percent': mem_percent
-        })
+        self.timestamps.append(timestamp)
+        self.elapsed_seconds.append(elapsed_time)
+        self.cpu_percent.append(cpu_percent)
+        self.memory_mb.append(mem_mb)
+        self.memory_percent.append(mem_percent)
+        
+        if self.csv_path:
+            self._append_csv_row(elapsed_time, cpu_percent, mem_mb, mem_percent, timestamp)
         
         return timestamp, cpu_percent, mem_mb
     
+    @staticmethod
+    def _csv_row(elapsed, cpu, mem_mb, mem_pct, ts):
+        """Format one sample as a CSV line"""
+        return ProcessCPUMonitor.CSV_ROW % (
+            elapsed, cpu, mem_mb, mem_pct, datetime.fromtimestamp(ts).isoformat())
+    
+    def _append_csv_row(self, *sample):
+        """Write one sample to csv_path, creating the file on the first sample"""
+        if self._csv_file is None:
+            # Line-buffered: every row reaches the OS as soon as it is written
+            self._csv_file = open(self.csv_path, 'w', newline='', buffering=1)
+            self._csv_file.write(self.CSV_HEADER)
+        self._csv_file.write(self._csv_row(*sample))
+    
+    def close(self):
+        """Close the streamed CSV file, if any"""
+        if self._csv_file is not None:
+            self._csv_file.close()
+            self._csv_file = None
+            print(f"Saved data to: {self.csv_path}")
+    
     def monitor_continuous(self, interval: int):
         """Monitor continuously until interrupted"""
-        global interrupted
-        start_time = time.time()
+        # Prime psutil's CPU counters: later non-blocking reads report usage
+        # since the previous call, i.e. over exactly one interval
+        self.process.cpu_percent(interval=None)
+        start_time = time.monotonic()
         snapshot_count = 0
         
         print(f"Monitoring until interrupted (interval: {interval}s)")
         print(f"Press Ctrl+C to stop\n")
         
         try:
-            while not interrupted:
+            while True:
+                # Wait until the next fixed deadline so the cadence does not drift;
+                # a stop request wakes the wait immediately
+                deadline = start_time + (snapshot_count + 1) * interval
+                if self._stop.wait(max(0.0, deadline - time.monotonic())):
+                    break
+                
                 # Check if process still exists
                 if not self.process.is_running():
                     print(f"\nPAM process terminated. Stopping monitoring.")
                     break
                 
-                elapsed = time.time() - start_time
-                timestamp, cpu_pct, mem_mb = self.get_cpu_snapshot(interval=interval, elapsed_time=elapsed)
+                elapsed = time.monotonic() - start_time
+                timestamp, cpu_pct, mem_mb = self.get_cpu_snapshot(interval=None, elapsed_time=elapsed)
                 snapshot_count += 1
                 
                 print(f"[{elapsed:6.1f}s] CPU: {cpu_pct:6.2f}%  Memory: {mem_mb:8.1f} MB")
-                
-                # Sleep until next interval
-                next_snapshot = snapshot_count * interval
-                sleep_time = max(0, next_snapshot - elapsed)
-                
-                if sleep_time > 0 and not interrupted:
-                    time.sleep(sleep_time)
         
         except KeyboardInterrupt:
             print("\n\n[Monitor] Monitoring interrupted by user")
         except psutil.NoSuchProcess:
             print("\n\n[Monitor] PAM process terminated unexpectedly")
         
-        if interrupted:
+        if self._stop.is_set():
             print(f"\n[Monitor] Interrupted. Collected {snapshot_count} snapshots.")
         else:
             print(f"\nComplete. Collected {snapshot_count} snapshots.")
     
     def save_to_csv(self, output_path: str):
         """Export time-series data to CSV"""
-        if not self.timeseries_data:
+        if not len(self):
             print("No data to save")
             return
             
         with open(output_path, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(['elapsed_seconds', 'cpu_percent', 'memory_mb', 'memory_percent', 'timestamp'])
-            
-            for data in self.timeseries_data:
-                writer.writerow([
-                    f"{data['elapsed_seconds']:.2f}",
-                    data['cpu_percent'],
-                    f"{data['memory_mb']:.2f}",
-                    f"{data['memory_percent']:.2f}",
-                    data['timestamp'].isoformat()
-                ])
+            f.write(self.CSV_HEADER)
+            f.write(''.join([
+                self._csv_row(*sample)
+                for sample in zip(
+                    self.elapsed_seconds, self.cpu_percent, self.memory_mb,
+                    self.memory_percent, self.timestamps)
+            ]))
         
         print(f"Saved data to: {output_path}")
     
     def plot(self, output_path: str = None):
         """Generate CPU and memory usage plot"""
         try:
+            import matplotlib
+            if output_path:
+                # Saving to a file needs no GUI toolkit; skip the backend probe
+                matplotlib.use("Agg")
             import matplotlib.pyplot as plt
-            import matplotlib.dates as mdates
         except ImportError:
             print("Error: matplotlib not found. Install with: pip install matplotlib")
             return
         
-        if not self.timeseries_data:
+        if not len(self):
             print("No data to plot")
             return
         
-        elapsed_times = [d['elapsed_seconds'] for d in self.timeseries_data]
-        cpu_values = [d['cpu_percent'] for d in self.timeseries_data]
-        memory_mb_values = [d['memory_mb'] for d in self.timeseries_data]
+        # matplotlib reads the packed columns through the buffer protocol
+        elapsed_times = self.elapsed_seconds
+        cpu_values = self.cpu_percent
+        memory_mb_values = self.memory_mb
         
         # Create figure with two subplots
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10), sharex=True)
@@ -272,8 +332,8 @@ Examples:
     png_path = args.output / f"{base_name}.png"
     
     # Setup signal handlers for graceful shutdown
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    stop_event = threading.Event()
+    install_stop_handlers(stop_event)
     
     print(f"Output files:")
     print(f"  CSV:  {csv_path}")
@@ -283,7 +343,7 @@ Examples:
     
     monitor = None
     try:
-        monitor = ProcessCPUMonitor()
+        monitor = ProcessCPUMonitor(csv_path=str(csv_path), stop_event=stop_event)
         
         # Run monitoring
         monitor.monitor_continuous(interval=args.interval)
@@ -297,11 +357,10 @@ Examples:
         traceback.print_exc()
         sys.exit(1)
     finally:
-        # Always save data, even if interrupted
-        if monitor and monitor.timeseries_data:
+        # Rows were streamed to the CSV as they came in; just close it
+        if monitor and len(monitor):
             print()
-            # Save data
-            monitor.save_to_csv(str(csv_path))
+            monitor.close()
             
             # Generate plot
             if args.plot:
@@ -11,15 +11,43 @@ Usage:
 """
 
 import argparse
+import os
+import re
+import shutil
 import subprocess
-import psutil
 import sys
-import time
 import signal
-from datetime import datetime
+import struct
+import threading
+import time
 from pathlib import Path
 
-# Global flag for graceful shutdown
+# Same pattern the old `pgrep -af` used, matched against the full command line
+PAM_CMDLINE = re.compile(rb"uvicorn.*petal_app_manager")
+# Tags a candidate as debugpy's launcher or its runtime ("--connect") child
+DEBUGPY_ROLE = re.compile(rb"debugpy(/launcher| --connect)")
+PAM_PORT = 9000
+TCP_LISTEN = "0A"
+
+# py-spy may run under sudo (different PATH), so prefer the copy next to this
+# interpreter and fall back to whatever is on PATH; resolved once at import
+_VENV_PYSPY = Path(sys.executable).parent / "py-spy"
+PYSPY = str(_VENV_PYSPY) if _VENV_PYSPY.exists() else (shutil.which("py-spy") or str(_VENV_PYSPY))
+
+# py-spy output format -> profile file suffix. "raw" is folded stacks: one
+# line per unique stack, far smaller than speedscope JSON on long captures
+PROFILE_SUFFIXES = {
+    "speedscope": ".speedscope.json",
+    "raw": ".folded.txt",
+}
+
+# Renders folded stacks to an SVG flame graph, so one raw capture yields both
+# a speedscope profile (it opens folded files directly) and a flame graph
+FLAMEGRAPH = shutil.which("inferno-flamegraph") or shutil.which("flamegraph.pl")
+
+# Set by Ctrl+C/SIGTERM or when py-spy exits; run_profiling blocks on it
+stop_event = threading.Event()
+# Tells an interrupt apart from a chunk ending (both set stop_event)
 interrupted = False
 
 
@@ -27,89 +55,257 @@ def signal_handler(signum, frame):
     """Handle interruption signals gracefully"""
     global interrupted
     interrupted = True
+    stop_event.set()
     print("\n[Profiler] Received interrupt signal, stopping profiler...")
 
 
+def _pam_candidates() -> list[tuple[int, str, bytes]]:
+    """(pid, cmdline, debugpy role) of every process matching PAM_CMDLINE.
+
+    The role is ``b"/launcher"``, ``b" --connect"`` or ``b""`` (no debugpy),
+    classified once here so callers don't rescan the command line.
+    """
+    matches = []
+    for entry in os.scandir("/proc"):
+        if not entry.name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry.name}/cmdline", "rb") as f:
+                cmdline = f.read().replace(b"\0", b" ").strip()
+        except OSError:
+            continue  # exited, or a kernel thread we cannot read
+        if PAM_CMDLINE.search(cmdline):
+            role = DEBUGPY_ROLE.search(cmdline)
+            matches.append((int(entry.name), cmdline.decode(errors="replace"),
+                            role[1] if role else b""))
+    matches.sort()
+    return matches
+
+
+def _ppid(pid: int) -> int | None:
+    """Parent PID of *pid* from /proc/<pid>/stat, or None if it is gone."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            # comm (field 2) may contain spaces/parens, so split after its last ")"
+            return int(f.read().rsplit(b") ", 1)[1].split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def _listening_socket_inodes(port: int) -> set[str]:
+    """Inodes of the TCP sockets LISTENing on *port*, from /proc/net/tcp{,6}."""
+    suffix = f":{port:04X}"
+    inodes = set()
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table) as f:
+                next(f)  # header
+                for line in f:
+                    fields = line.split()
+                    if fields[1].endswith(suffix) and fields[3] == TCP_LISTEN:
+                        inodes.add(fields[9])
+        except OSError:
+            continue
+    return inodes
+
+
+def _owns_socket(pid: int, inodes: set[str]) -> bool:
+    """Whether any fd of *pid* is one of the socket *inodes*."""
+    fd_dir = f"/proc/{pid}/fd"
+    try:
+        fds = os.listdir(fd_dir)
+    except OSError:
+        return False  # exited, or not ours to inspect
+    for fd in fds:
+        try:
+            link = os.readlink(f"{fd_dir}/{fd}")
+        except OSError:
+            continue
+        if link.startswith("socket:[") and link[8:-1] in inodes:
+            return True
+    return False
+
+
+# Capability bit for ptrace (linux/capability.h) and the vfs_cap_data flag
+# that makes file capabilities effective at exec
+CAP_SYS_PTRACE = 19
+VFS_CAP_FLAGS_EFFECTIVE = 0x1
+
+
+def _has_ptrace_file_cap(path: str) -> bool:
+    """Whether *path* carries ``cap_sys_ptrace+ep`` as a file capability.
+
+    Decodes the ``security.capability`` xattr (``struct vfs_cap_data``): a
+    le32 ``magic_etc`` followed by the low permitted word. Any other xattr
+    content, e.g. ``setcap cap_net_raw+ep``, does not let py-spy attach.
+    """
+    try:
+        raw = os.getxattr(path, "security.capability")
+        magic_etc, permitted = struct.unpack_from("<II", raw)
+    except (OSError, struct.error):
+        return False  # no file capabilities, no xattr support, or a short blob
+    return bool(magic_etc & VFS_CAP_FLAGS_EFFECTIVE) and bool(permitted >> CAP_SYS_PTRACE & 1)
+
+
+def _ptrace_scope() -> int:
+    """Yama's ``ptrace_scope`` (0 when Yama is absent)."""
+    try:
+        with open("/proc/sys/kernel/yama/ptrace_scope") as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return 0
+
+
+def _needs_sudo(pid: int) -> bool:
+    """Whether py-spy needs sudo to ptrace *pid*.
+
+    Not needed when we are root, when PYSPY carries ``cap_sys_ptrace+ep``
+    (unless Yama's ``ptrace_scope`` is 3, which blocks every attach), or
+    when *pid* runs as our uid and Yama allows ptracing non-descendants
+    (``ptrace_scope`` 0 or Yama absent).
+    """
+    if os.geteuid() == 0:
+        return False
+    scope = _ptrace_scope()
+    if scope >= 3:
+        return True
+    if _has_ptrace_file_cap(PYSPY):
+        return False
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            uid = next(int(line.split()[1]) for line in f if line.startswith("Uid:"))
+    except (OSError, StopIteration):
+        return True
+    if uid != os.geteuid():
+        return True
+    return scope != 0
+
+
+def _drop_from_page_cache(path: Path):
+    """Evict *path* from the page cache so the profile doesn't push out PAM's pages.
+
+    The profile is read at most once more (by speedscope), so keeping it
+    cached only costs the profiled process memory. Best effort: silently
+    skipped where posix_fadvise is unavailable or the file isn't readable.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)  # DONTNEED leaves dirty pages alone
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
 class PySpyProfiler:
     """Manages py-spy profiling sessions for PAM"""
 
-    def __init__(self, scenario: str, output_dir: Path):
+    __slots__ = (
+        'scenario', 'output_dir', 'rate', 'include_idle', 'nonblocking', 'native',
+        'timestamp', 'base_name', 'output_format', 'profile_file', 'flamegraph_file',
+        'chunk_seconds', 'max_chunks',
+    )
+
+    def __init__(self, scenario: str, output_dir: Path, rate: int = 100,
+                 include_idle: bool = True, nonblocking: bool = False,
+                 output_format: str = "speedscope", native: bool = False,
+                 chunk_seconds: int | None = None, max_chunks: int | None = None):
         self.scenario = scenario
         self.output_dir = output_dir
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        # py-spy's cost on PAM grows linearly with the sampling rate
+        self.rate = rate
+        self.include_idle = include_idle
+        # Read PAM's memory without pausing it (samples may be slightly torn)
+        self.nonblocking = nonblocking
+        # Unwind C frames too (pyserial/pymavlink/uvloop); costlier per sample, Linux only
+        if native and not sys.platform.startswith("linux"):
+            print("[Profiler] ⚠ --native is only supported on Linux here, ignoring it")
+            native = False
+        self.native = native
+        # Rotate to a new file every chunk_seconds, keeping the newest max_chunks
+        self.chunk_seconds = chunk_seconds
+        self.max_chunks = max_chunks
+        if not self.output_dir.is_dir():  # usually exists: one stat, no failing mkdir
+            self.output_dir.mkdir(parents=True, exist_ok=True)
         
         # Generate timestamped base filename
-        self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.base_name = f"pam_{scenario}_{self.timestamp}_profile"
+        self.timestamp = time.strftime("%Y%m%d_%H%M%S")
+        self.base_name = f"pam_{scenario}_{self.timestamp}{'_native' if native else ''}_profile"
         
-        # Output file for speedscope format
-        self.speedscope_file = self.output_dir / f"{self.base_name}.speedscope.json"
+        # Output file in the chosen py-spy format
+        self.output_format = output_format
+        self._set_output(self.base_name)
+
+    def _set_output(self, name: str):
+        """Point profile_file/flamegraph_file at *name* in output_dir"""
+        self.profile_file = self.output_dir / f"{name}{PROFILE_SUFFIXES[self.output_format]}"
+        self.flamegraph_file = self.output_dir / f"{name}.flamegraph.svg"
+
+    def _finish_part(self, part: int):
+        """Wrap up a completed chunk and drop chunks beyond max_chunks"""
+        if self.profile_file.exists():
+            _drop_from_page_cache(self.profile_file)
+            print(f"[Profiler] Chunk saved: {self.profile_file}")
+            if self.output_format == "raw":
+                self.render_flamegraph()
+        # The next chunk is about to start, so make room for it
+        if self.max_chunks and part >= self.max_chunks:
+            oldest = f"{self.base_name}_part{part + 1 - self.max_chunks:03d}"
+            (self.output_dir / f"{oldest}{PROFILE_SUFFIXES[self.output_format]}").unlink(missing_ok=True)
+            (self.output_dir / f"{oldest}.flamegraph.svg").unlink(missing_ok=True)
 
     def find_pam_process(self) -> int | None:
         """Find running PAM uvicorn process PID (the real server/runtime PID)."""
-        try:
-            # Get PID + full command line so we can disambiguate matches
-            result = subprocess.run(
-                ["pgrep", "-af", r"uvicorn.*petal_app_manager"],
-                capture_output=True,
-                text=True,
-                check=True,
-            )
-            lines = [l.strip() for l in result.stdout.splitlines() if l.strip()]
-            if not lines:
-                return None
-
-            # Parse (pid, cmdline)
-            matches: list[tuple[int, str]] = []
-            for line in lines:
-                parts = line.split(maxsplit=1)
-                if not parts:
-                    continue
-                try:
-                    pid = int(parts[0])
-                except ValueError:
-                    continue
-                cmd = parts[1] if len(parts) > 1 else ""
-                matches.append((pid, cmd))
-
-            if not matches:
-                return None
-
-            # 1) Prefer the actual debugpy runtime process (not the launcher)
-            # launcher looks like: ".../debugpy/launcher ..."
-            # runtime looks like:  ".../debugpy --connect ..."
-            for pid, cmd in matches:
-                if "debugpy --connect" in cmd:
+        # Read /proc directly: no pgrep subprocess, no per-process psutil objects
+        matches = _pam_candidates()
+        if not matches:
+            return None
+
+        # 1) Prefer the actual debugpy runtime process (not the launcher)
+        # launcher looks like: ".../debugpy/launcher ..."
+        # runtime looks like:  ".../debugpy --connect ..."
+        for pid, cmd, role in matches:
+            if role == b" --connect":
+                return pid
+
+        # 2) Prefer a candidate whose parent is also a candidate (e.g. uvicorn
+        # started via sudo or a `sh -c` wrapper): the child runs the event
+        # loop. Take the innermost one; a few stat reads, no fd walks
+        pids = {pid for pid, cmd, role in matches}
+        parents = {pid: _ppid(pid) for pid in pids}
+        children = [pid for pid in pids if parents[pid] in pids]
+        innermost = sorted(set(children) - set(parents.values()))
+        if innermost:
+            return innermost[0]
+
+        # 3) Prefer the process that is actually LISTENing on :9000
+        # (works well for uvicorn workers / reload children too)
+        inodes = _listening_socket_inodes(PAM_PORT)
+        if inodes:
+            for pid, cmd, role in matches:
+                if _owns_socket(pid, inodes):
                     return pid
 
-            # 2) Prefer the process that is actually LISTENing on :9000
-            # (works well for uvicorn workers / reload children too)
-            for pid, cmd in matches:
-                try:
-                    p = psutil.Process(pid)
-                    for c in p.net_connections(kind="inet"):
-                        if c.status == psutil.CONN_LISTEN and c.laddr and c.laddr.port == 9000:
-                            return pid
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-
-            # 3) Prefer non-launcher if both are present
-            non_launcher = [(pid, cmd) for pid, cmd in matches if "debugpy/launcher" not in cmd]
-            if non_launcher:
-                # If multiple, pick the one with longer cmdline (often the real runner)
-                return max(non_launcher, key=lambda x: len(x[1]))[0]
-
-            # 4) Last fallback: return the last PID (often the child)
-            return matches[-1][0]
-
-        except (subprocess.CalledProcessError, ValueError):
-            return None
+        # 4) Prefer non-launcher if both are present
+        non_launcher = [(pid, cmd) for pid, cmd, role in matches if role != b"/launcher"]
+        if non_launcher:
+            # If multiple, pick the one with longer cmdline (often the real runner)
+            return max(non_launcher, key=lambda x: len(x[1]))[0]
+
+        # 5) Last fallback: return the last PID (often the child)
+        return matches[-1][0]
 
     def run_profiling(self):
         """Run profiling until interrupted"""
         print(f"=" * 80)
         print(f"Profiling PAM with py-spy - Scenario: {self.scenario}")
-        print(f"Profile output: {self.speedscope_file}")
+        print(f"Profile output: {self.profile_file}")
         print(f"=" * 80)
         print()
 
@@ -133,50 +329,61 @@ class PySpyProfiler:
             print()
             
             # Build py-spy command to attach to existing process
-            # Use full path to py-spy from venv with sudo
-            pyspy_path = Path(sys.executable).parent / "py-spy"
-            pyspy_cmd = [
-                "sudo", str(pyspy_path), "record",
+            # Use full path to py-spy (see PYSPY); sudo only if we cannot ptrace PAM
+            pyspy_cmd = ["sudo"] if _needs_sudo(pam_pid) else []
+            pyspy_cmd += [
+                PYSPY, "record",
                 "--pid", str(pam_pid),
-                "--rate", "100",  # Sample 50 times per second (lower overhead than 100)
+                "--rate", str(self.rate),  # Samples per second
                 "--subprocesses",  # Profile subprocesses too
-                "--idle",  # Include idle/sleeping threads
-                "--format", "speedscope",
-                "--output", str(self.speedscope_file)
+                "--format", self.output_format,
             ]
+            if self.chunk_seconds:
+                pyspy_cmd += ["--duration", str(self.chunk_seconds)]
+            if self.include_idle:
+                pyspy_cmd.append("--idle")  # Include idle/sleeping threads
+            if self.nonblocking:
+                pyspy_cmd.append("--nonblocking")
+            if self.native:
+                pyspy_cmd.append("--native")
             
             print(f"[Profiler] Profiling PID {pam_pid}...")
             print(f"[Profiler] Press Ctrl+C to stop and save profile")
             print()
             
-            # Use Popen so we can handle interruptions gracefully
-            # Don't capture stdout/stderr - let py-spy print directly so we see errors
-            pyspy_process = subprocess.Popen(
-                pyspy_cmd,
-                stdout=None,
-                stderr=None,
-                text=True
-            )
-            
-            # Wait for py-spy to complete (or until interrupted)
-            # Poll instead of communicate() so we can handle Ctrl+C
-            global interrupted
-            while pyspy_process.poll() is None and not interrupted:
-                time.sleep(0.5)
-            
-            # Check if interrupted during poll loop
-            if interrupted and pyspy_process.poll() is None:
-                print("\n[Profiler] Waiting for py-spy to finish writing profile...")
-                try:
-                    pyspy_process.wait(timeout=10)
-                except subprocess.TimeoutExpired:
-                    print("[Profiler] Force stopping py-spy...")
-                    pyspy_process.kill()
-                    pyspy_process.wait()
-            
-            returncode = pyspy_process.returncode if pyspy_process else None
-            if returncode is not None:
-                print(f"\n[Profiler] py-spy exited with code: {returncode}")
+            part = 0
+            while True:
+                if self.chunk_seconds:
+                    part += 1
+                    self._set_output(f"{self.base_name}_part{part:03d}")
+
+                # Use Popen so we can handle interruptions gracefully
+                # Don't capture stdout/stderr - let py-spy print directly so we see errors
+                pyspy_process = subprocess.Popen(
+                    pyspy_cmd + ["--output", str(self.profile_file)],
+                    stdout=None,
+                    stderr=None,
+                    text=True
+                )
+
+                # Wait for py-spy to exit (or until interrupted). A watcher thread
+                # reaps py-spy and sets stop_event, so the wait ends the moment
+                # either happens, with no polling
+                def _reap(process=pyspy_process):
+                    process.wait()
+                    stop_event.set()
+
+                threading.Thread(target=_reap, name="py-spy-reaper", daemon=True).start()
+                stop_event.wait()
+
+                # Chunk finished on its own: rotate to the next one, unless
+                # py-spy failed (e.g. PAM exited) or we were interrupted
+                if interrupted or not self.chunk_seconds or pyspy_process.returncode != 0:
+                    break
+                stop_event.clear()
+                if interrupted:  # signal landed between the wakeup and clear()
+                    break
+                self._finish_part(part)
 
         except KeyboardInterrupt:
             print("\n[Profiler] Profiling interrupted by user (Ctrl+C)")
@@ -187,52 +394,75 @@ class PySpyProfiler:
             traceback.print_exc()
             
         finally:
-            # Always cleanup and check for saved profile
-            # py-spy handles Ctrl+C itself, just wait for it to finish writing
-            if pyspy_process and pyspy_process.poll() is None:
-                print("[Profiler] Waiting for py-spy to finish writing profile...")
-                try:
-                    pyspy_process.wait(timeout=10)
-                except subprocess.TimeoutExpired:
-                    print("[Profiler] Force stopping py-spy...")
-                    pyspy_process.kill()
-                    pyspy_process.wait()
-            
-            # Give filesystem time to flush
-            time.sleep(0.5)
+            # The one place py-spy is waited for, however we got here (normal
+            # exit, Ctrl+C, error). py-spy handles Ctrl+C itself, so just give
+            # it time to finish writing before forcing it down
+            if pyspy_process:
+                if pyspy_process.poll() is None:
+                    print("\n[Profiler] Waiting for py-spy to finish writing profile...")
+                    try:
+                        pyspy_process.wait(timeout=10)
+                    except subprocess.TimeoutExpired:
+                        print("[Profiler] Force stopping py-spy...")
+                        pyspy_process.kill()
+                        pyspy_process.wait()
+                print(f"\n[Profiler] py-spy exited with code: {pyspy_process.returncode}")
             
             # Check if profile was saved (py-spy writes partial profiles on interruption)
-            if self.speedscope_file.exists():
-                file_size = self.speedscope_file.stat().st_size
+            if self.profile_file.exists():
+                file_size = self.profile_file.stat().st_size
                 if file_size > 0:
+                    _drop_from_page_cache(self.profile_file)
                     returncode = pyspy_process.returncode if pyspy_process else None
                     if returncode == 0:
                         print(f"\n[Profiler] ✓ Success!")
                     else:
                         print(f"\n[Profiler] ⚠ Profiling interrupted, but partial profile saved")
-                    print(f"[Profiler] Profile saved: {self.speedscope_file} ({file_size:,} bytes)")
+                    print(f"[Profiler] Profile saved: {self.profile_file} ({file_size:,} bytes)")
+                    if self.output_format == "raw":
+                        self.render_flamegraph()
                     self.print_next_steps()
                 else:
                     print(f"\n[Profiler] ✗ Profile file is empty")
             else:
                 print(f"\n[Profiler] ✗ No profile file generated")
 
+    def render_flamegraph(self) -> bool:
+        """Render the folded-stack profile to an SVG flame graph with FLAMEGRAPH"""
+        if FLAMEGRAPH is None:
+            print("[Profiler] (install inferno or FlameGraph to also get an SVG flame graph)")
+            return False
+        with open(self.profile_file, "rb") as folded, open(self.flamegraph_file, "wb") as svg:
+            result = subprocess.run([FLAMEGRAPH], stdin=folded, stdout=svg)
+        if result.returncode != 0:
+            print(f"[Profiler] ⚠ {Path(FLAMEGRAPH).name} exited with code {result.returncode}")
+            self.flamegraph_file.unlink(missing_ok=True)
+            return False
+        print(f"[Profiler] Flame graph saved: {self.flamegraph_file}")
+        return True
+
     def print_next_steps(self):
         """Print next steps for viewing results"""
         print(f"\n{'=' * 80}")
         print("RESULTS - Generated Files:")
         print(f"{'=' * 80}")
         print(f"\n📊 Speedscope Interactive Profile:")
-        print(f"   {self.speedscope_file}")
+        print(f"   {self.profile_file}")
+        if self.flamegraph_file.exists():
+            print(f"\n🔥 Flame Graph (open in a browser):")
+            print(f"   {self.flamegraph_file}")
         
         print(f"\n{'=' * 80}")
         print("How to view:")
         print(f"{'=' * 80}")
         print(f"\nSpeedscope Profile:")
         print(f"   1. Visit https://www.speedscope.app/")
-        print(f"   2. Click 'Browse' and select: {self.speedscope_file}")
+        print(f"   2. Click 'Browse' and select: {self.profile_file}")
         print(f"   3. Toggle between views:")
-        print(f"      - Time Order: Timeline view")
+        if self.output_format == "speedscope":
+            print(f"      - Time Order: Timeline view")
+        else:
+            print(f"      (folded stacks are aggregated, so there is no Time Order view)")
         print(f"      - Left Heavy: Flame graph (top-down)")
         print(f"      - Sandwich: Icicle graph (bottom-up)")
         
@@ -258,6 +488,8 @@ Note: Scenario labels are for record keeping only. Use any descriptive
 Output Format:
   - Speedscope (JSON)          : Interactive visualization at speedscope.app
                                  Includes flame graph, icicle graph, and timeline views
+  - Folded stacks (--format raw): Much smaller for long captures; also opens in
+                                 speedscope.app (no timeline view)
 
 Examples:
   # Start PAM first:
@@ -282,7 +514,61 @@ Examples:
         help='Output directory for profile files (default: tools/profiling/profiles)'
     )
 
+    parser.add_argument(
+        '--format',
+        dest='output_format',
+        choices=sorted(PROFILE_SUFFIXES),
+        default='speedscope',
+        help='py-spy output format (default: speedscope)'
+    )
+
+    parser.add_argument(
+        '--rate',
+        type=int,
+        default=100,
+        help='py-spy samples per second; lower means less overhead on PAM (default: 100)'
+    )
+
+    parser.add_argument(
+        '--no-idle',
+        dest='include_idle',
+        action='store_false',
+        help='Leave idle/sleeping threads out of the profile (smaller, shows only busy code)'
+    )
+
+    parser.add_argument(
+        '--nonblocking',
+        action='store_true',
+        help="Don't pause PAM while sampling (lowest overhead, slightly less accurate)"
+    )
+
+    parser.add_argument(
+        '--native',
+        action='store_true',
+        help='Include native C/C++ frames, e.g. time spent inside serial writes '
+             '(Linux only; higher overhead, not for production)'
+    )
+
+    parser.add_argument(
+        '--chunk-seconds',
+        type=int,
+        default=None,
+        help='Rotate to a new profile file (..._partNNN) every N seconds so no '
+             'single file grows too large to open (default: one file)'
+    )
+
+    parser.add_argument(
+        '--max-chunks',
+        type=int,
+        default=None,
+        help='With --chunk-seconds, keep only the newest K chunk files'
+    )
+
     args = parser.parse_args()
+    if args.native and args.nonblocking:
+        parser.error("--native cannot be combined with --nonblocking")
+    if args.max_chunks and not args.chunk_seconds:
+        parser.error("--max-chunks requires --chunk-seconds")
 
     # Setup signal handlers for graceful shutdown
     signal.signal(signal.SIGINT, signal_handler)
@@ -291,7 +577,14 @@ Examples:
     # Create and run profiler
     profiler = PySpyProfiler(
         scenario=args.scenario,
-        output_dir=args.output
+        output_dir=args.output,
+        rate=args.rate,
+        include_idle=args.include_idle,
+        nonblocking=args.nonblocking,
+        output_format=args.output_format,
+        native=args.native,
+        chunk_seconds=args.chunk_seconds,
+        max_chunks=args.max_chunks
     )
     
     profiler.run_profiling()